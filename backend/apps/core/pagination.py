@@ -0,0 +1,162 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+Cursor = namedtuple('Cursor', ['position', 'reverse'])
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Keyset (seek) pagination over an ordering field and the primary key
+
+    Every page is fetched with a range condition on `(field, pk)` instead of
+    an OFFSET, so deep pages cost the same as the first one. Cursors are
+    opaque base64 tokens holding the last seen position.
+
+    The ordering field is taken from the queryset `order_by()`, then from the
+    model `Meta.ordering`, and finally from `ordering`. NULL values of nullable
+    fields are always placed last, non-nullable fields get a plain ORDER BY so
+    that an index on `(field, pk)` can serve both directions.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = '-created_at'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.field, self.descending = self.get_ordering(request, queryset, view)
+        self.nullable = self._is_nullable(queryset.model, self.field)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = self.cursor.reverse if self.cursor else False
+        queryset = queryset.order_by(*self._get_order_by(reverse))
+        if self.cursor:
+            queryset = queryset.filter(self._get_seek_condition(self.cursor.position, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+
+        if reverse:
+            self.has_next = self.cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Return the `(field, descending)` pair used as the seek key
+        """
+        order_by = queryset.query.order_by or queryset.model._meta.ordering or [self.ordering]
+        ordering = order_by[0]
+        if not isinstance(ordering, str):
+            raise ValueError('Keyset pagination requires the queryset to be ordered by a field name.')
+
+        return ordering.lstrip('-'), ordering.startswith('-')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(Cursor(position=self._get_position(self.page[-1]), reverse=False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(Cursor(position=self._get_position(self.page[0]), reverse=True))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            padding = '=' * (-len(encoded) % 4)
+            tokens = json.loads(urlsafe_b64decode(encoded + padding).decode('utf-8'))
+            value, pk = tokens['p']
+            reverse = bool(tokens.get('r', False))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return Cursor(position=(value, pk), reverse=reverse)
+
+    def encode_cursor(self, cursor):
+        tokens = {'p': list(cursor.position)}
+        if cursor.reverse:
+            tokens['r'] = 1
+
+        encoded = urlsafe_b64encode(json.dumps(tokens).encode('utf-8')).decode('ascii').rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _get_position(self, instance):
+        return (
+            self._to_json(getattr(instance, self.field)),
+            self._to_json(instance.pk),
+        )
+
+    def _to_json(self, value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, (UUID, Decimal)):
+            return str(value)
+        return value
+
+    def _is_nullable(self, model, field):
+        try:
+            return model._meta.get_field(field).null
+        except FieldDoesNotExist:
+            return False
+
+    def _get_order_by(self, reverse):
+        descending = self.descending != reverse
+        nulls = {}
+        if self.nullable:
+            nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+        expressions = (F(self.field), F('pk'))
+        if descending:
+            return [expression.desc(**nulls) for expression in expressions]
+        return [expression.asc(**nulls) for expression in expressions]
+
+    def _get_seek_condition(self, position, reverse):
+        """
+        Build the filter that selects rows strictly after `position` in the
+        direction of travel, keeping NULLs at the end of the forward ordering
+        """
+        value, pk = position
+        lookup = 'lt' if self.descending != reverse else 'gt'
+
+        if value is None:
+            condition = Q(**{f'{self.field}__isnull': True, f'pk__{lookup}': pk})
+            if reverse:
+                condition |= Q(**{f'{self.field}__isnull': False})
+            return condition
+
+        condition = (
+            Q(**{f'{self.field}__{lookup}': value}) |
+            Q(**{self.field: value, f'pk__{lookup}': pk})
+        )
+        if not reverse and self.nullable:
+            condition |= Q(**{f'{self.field}__isnull': True})
+        return condition
@@ -3,6 +3,43 @@ from datetime import datetime
 from django.utils.timezone import make_aware
 from django.views.generic import TemplateView
 
+from apps.recipes.collaborative import user_recommendations
+from apps.recipes.feeds import feed_queryset
+from apps.recipes.models import Like, RecipeRanking
+from apps.recipes.similarity import recommended_recipes
+
+
+def compact_count(value):
+    """
+    1234 -> '1.2k', 2500000 -> '2.5M'
+    """
+    for threshold, suffix in ((1_000_000, 'M'), (1_000, 'k')):
+        if value >= threshold:
+            return f'{value / threshold:.1f}'.removesuffix('.0') + suffix
+    return str(value)
+
+
+def recipe_cards(recipes, user):
+    """
+    Recipes as home page cards
+    """
+    liked = set()
+    if user.is_authenticated and recipes:
+        liked = set(Like.objects.filter(user=user, recipe__in=recipes).values_list('recipe_id', flat=True))
+
+    return [
+        {
+            "id": str(recipe.pk),
+            "title": recipe.title,
+            "slug": recipe.slug,
+            "description": recipe.description,
+            "image": recipe.final_image.url if recipe.final_image else None,
+            "views": compact_count(recipe.views_count),
+            "is_liked": recipe.pk in liked,
+        }
+        for recipe in recipes
+    ]
+
 
 class MainView(TemplateView):
     template_name = "pages/index.html"
@@ -15,37 +52,21 @@ class MainView(TemplateView):
             "description": "Master the art of pizza making with our authentic Italian recipe. Perfect crispy crust and melty cheese guaranteed.",
             "get_absolute_url": "/recipes/homemade-italian-pizza"
         }
-        popular_recipes = [
-            {
-                "id": "123",
-                "title": "Classic Beef Burger",
-                "slug": "classic-beef-burger",
-                "description": "The perfect juicy burger recipe with all the fixings",
-                "image": None,
-                "views": "1.2k",
-                "is_liked": True,
-            }
-            for _ in range(10)
-        ]
-        recommended_recipes = [
-            {
-                "id": "234",
-                "title": "Perfect Pizza",
-                "slug": "perfect-pizza",
-                "description": "Master the art of pizza making with our authentic Italian recipe. Perfect crispy crust and melty cheese guaranteed.",
-                "image": None,
-                "views": "1,20000 views",
-                "is_liked": False,
-            }
-            for _ in range(10)
-        ]
+        # Feeds and neighbors are precomputed, the home page only reads them
+        user = self.request.user
+        popular = list(feed_queryset(RecipeRanking.POPULAR)[:10])
+        recommended = []
+        if user.is_authenticated:
+            recommended = user_recommendations(user) or recommended_recipes(user)
+        if not recommended:
+            recommended = list(feed_queryset(RecipeRanking.TRENDING)[:10])
 
         context.update({
             "title": "Main",
             "is_partials": True,
             "featured_recipe": featured_recipe,
-            "popular_recipes": popular_recipes,
-            "recommended_recipes": recommended_recipes,
+            "popular_recipes": recipe_cards(popular, user),
+            "recommended_recipes": recipe_cards(recommended, user),
         })
         return context
 
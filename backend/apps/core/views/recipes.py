@@ -1,9 +1,8 @@
-import random
-
 from django.shortcuts import render
 from django.views.generic import TemplateView
 
 from apps.recipes.models import Recipe
+from apps.recipes.sampling import random_recipe_pool
 
 
 class RecipeListView(TemplateView):
@@ -53,8 +52,7 @@ class RandomRecipeDetailView(TemplateView):
     template_name = "pages/recipe_detail.html"
     
     def get(self, request):
-        recipes = Recipe.objects.filter(is_banned=False, is_deleted=False, status='PUBLISHED')
-        recipe = random.choice(list(recipes)) if recipes.exists() else None
+        recipe = random_recipe_pool.pick(Recipe.objects.public().with_details())
         
         if not recipe:
             return render(request, "pages/recipe_not_found.html", {})
@@ -1,6 +1,6 @@
 from django.contrib import admin
-from django.utils.text import slugify
 
+from apps.recipes.caching import invalidate_recipes
 from apps.recipes.models import (
     Recipe,
     RecipeBlock,
@@ -14,11 +14,13 @@ from apps.recipes.models import (
 @admin.action(description='ban: set True')
 def make_banned(modeladmin, request, queryset):
     queryset.update(is_banned=True)
+    invalidate_recipes(queryset.values_list('pk', flat=True))
 
 
 @admin.action(description='ban: set False')
 def remove_banned(modeladmin, request, queryset):
     queryset.update(is_banned=False)
+    invalidate_recipes(queryset.values_list('pk', flat=True))
 
 
 @admin.action(description='featured: set True')
@@ -69,7 +71,7 @@ class RecipeAdmin(admin.ModelAdmin):
         'calories', 'protein', 'fat', 'carbs',
         'created_at', 'updated_at', 'published_at',
         'is_deleted', 'deleted_at',
-        'is_private', 'views_count', 'likes_count',
+        'is_private', 'views_count', 'unique_visitors', 'likes_count',
     )
     actions = (
         make_banned,
@@ -175,7 +177,8 @@ class TagAdmin(admin.ModelAdmin):
 
     def save_model(self, request, obj, form, change):
         if not obj.slug or change:
-            obj.slug = slugify(obj.name)
+            # Saving allocates a free slug from the name
+            obj.slug = None
         super().save_model(request, obj, form, change)
 
 
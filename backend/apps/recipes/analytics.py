@@ -0,0 +1,162 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from apps.recipes.models import Recipe, RecipeHourlyStats, RecipeDailyStats
+
+
+# Days before today covered by each time range
+TIME_RANGES = {
+    'day': 0,
+    '3days': 2,
+    'week': 6,
+    'month': 29,
+    '3months': 89,
+    '6months': 179,
+    'year': 364,
+}
+
+TIME_VIEWS = ('hour', 'day', 'week', 'month', 'year')
+
+# Sort keys of the author analytics, always descending
+ANALYTICS_SORT_FIELDS = ('views', 'likes', 'engagement')
+
+
+def time_range_dates(time_range):
+    end_date = timezone.localtime()
+    days = TIME_RANGES.get(time_range, TIME_RANGES['week'])
+    start_date = (end_date - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return start_date, end_date
+
+
+def format_period(date_value, time_view):
+    """
+    Format dates consistently based on the time view
+    """
+    if time_view == 'hour':
+        return date_value.strftime('%Y-%m-%d %H:00')
+    elif time_view == 'week':
+        return date_value.strftime('%G-W%V')
+    elif time_view == 'month':
+        return date_value.strftime('%Y-%m')
+    elif time_view == 'year':
+        return date_value.strftime('%Y')
+    return date_value.strftime('%Y-%m-%d')
+
+
+def periods(start_date, end_date, time_view):
+    """
+    Every period between the two dates, hour by hour or day by day
+    """
+    step = timedelta(hours=1) if time_view == 'hour' else timedelta(days=1)
+    current_date = start_date
+    result = []
+    while current_date <= end_date:
+        period = format_period(current_date, time_view)
+        if not result or result[-1] != period:
+            result.append(period)
+        current_date += step
+    return result
+
+
+def engagement_rate(views, likes):
+    return round((likes / views) * 100) if views > 0 else 0
+
+
+def time_series(rows, start_date, end_date, time_view, all_periods=None):
+    """
+    Views and likes per period from `(bucket, views, likes)` rollup rows, empty periods included
+    """
+    totals = defaultdict(lambda: [0, 0])
+    for bucket, views, likes in rows:
+        period = totals[format_period(timezone.localtime(bucket), time_view)]
+        period[0] += views
+        period[1] += likes
+
+    series = []
+    for period in all_periods or periods(start_date, end_date, time_view):
+        views, likes = totals.get(period, (0, 0))
+        series.append({'period': period, 'views': views, 'likes': likes})
+
+    total_views = sum(entry['views'] for entry in series)
+    total_likes = sum(entry['likes'] for entry in series)
+    return {
+        'total_views': total_views,
+        'total_likes': total_likes,
+        'engagement_rate': engagement_rate(total_views, total_likes),
+        'data': series,
+    }
+
+
+def rollup_queryset(start_date, end_date, time_view):
+    """
+    Hourly rollups for the hour view, daily ones otherwise, between the two dates
+    """
+    if time_view == 'hour':
+        return RecipeHourlyStats.objects.filter(bucket__gte=start_date, bucket__lte=end_date)
+    start_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    return RecipeDailyStats.objects.filter(bucket__gte=start_date, bucket__lte=end_date)
+
+
+def author_analytics(author, time_range='week', time_view='day', sort='views', limit=10):
+    """
+    Totals and time series of all recipes of `author`, and of the top `limit` of them by `sort`
+
+    Reads the rollups with four queries whatever the number of recipes:
+    the recipes, their totals, the overall series and the series of the top recipes.
+    """
+    if sort not in ANALYTICS_SORT_FIELDS:
+        raise ValidationError({'sort': f"Unsupported sort key. Choose one of: {', '.join(ANALYTICS_SORT_FIELDS)}."})
+    if time_view not in TIME_VIEWS:
+        time_view = 'day'
+
+    start_date, end_date = time_range_dates(time_range)
+    all_periods = periods(start_date, end_date, time_view)
+    recipes = {
+        recipe['id']: recipe
+        for recipe in Recipe.objects.filter(author=author, is_deleted=False).values('id', 'slug', 'title')
+    }
+    rollups = rollup_queryset(start_date, end_date, time_view).filter(recipe__author=author, recipe__is_deleted=False)
+
+    for recipe in recipes.values():
+        recipe.update(total_views=0, total_likes=0, engagement_rate=0)
+    for recipe_id, views, likes in (
+        rollups.values('recipe_id').annotate(total_views=Sum('views'), total_likes=Sum('likes'))
+        .values_list('recipe_id', 'total_views', 'total_likes').order_by()
+    ):
+        recipes[recipe_id].update(
+            total_views=views,
+            total_likes=likes,
+            engagement_rate=engagement_rate(views, likes),
+        )
+
+    sort_key = {'views': 'total_views', 'likes': 'total_likes', 'engagement': 'engagement_rate'}[sort]
+    top = sorted(recipes.values(), key=lambda recipe: (-recipe[sort_key], -recipe['total_views'], recipe['title']))[:limit]
+
+    overall = time_series(
+        rollups.values('bucket').annotate(total_views=Sum('views'), total_likes=Sum('likes'))
+        .values_list('bucket', 'total_views', 'total_likes').order_by(),
+        start_date, end_date, time_view, all_periods,
+    )
+
+    rows = defaultdict(list)
+    for recipe_id, bucket, views, likes in (
+        rollups.filter(recipe_id__in=[recipe['id'] for recipe in top])
+        .values_list('recipe_id', 'bucket', 'views', 'likes')
+    ):
+        rows[recipe_id].append((bucket, views, likes))
+
+    return {
+        'time_range': time_range,
+        'time_view': time_view,
+        'sort': sort,
+        'recipes_count': len(recipes),
+        **overall,
+        'recipes': [
+            {**recipe, 'data': time_series(rows[recipe['id']], start_date, end_date, time_view, all_periods)['data']}
+            for recipe in top
+        ],
+    }
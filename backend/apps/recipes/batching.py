@@ -0,0 +1,10 @@
+from itertools import batched
+
+
+def iter_id_batches(queryset, size):
+    """
+    Lists of at most `size` primary keys of `queryset`, read from the database `size` at a time
+    """
+    ids = queryset.order_by().values_list('pk', flat=True).iterator(chunk_size=size)
+    for batch in batched(ids, size):
+        yield list(batch)
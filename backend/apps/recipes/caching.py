@@ -0,0 +1,109 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+CATALOGUE_VERSION_KEY = 'recipes:catalogue:version'
+
+
+def get_cache():
+    return caches[settings.RECIPE_CACHE_ALIAS]
+
+
+def recipe_version_key(pk):
+    return f'recipes:recipe:{pk}:version'
+
+
+def _new_version():
+    # Start from the clock so an evicted counter never returns to a value an old entry was stored with
+    return time.time_ns()
+
+
+def get_version(key):
+    cache = get_cache()
+    version = cache.get(key)
+    if version is None:
+        version = _new_version()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_versions(keys):
+    cache = get_cache()
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), None)
+
+
+def invalidate_recipes(pks):
+    """
+    Expire the cached lists and the cached detail responses of the given recipes
+    """
+    bump_versions([CATALOGUE_VERSION_KEY, *(recipe_version_key(pk) for pk in pks)])
+
+
+def normalize_query(query_params):
+    """
+    Order-independent digest of the query parameters, empty values are ignored
+    """
+    items = sorted(
+        (key, value)
+        for key in query_params
+        for value in query_params.getlist(key)
+        if value != ''
+    )
+    return hashlib.md5(urlencode(items).encode('utf-8')).hexdigest()
+
+
+def list_cache_key(scope, request):
+    return ':'.join([
+        'recipes:list',
+        scope,
+        str(get_version(CATALOGUE_VERSION_KEY)),
+        request.get_host(),
+        normalize_query(request.query_params),
+    ])
+
+
+def get_list_response(scope, request):
+    return get_cache().get(list_cache_key(scope, request))
+
+
+def set_list_response(scope, request, data):
+    get_cache().set(list_cache_key(scope, request), data, settings.RECIPE_CACHE_TIMEOUT)
+
+
+def detail_cache_key(scope, request, lookup):
+    return ':'.join([
+        'recipes:detail',
+        scope,
+        str(lookup),
+        request.get_host(),
+        request.accepted_media_type,
+        normalize_query(request.query_params),
+    ])
+
+
+def get_detail_response(scope, request, lookup):
+    """
+    Cached detail entries remember the recipe and its version, they are
+    only served while that version is current
+    """
+    entry = get_cache().get(detail_cache_key(scope, request, lookup))
+    if entry is None or entry['version'] != get_version(recipe_version_key(entry['recipe'])):
+        return None
+    return entry['response']
+
+
+def set_detail_response(scope, request, lookup, recipe, response, version):
+    get_cache().set(
+        detail_cache_key(scope, request, lookup),
+        {'recipe': recipe.pk, 'version': version, 'response': response},
+        settings.RECIPE_CACHE_TIMEOUT,
+    )
@@ -0,0 +1,165 @@
+import uuid
+from itertools import batched
+
+import numpy as np
+from scipy import sparse
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.recipes.models import (
+    Recipe,
+    Like,
+    RecipeNeighbor,
+    UserRecommendations,
+)
+from apps.recipes.similarity import normalize_rows, store_neighbors, top_neighbors
+
+
+# Users whose recommendation lists are computed at once
+USER_CHUNK_SIZE = 500
+
+# Likes read from the database and appended to the user by recipe arrays at once
+LIKE_CHUNK_SIZE = 5000
+
+
+def _binary_matrix(pairs, shape):
+    rows, columns = zip(*pairs) if pairs else ((), ())
+    return sparse.csr_matrix(
+        (np.ones(len(rows)), (np.asarray(rows, dtype=np.int64), np.asarray(columns, dtype=np.int64))),
+        shape=shape,
+    )
+
+
+def build_like_neighbors(k=None):
+    """
+    Replace the item-item model: for each public recipe, the recipes most liked by the same users
+
+    A recipe is the vector of the users who liked it, so the cosine of two
+    recipes is the number of users who liked both, normalized by how liked
+    each one is. Likes are read `LIKE_CHUNK_SIZE` at a time into index
+    arrays. Returns the number of recipes with neighbors.
+    """
+    public = Recipe.objects.public()
+    recipe_ids = list(public.order_by('pk').values_list('pk', flat=True))
+    recipe_index = {recipe_id: row for row, recipe_id in enumerate(recipe_ids)}
+
+    users = {}
+    rows = []
+    columns = []
+    likes = Like.objects.filter(recipe__in=public).values_list('user_id', 'recipe_id').iterator(chunk_size=LIKE_CHUNK_SIZE)
+    for chunk in batched(likes, LIKE_CHUNK_SIZE):
+        rows.append(np.fromiter((recipe_index[recipe_id] for _, recipe_id in chunk), dtype=np.int64, count=len(chunk)))
+        columns.append(np.fromiter((users.setdefault(user_id, len(users)) for user_id, _ in chunk), dtype=np.int64, count=len(chunk)))
+
+    rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+    columns = np.concatenate(columns) if columns else np.empty(0, dtype=np.int64)
+    matrix = normalize_rows(sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, columns)),
+        shape=(len(recipe_ids), len(users)),
+    ))
+    return store_neighbors(RecipeNeighbor.LIKES, recipe_ids, top_neighbors(matrix, k or settings.RECIPE_NEIGHBORS))
+
+
+def _neighbor_matrix():
+    """
+    The item-item model as a sparse recipe by recipe matrix of scores, with its recipe index
+    """
+    rows = list(RecipeNeighbor.objects.filter(kind=RecipeNeighbor.LIKES).values_list('recipe_id', 'neighbor_id', 'score'))
+    recipe_ids = sorted({recipe_id for recipe_id, _, _ in rows} | {neighbor_id for _, neighbor_id, _ in rows})
+    recipe_index = {recipe_id: index for index, recipe_id in enumerate(recipe_ids)}
+
+    matrix = sparse.csr_matrix(
+        (
+            np.asarray([score for _, _, score in rows], dtype=np.float64),
+            (
+                np.asarray([recipe_index[recipe_id] for recipe_id, _, _ in rows], dtype=np.int64),
+                np.asarray([recipe_index[neighbor_id] for _, neighbor_id, _ in rows], dtype=np.int64),
+            ),
+        ),
+        shape=(len(recipe_ids), len(recipe_ids)),
+    )
+    return recipe_ids, recipe_index, matrix
+
+
+def compute_recommendations(user_ids, recipe_ids, recipe_index, matrix, limit):
+    """
+    `{user_id: [[recipe_id, score], ...]}` for a chunk of users
+
+    The liked recipes of the users, as a sparse user by recipe matrix,
+    times the item-item scores sums the scores of every recipe over the
+    recipes each user liked. Recipes already liked are left out.
+    """
+    user_index = {user_id: row for row, user_id in enumerate(user_ids)}
+    liked = _binary_matrix(
+        [
+            (user_index[user_id], recipe_index[recipe_id])
+            for user_id, recipe_id in Like.objects.filter(user_id__in=user_ids).values_list('user_id', 'recipe_id')
+            if recipe_id in recipe_index
+        ],
+        (len(user_ids), len(recipe_ids)),
+    )
+    scores = liked @ matrix
+    scores = (scores - scores.multiply(liked)).tocsr()
+    scores.eliminate_zeros()
+
+    result = {}
+    for row, user_id in enumerate(user_ids):
+        start, end = scores.indptr[row], scores.indptr[row + 1]
+        columns, values = scores.indices[start:end], scores.data[start:end]
+        order = np.argsort(-values, kind='stable')[:limit]
+        result[user_id] = [[str(recipe_ids[columns[index]]), round(float(values[index]), 6)] for index in order]
+    return result
+
+
+def refresh_recommendations(full=False, limit=None):
+    """
+    Recompute the stale and missing recommendation lists, or all of them when `full`
+
+    Lists are marked fresh before they are computed, so a like arriving
+    meanwhile leaves them stale for the next run. Returns the number of
+    lists written.
+    """
+    limit = limit or settings.RECIPE_RECOMMENDATIONS
+    recipe_ids, recipe_index, matrix = _neighbor_matrix()
+
+    likers = Like.objects.order_by().values_list('user_id', flat=True).distinct()
+    if full:
+        UserRecommendations.objects.exclude(user__in=likers).delete()
+        user_ids = list(likers)
+    else:
+        user_ids = list(
+            set(UserRecommendations.objects.filter(is_stale=True).values_list('user_id', flat=True)) |
+            set(likers.filter(user__recipe_recommendations__isnull=True))
+        )
+
+    now = timezone.now()
+    for start in range(0, len(user_ids), USER_CHUNK_SIZE):
+        chunk = user_ids[start:start + USER_CHUNK_SIZE]
+        with transaction.atomic():
+            UserRecommendations.objects.bulk_create(
+                [UserRecommendations(user_id=user_id, computed_at=now) for user_id in chunk],
+                ignore_conflicts=True,
+            )
+            UserRecommendations.objects.filter(user_id__in=chunk).update(is_stale=False)
+
+        lists = compute_recommendations(chunk, recipe_ids, recipe_index, matrix, limit)
+        UserRecommendations.objects.bulk_update(
+            [UserRecommendations(user_id=user_id, recipes=lists[user_id], computed_at=now) for user_id in chunk],
+            ['recipes', 'computed_at'],
+        )
+    return len(user_ids)
+
+
+def user_recommendations(user, limit=10):
+    """
+    Public recipes of the stored recommendation list of `user`, best first
+    """
+    recipes = UserRecommendations.objects.filter(user=user).values_list('recipes', flat=True).first()
+    if not recipes:
+        return []
+
+    recipe_ids = [uuid.UUID(recipe_id) for recipe_id, _ in recipes]
+    public = Recipe.objects.public().select_related('author').in_bulk(recipe_ids[:limit * 2])
+    return [public[recipe_id] for recipe_id in recipe_ids if recipe_id in public][:limit]
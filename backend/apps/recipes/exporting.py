@@ -0,0 +1,414 @@
+import csv
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import textwrap
+from pathlib import Path
+
+import yaml
+
+from django.conf import settings
+from django.utils.html import escape
+
+from apps.recipes.importing import CSV_LIST_SEPARATOR
+from apps.recipes.models import RecipeBlock, RecipeSpecialBlock, prefetch_details
+
+
+def recipe_document(recipe):
+    """
+    Plain representation of a recipe shared by the exporters
+
+    Expects the tags and blocks of the recipe to be prefetched.
+    """
+    special = {block.type: block.content or {} for block in recipe.special_blocks.all()}
+    times = special.get(RecipeSpecialBlock.TIMES, {})
+
+    return {
+        'id': str(recipe.pk),
+        'slug': recipe.slug,
+        'title': recipe.title,
+        'description': recipe.description or '',
+        'author': recipe.author.username,
+        'status': recipe.status,
+        'is_private': recipe.is_private,
+        'tags': [tag.name for tag in recipe.tags.all()],
+        'steps': [
+            block.content for block in recipe.blocks.all()
+            if block.type == RecipeBlock.TEXT and block.content
+        ],
+        'ingredients': special.get(RecipeSpecialBlock.INGREDIENTS, {}).get('items', []),
+        'prep_minutes': times.get('prep_minutes'),
+        'cook_minutes': times.get('cook_minutes'),
+        'calories': recipe.calories,
+        'protein': recipe.protein,
+        'fat': recipe.fat,
+        'carbs': recipe.carbs,
+        'source_url': recipe.source_url or '',
+        'likes_count': recipe.likes_count,
+        'views_count': recipe.views_count,
+        'created_at': recipe.created_at.isoformat(),
+        'published_at': recipe.published_at.isoformat() if recipe.published_at else None,
+    }
+
+
+EXPORTERS = {}
+
+
+def register(exporter_class):
+    EXPORTERS[exporter_class.format] = exporter_class()
+    return exporter_class
+
+
+def get_exporter(name, catalogue=False):
+    """
+    Exporter registered under `name`, or None if there is none
+
+    With `catalogue`, only exporters able to write many recipes to one file are returned.
+    """
+    exporter = EXPORTERS.get((name or '').lower())
+    if exporter is None or (catalogue and not exporter.catalogue):
+        return None
+    return exporter
+
+
+def catalogue_formats():
+    return [name for name, exporter in EXPORTERS.items() if exporter.catalogue]
+
+
+class Exporter:
+    """
+    Base exporter
+
+    Subclasses declare their format and content type and implement `render`,
+    a generator of text or bytes chunks for an iterable of recipe documents.
+    """
+    format = None
+    content_type = None
+    # Whether many recipes can be written to one file
+    catalogue = True
+
+    @property
+    def extension(self):
+        return self.format
+
+    def render(self, documents):
+        raise NotImplementedError
+
+    def encode(self, documents):
+        for chunk in self.render(documents):
+            yield chunk if isinstance(chunk, bytes) else chunk.encode('utf-8')
+
+
+@register
+class JsonLinesExporter(Exporter):
+    format = 'jsonl'
+    content_type = 'application/x-ndjson; charset=utf-8'
+
+    def render(self, documents):
+        for document in documents:
+            yield json.dumps(document, ensure_ascii=False) + '\n'
+
+
+@register
+class JsonExporter(Exporter):
+    """
+    One JSON object per recipe, catalogues use JSON Lines
+    """
+    format = 'json'
+    content_type = 'application/json; charset=utf-8'
+    catalogue = False
+
+    def render(self, documents):
+        for document in documents:
+            yield json.dumps(document, ensure_ascii=False, indent=4)
+
+
+class Echo:
+    """
+    File-like object handing back what is written, so `csv` can feed a generator
+    """
+    def write(self, value):
+        return value
+
+
+@register
+class CsvExporter(Exporter):
+    """
+    Lists are joined with `|`, the layout `import_recipes` reads
+    """
+    format = 'csv'
+    content_type = 'text/csv; charset=utf-8'
+    fields = [
+        'id',
+        'slug',
+        'title',
+        'description',
+        'author',
+        'status',
+        'is_private',
+        'tags',
+        'steps',
+        'ingredients',
+        'prep_minutes',
+        'cook_minutes',
+        'calories',
+        'protein',
+        'fat',
+        'carbs',
+        'source_url',
+        'likes_count',
+        'views_count',
+        'created_at',
+        'published_at',
+    ]
+
+    def render(self, documents):
+        writer = csv.DictWriter(Echo(), fieldnames=self.fields)
+        yield writer.writeheader()
+        for document in documents:
+            document = dict(document)
+            for field in ('tags', 'steps', 'ingredients'):
+                document[field] = CSV_LIST_SEPARATOR.join(document[field])
+            yield writer.writerow(document)
+
+
+@register
+class YamlExporter(Exporter):
+    format = 'yaml'
+    content_type = 'application/yaml; charset=utf-8'
+
+    def render(self, documents):
+        # Every recipe is dumped as a one item sequence, together they form a single list
+        for document in documents:
+            yield yaml.safe_dump([document], sort_keys=False, allow_unicode=True)
+
+
+@register
+class MarkdownExporter(Exporter):
+    format = 'md'
+    content_type = 'text/markdown; charset=utf-8'
+
+    def render(self, documents):
+        for i, document in enumerate(documents):
+            if i:
+                yield '\n---\n\n'
+            yield self.render_document(document)
+
+    def render_document(self, document):
+        lines = [f"# {document['title']}", '']
+
+        byline = f"*by {document['author']}*"
+        if document['tags']:
+            byline += ' · ' + ', '.join(f'`{tag}`' for tag in document['tags'])
+        lines += [byline, '']
+
+        if document['description']:
+            lines += [document['description'], '']
+        if document['ingredients']:
+            lines += ['## Ingredients', '', *(f'- {item}' for item in document['ingredients']), '']
+        if document['steps']:
+            lines += ['## Steps', '', *(f'{i}. {step}' for i, step in enumerate(document['steps'], start=1)), '']
+        if document['source_url']:
+            lines += [f"Source: <{document['source_url']}>", '']
+
+        return '\n'.join(lines)
+
+
+@register
+class TextExporter(Exporter):
+    format = 'txt'
+    content_type = 'text/plain; charset=utf-8'
+
+    def render(self, documents):
+        for i, document in enumerate(documents):
+            if i:
+                yield '\n\n'
+            yield '\n'.join(self.lines(document)) + '\n'
+
+    def lines(self, document):
+        lines = [
+            f"Author: {document['author']}",
+            f"Title: {document['title']}",
+            f"Description: {document['description'] or 'No description'}",
+            f"Views: {document['views_count']}",
+            f"Likes: {document['likes_count']}",
+        ]
+
+        nutrition = [
+            (label, document[key], unit)
+            for label, key, unit in (
+                ('Calories', 'calories', ' kcal'),
+                ('Protein', 'protein', 'g'),
+                ('Fat', 'fat', 'g'),
+                ('Carbohydrates', 'carbs', 'g'),
+            )
+            if document[key] is not None
+        ]
+        if nutrition:
+            lines += ['', 'Nutritional Information:', *(f'{label}: {value}{unit}' for label, value, unit in nutrition)]
+
+        if document['tags']:
+            lines += ['', f"Tags: {', '.join(document['tags'])}"]
+        if document['ingredients']:
+            lines += ['', 'Ingredients:', *(f'- {item}' for item in document['ingredients'])]
+        if document['steps']:
+            lines += ['', 'Steps:', *(f'{i}. {step}' for i, step in enumerate(document['steps'], start=1))]
+        if document['source_url']:
+            lines += ['', f"Source: {document['source_url']}"]
+
+        return lines
+
+
+@register
+class HtmlExporter(Exporter):
+    format = 'html'
+    content_type = 'text/html; charset=utf-8'
+
+    def render(self, documents):
+        yield '<!DOCTYPE html>\n<html>\n<head><meta charset="utf-8"><title>Recipes</title></head>\n<body>\n'
+        for document in documents:
+            yield self.render_document(document)
+        yield '</body>\n</html>\n'
+
+    def render_document(self, document):
+        parts = [
+            '<article>',
+            f"<h1>{escape(document['title'])}</h1>",
+            f"<p><em>by {escape(document['author'])}</em></p>",
+        ]
+        if document['tags']:
+            parts.append('<p>' + ', '.join(f'<code>{escape(tag)}</code>' for tag in document['tags']) + '</p>')
+        if document['description']:
+            parts.append(f"<p>{escape(document['description'])}</p>")
+        if document['ingredients']:
+            parts += ['<h2>Ingredients</h2>', '<ul>', *(f'<li>{escape(item)}</li>' for item in document['ingredients']), '</ul>']
+        if document['steps']:
+            parts += ['<h2>Steps</h2>', '<ol>', *(f'<li>{escape(step)}</li>' for step in document['steps']), '</ol>']
+        if document['source_url']:
+            url = escape(document['source_url'])
+            parts.append(f'<p>Source: <a href="{url}">{url}</a></p>')
+        parts.append('</article>\n')
+        return '\n'.join(parts)
+
+
+@register
+class PdfExporter(Exporter):
+    """
+    Text-only PDF of the plain text export, one Helvetica page per 50 lines
+
+    Written by hand, a recipe needs none of what a PDF library would bring.
+    Characters outside Latin-1 are replaced.
+    """
+    format = 'pdf'
+    content_type = 'application/pdf'
+    catalogue = False
+
+    page_lines = 50
+    line_width = 90
+
+    def render(self, documents):
+        lines = []
+        for document in documents:
+            for line in TextExporter().lines(document):
+                lines += textwrap.wrap(line, self.line_width) or ['']
+
+        pages = [lines[i:i + self.page_lines] for i in range(0, len(lines), self.page_lines)] or [[]]
+        # Objects: 1 catalog, 2 page tree, 3 font, then a page and its content stream per page
+        page_ids = [4 + 2 * i for i in range(len(pages))]
+
+        objects = [
+            b'<< /Type /Catalog /Pages 2 0 R >>',
+            b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(b'%d 0 R' % pk for pk in page_ids), len(pages)),
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+        ]
+        for page_id, page in zip(page_ids, pages):
+            stream = self.page_stream(page)
+            objects.append(
+                b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % (page_id + 1)
+            )
+            objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+
+        offset = 0
+        offsets = []
+
+        def emit(chunk):
+            nonlocal offset
+            offset += len(chunk)
+            return chunk
+
+        yield emit(b'%PDF-1.4\n')
+        for pk, body in enumerate(objects, start=1):
+            offsets.append(offset)
+            yield emit(b'%d 0 obj\n%s\nendobj\n' % (pk, body))
+
+        yield b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+        yield b''.join(b'%010d 00000 n \n' % position for position in offsets)
+        yield b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, offset)
+
+    def page_stream(self, lines):
+        text = [b'BT', b'/F1 11 Tf', b'14 TL', b'72 750 Td']
+        for line in lines:
+            escaped = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+            text.append(b'(%s) Tj T*' % escaped.encode('latin-1', 'replace'))
+        text.append(b'ET')
+        return b'\n'.join(text)
+
+
+def iter_catalogue(queryset, chunk_size=500):
+    """
+    Documents of the recipes of `queryset`, read from the database `chunk_size` at a time
+    """
+    recipes = queryset.with_details().order_by('created_at', 'pk').iterator(chunk_size=chunk_size)
+    return map(recipe_document, recipes)
+
+
+def artifact_dir(pk):
+    return Path(settings.RECIPE_EXPORT_ROOT) / str(pk)
+
+
+def artifact_path(recipe, exporter):
+    """
+    Location of the rendered export of this version of `recipe`
+
+    The version is `updated_at`, which block and tag changes bump. The
+    counters are left out so view flushes don't re-render popular recipes,
+    exports show them as of their rendering.
+    """
+    parts = [recipe.pk, recipe.updated_at.isoformat()]
+    version = hashlib.md5(':'.join(map(str, parts)).encode('utf-8')).hexdigest()
+    return artifact_dir(recipe.pk) / f'{version}.{exporter.extension}'
+
+
+def open_export_artifact(recipe, exporter):
+    """
+    Open binary file of the rendered export of `recipe`, rendering it on first use
+
+    Files are written next to their final path and renamed, so concurrent
+    readers never see a partial export. Older versions in the same format
+    are removed once the file is open, requests that already opened them
+    keep reading, those about to render this version again.
+    """
+    path = artifact_path(recipe, exporter)
+    try:
+        return open(path, 'rb')
+    except FileNotFoundError:
+        pass
+
+    prefetch_details([recipe])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile('wb', dir=path.parent, suffix='.tmp', delete=False) as file:
+        file.writelines(exporter.encode([recipe_document(recipe)]))
+    os.replace(file.name, path)
+    artifact = open(path, 'rb')
+
+    for stale in path.parent.glob(f'*.{exporter.extension}'):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+    return artifact
+
+
+def remove_artifacts(pk):
+    shutil.rmtree(artifact_dir(pk), ignore_errors=True)
@@ -0,0 +1,86 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.recipes.models import (
+    Recipe,
+    RecipeHourlyStats,
+    RecipeDailyStats,
+    RecipeRanking,
+)
+
+
+NEW = 'new'
+FEEDS = (RecipeRanking.POPULAR, RecipeRanking.TRENDING, NEW)
+
+# A like weighs as much as this many views in the scores
+LIKE_WEIGHT = 5
+
+# Engagement older than this many half-lives is left out, it weighs under 2%
+HALF_LIVES = 6
+
+
+def _half_life(feed):
+    if feed == RecipeRanking.POPULAR:
+        return timedelta(days=settings.RECIPE_POPULAR_HALF_LIFE_DAYS)
+    return timedelta(hours=settings.RECIPE_TRENDING_HALF_LIFE_HOURS)
+
+
+def _rollup_model(feed):
+    return RecipeDailyStats if feed == RecipeRanking.POPULAR else RecipeHourlyStats
+
+
+def scores(feed, now=None):
+    """
+    Time-decayed engagement of the public recipes, `{recipe_id: score}`
+
+    Each rollup bucket adds its views and weighted likes halved every
+    half-life of the feed: days long for popular, hours long for trending.
+    """
+    now = now or timezone.now()
+    half_life = _half_life(feed).total_seconds()
+
+    rows = _rollup_model(feed).objects.filter(
+        bucket__gte=now - _half_life(feed) * HALF_LIVES,
+        recipe__in=Recipe.objects.public(),
+    ).values_list('recipe_id', 'bucket', 'views', 'likes')
+
+    result = defaultdict(float)
+    for recipe_id, bucket, views, likes in rows.iterator(chunk_size=2000):
+        age = max((now - bucket).total_seconds(), 0)
+        result[recipe_id] += (views + LIKE_WEIGHT * likes) * 0.5 ** (age / half_life)
+    return result
+
+
+def rank(feed, now=None):
+    """
+    Replace the ranking of `feed` by its top `RECIPE_FEED_SIZE` recipes, returns their number
+    """
+    now = now or timezone.now()
+    top = sorted(scores(feed, now).items(), key=lambda item: (-item[1], str(item[0])))[:settings.RECIPE_FEED_SIZE]
+
+    with transaction.atomic():
+        RecipeRanking.objects.filter(feed=feed).delete()
+        RecipeRanking.objects.bulk_create([
+            RecipeRanking(feed=feed, position=position, recipe_id=recipe_id, score=score, computed_at=now)
+            for position, (recipe_id, score) in enumerate(top, start=1)
+        ])
+    return len(top)
+
+
+def rank_all(now=None):
+    now = now or timezone.now()
+    return {feed: rank(feed, now) for feed, _ in RecipeRanking.FEED_CHOICES}
+
+
+def feed_queryset(feed, queryset=None):
+    """
+    Public recipes of `feed` in order, read from the rankings or, for new, the publication index
+    """
+    queryset = (queryset if queryset is not None else Recipe.objects.all()).public()
+    if feed == NEW:
+        return queryset.order_by('-published_at', '-id')
+    return queryset.filter(rankings__feed=feed).order_by('rankings__position')
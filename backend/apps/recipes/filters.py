@@ -1,5 +1,6 @@
 import django_filters
 
+from apps.recipes.ingredients import normalize_ingredients
 from apps.recipes.models import Recipe
 
 
@@ -7,6 +8,9 @@ class BaseRecipeFilter(django_filters.FilterSet):
     """
     Base filter for Recipe objects
     """
+    # Query parameters handled by pagination and rendering, not by the filter
+    passthrough_params = ('cursor', 'page_size', 'format')
+
     created_at = django_filters.DateFromToRangeFilter()  # ?created_at_after= & ?created_at_before=
     published_at = django_filters.DateFromToRangeFilter()
 
@@ -14,10 +18,21 @@ class BaseRecipeFilter(django_filters.FilterSet):
     title = django_filters.CharFilter(field_name='title', lookup_expr='icontains')
     description = django_filters.CharFilter(field_name='description', lookup_expr='icontains')
 
-    views_min = django_filters.NumberFilter(field_name='view_count', lookup_expr='gte')
-    views_max = django_filters.NumberFilter(field_name='view_count', lookup_expr='lte')
-    likes_min = django_filters.NumberFilter(field_name='like_count', lookup_expr='gte')
-    likes_max = django_filters.NumberFilter(field_name='like_count', lookup_expr='lte')
+    views_min = django_filters.NumberFilter(field_name='views_count', lookup_expr='gte')
+    views_max = django_filters.NumberFilter(field_name='views_count', lookup_expr='lte')
+    likes_min = django_filters.NumberFilter(field_name='likes_count', lookup_expr='gte')
+    likes_max = django_filters.NumberFilter(field_name='likes_count', lookup_expr='lte')
+
+    calories_min = django_filters.NumberFilter(field_name='calories', lookup_expr='gte')
+    calories_max = django_filters.NumberFilter(field_name='calories', lookup_expr='lte')
+    protein_min = django_filters.NumberFilter(field_name='protein', lookup_expr='gte')
+    protein_max = django_filters.NumberFilter(field_name='protein', lookup_expr='lte')
+    fat_min = django_filters.NumberFilter(field_name='fat', lookup_expr='gte')
+    fat_max = django_filters.NumberFilter(field_name='fat', lookup_expr='lte')
+    carbs_min = django_filters.NumberFilter(field_name='carbs', lookup_expr='gte')
+    carbs_max = django_filters.NumberFilter(field_name='carbs', lookup_expr='lte')
+
+    ingredients = django_filters.CharFilter(method='filter_ingredients')  # ?ingredients=flour,eggs
 
     class Meta:
         model = Recipe
@@ -33,8 +48,27 @@ class BaseRecipeFilter(django_filters.FilterSet):
             'views_max',
             'likes_min',
             'likes_max',
+
+            'calories_min',
+            'calories_max',
+            'protein_min',
+            'protein_max',
+            'fat_min',
+            'fat_max',
+            'carbs_min',
+            'carbs_max',
+
+            'ingredients',
         ]
 
+    def filter_ingredients(self, queryset, name, value):
+        """
+        Recipes with every listed ingredient, read from the ingredient index
+        """
+        for ingredient in normalize_ingredients(value.split(',')):
+            queryset = queryset.filter(ingredient_links__ingredient__name=ingredient)
+        return queryset
+
     def filter_queryset(self, queryset):
         """
         If no filters are applied, return an empty queryset
@@ -42,7 +76,7 @@ class BaseRecipeFilter(django_filters.FilterSet):
         if not self.is_valid():
             return Recipe.objects.none()
 
-        if not self.data:
+        if not any(key not in self.passthrough_params for key in self.data):
             return queryset
 
         if any(self.data.get(key) for key in self.filters):
@@ -70,6 +104,17 @@ class RecipeFilter(BaseRecipeFilter):
             'views_max',
             'likes_min',
             'likes_max',
+
+            'calories_min',
+            'calories_max',
+            'protein_min',
+            'protein_max',
+            'fat_min',
+            'fat_max',
+            'carbs_min',
+            'carbs_max',
+
+            'ingredients',
         ]
 
 
@@ -106,4 +151,15 @@ class RecipeAdminFilter(BaseRecipeFilter):
             'views_max',
             'likes_min',
             'likes_max',
+
+            'calories_min',
+            'calories_max',
+            'protein_min',
+            'protein_max',
+            'fat_min',
+            'fat_max',
+            'carbs_min',
+            'carbs_max',
+
+            'ingredients',
         ]
@@ -0,0 +1,188 @@
+import csv
+import json
+import time
+from itertools import islice
+
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from apps.recipes import caching, ingredients, nutrition, search
+from apps.recipes.models import (
+    Recipe,
+    RecipeBlock,
+    RecipeSpecialBlock,
+    Tag,
+)
+from apps.recipes.sampling import RANDOM_RECIPE_POOLS
+from apps.recipes.serializers.recipe import RecipeImportSerializer
+from apps.recipes.slugs import allocate_slugs
+
+
+# Separator of multi-valued CSV columns
+CSV_LIST_SEPARATOR = '|'
+
+
+def read_jsonl(file):
+    """
+    Yield `(line, row)` for every non-empty line, rows use the create endpoint format
+    """
+    for line, text in enumerate(file, start=1):
+        if not text.strip():
+            continue
+        try:
+            yield line, json.loads(text)
+        except json.JSONDecodeError as e:
+            yield line, ValidationError({'line': f'Invalid JSON: {e.msg}.'})
+
+
+def _split(value):
+    return [item.strip() for item in (value or '').split(CSV_LIST_SEPARATOR) if item.strip()]
+
+
+def read_csv(file):
+    """
+    Yield `(line, row)` for every CSV record
+
+    `tags`, `steps` and `ingredients` hold `|` separated lists, `steps` become
+    text blocks and `ingredients` an ingredients special block.
+    """
+    reader = csv.DictReader(file)
+    for record in reader:
+        row = {
+            key: value for key, value in record.items()
+            if key not in ('tags', 'steps', 'ingredients') and value not in (None, '')
+        }
+        row['tags'] = _split(record.get('tags'))
+        row['blocks'] = [
+            {'type': RecipeBlock.TEXT, 'content': step, 'order': order}
+            for order, step in enumerate(_split(record.get('steps')))
+        ]
+        items = _split(record.get('ingredients'))
+        row['special_blocks'] = [
+            {'type': RecipeSpecialBlock.INGREDIENTS, 'content': {'items': items}, 'order': 0}
+        ] if items else []
+        yield reader.line_num, row
+
+
+READERS = {
+    'jsonl': read_jsonl,
+    'csv': read_csv,
+}
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class RecipeImporter:
+    """
+    Validate and write recipe rows in chunks
+
+    Each chunk is written in its own transaction with a constant number of
+    queries: one tag lookup, one slug lookup per table and one `bulk_create` per table.
+    """
+    def __init__(self, author, batch_size=1000):
+        self.author = author
+        self.batch_size = batch_size
+        self.serializer = RecipeImportSerializer()
+        self.imported = 0
+        self.errors = []
+        self.started_at = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    @property
+    def throughput(self):
+        return self.imported / self.elapsed if self.elapsed else 0.0
+
+    def validate(self, rows):
+        for line, row in rows:
+            try:
+                if isinstance(row, ValidationError):
+                    raise row
+                yield self.serializer.run_validation(row)
+            except ValidationError as e:
+                self.errors.append((line, e.detail))
+
+    def run(self, rows):
+        """
+        Import `(line, row)` pairs, yielding the running total after every chunk
+        """
+        for chunk in chunked(self.validate(rows), self.batch_size):
+            with transaction.atomic():
+                self.import_chunk(chunk)
+            self.imported += len(chunk)
+            yield self.imported
+
+        # Bulk inserts skip the Recipe signals
+        caching.invalidate_recipes([])
+        for pool in RANDOM_RECIPE_POOLS:
+            pool.invalidate()
+
+    def resolve_tags(self, names):
+        """
+        Map lowercased tag names to tags, creating the missing ones
+        """
+        names = {name.lower() for name in names}
+        tags = {
+            tag.lower_name: tag
+            for tag in Tag.objects.annotate(lower_name=Lower('name')).filter(lower_name__in=names)
+        }
+
+        missing = sorted(names - set(tags))
+        if missing:
+            created = [
+                Tag(name=name, slug=slug)
+                for name, slug in zip(missing, allocate_slugs(Tag, missing))
+            ]
+            Tag.objects.bulk_create(created)
+            tags.update((tag.name, tag) for tag in created)
+        return tags
+
+    def import_chunk(self, chunk):
+        tags = self.resolve_tags(name for data in chunk for name in data.get('tags', []))
+        slugs = allocate_slugs(Recipe, [data['title'] for data in chunk])
+
+        recipes = []
+        tag_links = []
+        blocks = []
+        special_blocks = []
+        now = timezone.now()
+
+        for data, slug in zip(chunk, slugs):
+            data = dict(data)
+            recipe_tags = data.pop('tags', [])
+            recipe_blocks = data.pop('blocks', [])
+            recipe_special_blocks = data.pop('special_blocks', [])
+
+            recipe = Recipe(
+                author=self.author,
+                slug=slug,
+                **data,
+                **nutrition.nutrition_values((block['type'], block.get('content')) for block in recipe_special_blocks)
+            )
+            # bulk_create skips `Recipe.save`
+            recipe.stamp_published(now)
+            recipes.append(recipe)
+
+            tag_links.extend(
+                Recipe.tags.through(recipe=recipe, tag=tags[name])
+                for name in {name.lower() for name in recipe_tags}
+            )
+            blocks.extend(RecipeBlock(recipe=recipe, **block) for block in recipe_blocks)
+            special_blocks.extend(RecipeSpecialBlock(recipe=recipe, **block) for block in recipe_special_blocks)
+
+        Recipe.objects.bulk_create(recipes)
+        Recipe.tags.through.objects.bulk_create(tag_links)
+        RecipeBlock.objects.bulk_create(blocks)
+        RecipeSpecialBlock.objects.bulk_create(special_blocks)
+        search.index_recipes([recipe.pk for recipe in recipes])
+        ingredients.index_recipes(
+            {block.recipe_id for block in special_blocks if block.type == RecipeSpecialBlock.INGREDIENTS}
+        )
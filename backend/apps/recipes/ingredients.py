@@ -0,0 +1,140 @@
+import re
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+
+from apps.recipes.models import (
+    Recipe,
+    Ingredient,
+    RecipeIngredient,
+    RecipeSpecialBlock,
+)
+
+
+# Words of an ingredient line, quantities left out, 'all-purpose' kept whole
+WORD_RE = re.compile(r"[^\W\d_]+(?:['-][^\W\d_]+)*", re.UNICODE)
+
+# Units and filler words that say nothing about the dish
+STOP_WORDS = frozenset({
+    'and', 'for', 'the', 'with', 'or', 'of', 'to', 'taste', 'optional',
+    'cup', 'cups', 'tbsp', 'tsp', 'tablespoon', 'tablespoons', 'teaspoon', 'teaspoons',
+    'g', 'gram', 'grams', 'kg', 'ml', 'l', 'litre', 'liter', 'oz', 'ounce', 'ounces', 'lb', 'lbs',
+    'pinch', 'piece', 'pieces', 'slice', 'slices', 'large', 'small', 'medium',
+    'chopped', 'diced', 'sliced', 'minced', 'fresh', 'finely',
+})
+
+NAME_LENGTH = Ingredient._meta.get_field('name').max_length
+
+
+def singular(word):
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 4 and word.endswith('oes'):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us')):
+        return word[:-1]
+    return word
+
+
+def normalize_ingredient(line):
+    """
+    Ingredient name of a free-text line, '2 cups All-Purpose Flour, sifted' -> 'all-purpose flour'
+
+    Returns an empty string when nothing but quantities and units is left.
+    """
+    text = re.sub(r'\([^)]*\)', ' ', line.lower()).split(',')[0]
+    words = [singular(word) for word in WORD_RE.findall(text) if word not in STOP_WORDS]
+    return ' '.join(words)[:NAME_LENGTH].strip()
+
+
+def normalize_ingredients(lines):
+    """
+    Distinct names of `lines`, in order
+    """
+    return list(dict.fromkeys(name for name in map(normalize_ingredient, lines) if name))
+
+
+def get_or_create_ingredients(names):
+    """
+    `{name: ingredient_id}` of `names`, creating the missing ones, in three queries at most
+    """
+    names = set(names)
+    if not names:
+        return {}
+
+    existing = dict(Ingredient.objects.filter(name__in=names).values_list('name', 'pk'))
+    missing = names - existing.keys()
+    if missing:
+        # Concurrent indexing may create the same names, conflicts are read back below
+        Ingredient.objects.bulk_create([Ingredient(name=name) for name in missing], ignore_conflicts=True)
+        existing.update(Ingredient.objects.filter(name__in=missing).values_list('name', 'pk'))
+    return existing
+
+
+def index_recipes(recipe_ids):
+    """
+    Rebuild the ingredient links of the given recipes from their ingredients blocks
+    """
+    recipe_ids = list(recipe_ids)
+    if not recipe_ids:
+        return
+
+    names = defaultdict(list)
+    for recipe_id, content in RecipeSpecialBlock.objects.filter(
+        recipe_id__in=recipe_ids,
+        type=RecipeSpecialBlock.INGREDIENTS,
+    ).values_list('recipe_id', 'content'):
+        names[recipe_id] = normalize_ingredients((content or {}).get('items', []))
+
+    with transaction.atomic():
+        ingredient_ids = get_or_create_ingredients(name for recipe_names in names.values() for name in recipe_names)
+        RecipeIngredient.objects.filter(recipe_id__in=recipe_ids).delete()
+        RecipeIngredient.objects.bulk_create([
+            RecipeIngredient(recipe_id=recipe_id, ingredient_id=ingredient_ids[name])
+            for recipe_id, recipe_names in names.items()
+            for name in recipe_names
+        ])
+
+
+def cook_with(names, queryset=None, limit=20, max_missing=None):
+    """
+    Public recipes best covered by the ingredient `names`, as `(recipe, matched, missing)`
+
+    Candidates come from the inverted `(ingredient, recipe)` index, so only
+    recipes sharing an ingredient with `names` are read, and are ranked in
+    the database: fewest missing ingredients first, then most matched.
+    `missing` lists the names of the ingredients still needed.
+    """
+    ingredient_ids = list(Ingredient.objects.filter(name__in=normalize_ingredients(names)).values_list('pk', flat=True))
+    if not ingredient_ids:
+        return []
+
+    totals = RecipeIngredient.objects.filter(
+        recipe=OuterRef('recipe'),
+    ).order_by().values('recipe').annotate(count=Count('pk')).values('count')
+    ranked = RecipeIngredient.objects.filter(
+        ingredient_id__in=ingredient_ids,
+        recipe__in=Recipe.objects.public(),
+    ).values('recipe').annotate(
+        matched=Count('pk'),
+        missing=Subquery(totals, output_field=IntegerField()) - Count('pk'),
+    ).order_by('missing', '-matched', 'recipe')
+    if max_missing is not None:
+        ranked = ranked.filter(missing__lte=max_missing)
+    ranked = list(ranked.values_list('recipe', 'matched')[:limit])
+
+    recipe_ids = [recipe_id for recipe_id, _ in ranked]
+    missing = defaultdict(list)
+    for recipe_id, name in RecipeIngredient.objects.filter(
+        recipe_id__in=recipe_ids,
+    ).exclude(ingredient_id__in=ingredient_ids).order_by('ingredient__name').values_list('recipe_id', 'ingredient__name'):
+        missing[recipe_id].append(name)
+
+    queryset = queryset if queryset is not None else Recipe.objects.all()
+    recipes = queryset.in_bulk(recipe_ids)
+    return [
+        (recipes[recipe_id], matched, missing[recipe_id])
+        for recipe_id, matched in ranked
+        if recipe_id in recipes
+    ]
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.recipes.similarity import build_neighbors
+
+
+class Command(BaseCommand):
+    help = "Precompute the most similar recipes of every public recipe from tags, ingredients and macronutrients."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--neighbors',
+            type=int,
+            default=settings.RECIPE_NEIGHBORS,
+            help="Similar recipes kept per recipe.",
+        )
+
+    def handle(self, *args, **options):
+        built = build_neighbors(options['neighbors'])
+        self.stdout.write(self.style.SUCCESS(f"Built neighbors for {built} recipes."))
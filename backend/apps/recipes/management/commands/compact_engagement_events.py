@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.recipes.rollups import compact_events, expire_events
+
+
+class Command(BaseCommand):
+    help = "Delete expired engagement events and fold rolled up months into hourly rows, run it on a schedule."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-months',
+            type=int,
+            default=settings.RECIPE_EVENT_RETENTION_MONTHS,
+            help="Months of engagement events to keep.",
+        )
+
+    def handle(self, *args, **options):
+        expired = expire_events(options['retention_months'])
+        compacted = compact_events()
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {expired} expired events, compaction removed {compacted} rows."
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from apps.recipes.exporting import catalogue_formats, get_exporter, iter_catalogue
+from apps.recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = "Export the recipe catalogue as JSON Lines, CSV, YAML, Markdown, text or HTML."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(catalogue_formats()), default='jsonl')
+        parser.add_argument('--output', help="File to write to, defaults to stdout.")
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--public-only', action='store_true', help="Export published public recipes only.")
+
+    def handle(self, *args, **options):
+        if options['public_only']:
+            queryset = Recipe.objects.public()
+        else:
+            queryset = Recipe.objects.filter(is_deleted=False)
+
+        exporter = get_exporter(options['format'], catalogue=True)
+        documents = iter_catalogue(queryset, chunk_size=options['chunk_size'])
+
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as file:
+                file.writelines(exporter.render(documents))
+            self.stdout.write(self.style.SUCCESS(f"Recipes exported to {options['output']}."))
+        else:
+            for chunk in exporter.render(documents):
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,46 @@
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from apps.recipes.importing import READERS, RecipeImporter
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Import recipes from a JSON Lines or CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--author', required=True, help="Username or email of the recipes author.")
+        parser.add_argument('--format', choices=sorted(READERS), help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in READERS:
+            raise CommandError(f"Unsupported format '{file_format}', use --format.")
+
+        author = User.objects.filter(
+            Q(username=options['author']) | Q(email=options['author'])
+        ).first()
+        if author is None:
+            raise CommandError(f"User '{options['author']}' does not exist.")
+
+        importer = RecipeImporter(author, batch_size=options['batch_size'])
+        with open(path, newline='', encoding='utf-8') as file:
+            for imported in importer.run(READERS[file_format](file)):
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"{imported} recipes imported ({importer.throughput:.0f}/s)")
+
+        for line, errors in importer.errors:
+            self.stderr.write(f"Line {line}: {errors}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {importer.imported} recipes in {importer.elapsed:.1f}s "
+            f"({importer.throughput:.0f} recipes/s), skipped {len(importer.errors)} invalid rows."
+        ))
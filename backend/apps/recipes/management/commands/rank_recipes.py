@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from apps.recipes.feeds import rank_all
+
+
+class Command(BaseCommand):
+    help = "Rebuild the popular and trending recipe feeds from the statistics rollups, run it on a schedule."
+
+    def handle(self, *args, **options):
+        ranked = rank_all()
+        self.stdout.write(self.style.SUCCESS(
+            f"Ranked {ranked['popular']} popular and {ranked['trending']} trending recipes."
+        ))
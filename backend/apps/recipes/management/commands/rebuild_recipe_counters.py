@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from apps.recipes.models import Recipe, Like, EngagementEvent, RecipeDailyStats, StatsRollup
+from apps.recipes.rollups import ROLLUP_NAME
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalculate the stored likes/views counters of every recipe from the Like table, "
+        "the daily statistics rollups and the view events not rolled up yet."
+    )
+
+    def _subquery(self, queryset, aggregate):
+        values = queryset.filter(
+            recipe=OuterRef('pk')
+        ).order_by().values('recipe').annotate(
+            value=aggregate
+        ).values('value')
+        return Coalesce(Subquery(values, output_field=IntegerField()), Value(0))
+
+    def handle(self, *args, **kwargs):
+        # Expired events only survive in the rollups, so views rolled up are read from there
+        state = StatsRollup.objects.filter(name=ROLLUP_NAME).first()
+        events = EngagementEvent.objects.filter(type=EngagementEvent.VIEW)
+        views_count = Value(0)
+        if state is not None:
+            events = events.filter(bucket__gte=state.rolled_up_to)
+            views_count = self._subquery(RecipeDailyStats.objects.all(), Sum('views'))
+
+        updated = Recipe.objects.update(
+            likes_count=self._subquery(Like.objects.all(), Count('pk')),
+            views_count=views_count + self._subquery(events, Sum('count')),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt counters for {updated} recipes."))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.recipes import search
+from apps.recipes.batching import iter_id_batches
+from apps.recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index of all recipes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            self.stdout.write(self.style.WARNING("Full-text search is not available on this database."))
+            return
+
+        count = 0
+        for batch in iter_id_batches(Recipe.objects.all(), options['batch_size']):
+            search.index_recipes(batch)
+            count += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} recipes."))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from apps.recipes.collaborative import build_like_neighbors, refresh_recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the stale recipe recommendation lists of users, run it on a schedule. "
+        "With --full, rebuild the recipes liked together first and recompute every list."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help="Rebuild the item-item model and every recommendation list.",
+        )
+
+    def handle(self, *args, **options):
+        if options['full']:
+            built = build_like_neighbors()
+            self.stdout.write(f"Built liked together neighbors for {built} recipes.")
+
+        refreshed = refresh_recommendations(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(f"Refreshed recommendations for {refreshed} users."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from apps.recipes.rollups import roll_up
+
+
+class Command(BaseCommand):
+    help = "Count new recipe views and likes into the hourly and daily statistics rollups, run it on a schedule."
+
+    def handle(self, *args, **options):
+        totals = roll_up()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rolled up {totals['views']} views and {totals['likes']} likes."
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from apps.recipes import nutrition
+from apps.recipes.batching import iter_id_batches
+from apps.recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = "Copy the nutrition of all recipes from their calories and macronutrients blocks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        count = 0
+        for batch in iter_id_batches(Recipe.objects.all(), options['batch_size']):
+            nutrition.sync_recipes(batch)
+            count += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Synced the nutrition of {count} recipes."))
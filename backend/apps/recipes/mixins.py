@@ -0,0 +1,165 @@
+import hashlib
+
+from django.db.models import Exists, OuterRef
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from apps.recipes import caching
+from apps.recipes.models import Like
+
+
+class LikedRecipesMixin:
+    """
+    Resolve `is_liked` for a whole page of recipes with a single query
+
+    The IDs of the page recipes liked by the requesting user are passed to the
+    serializer context as `liked_recipe_ids`.
+    """
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            self.liked_recipe_ids = self.get_liked_recipe_ids(page)
+        return page
+
+    def get_liked_recipe_ids(self, recipes):
+        user = self.request.user
+        if not user.is_authenticated or not recipes:
+            return set()
+
+        return set(
+            Like.objects.filter(
+                user=user,
+                recipe__in=[recipe.pk for recipe in recipes],
+            ).values_list('recipe_id', flat=True)
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if hasattr(self, 'liked_recipe_ids'):
+            context['liked_recipe_ids'] = self.liked_recipe_ids
+        return context
+
+
+class CachedListMixin:
+    """
+    Serve successful list responses to anonymous users from the response cache
+
+    Entries are keyed on the normalized query parameters and the catalogue
+    version, which every recipe, block and tag change bumps.
+    """
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+
+        scope = type(self).__name__
+        data = caching.get_list_response(scope, request)
+        if data is not None:
+            return Response(data)
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            caching.set_list_response(scope, request, response.data)
+        return response
+
+
+class CachedDetailMixin:
+    """
+    Serve successful detail responses to anonymous users from the response cache
+
+    Entries are keyed on the lookup, the representation and the normalized
+    query parameters and are only served while the version of their recipe
+    is unchanged. Validators of a `ConditionalRecipeMixin` view are cached
+    along, so conditional requests are answered from the cache too.
+    """
+    def record_view(self, recipe_id):
+        """
+        Called with the recipe of every response served from the cache
+        """
+
+    def get_object(self):
+        obj = super().get_object()
+        # Read the version before serializing so a concurrent change expires the entry
+        self.cached_recipe = obj
+        self.cached_version = caching.get_version(caching.recipe_version_key(obj.pk))
+        return obj
+
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+
+        scope = type(self).__name__
+        lookup = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        entry = caching.get_detail_response(scope, request, lookup)
+        if entry is not None:
+            self.record_view(entry['recipe'])
+            self.validators = entry['validators']
+            if self.validators is not None:
+                not_modified = self.get_not_modified_response()
+                if not_modified is not None:
+                    return not_modified
+            return Response(entry['data'])
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK and hasattr(self, 'cached_recipe'):
+            caching.set_detail_response(scope, request, lookup, self.cached_recipe, {
+                'recipe': self.cached_recipe.pk,
+                'data': response.data,
+                'validators': getattr(self, 'validators', None),
+            }, self.cached_version)
+        return response
+
+
+class ConditionalRecipeMixin:
+    """
+    Weak `ETag` and `Last-Modified` validators for single recipe responses
+
+    Views call `get_not_modified_response(recipe)` once the recipe is fetched
+    and its visibility checked, and skip serialization when it returns a 304.
+    The ETag covers `updated_at`, which block and tag changes bump, the
+    requesting user and whether they liked the recipe, and the
+    representation. The counters are left out, a client copy may show
+    them stale, which is why the ETag is weak.
+    """
+    validators = None
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if user.is_authenticated:
+            # Read along with the recipe, a 304 still costs a single query
+            queryset = queryset.annotate(liked=Exists(Like.objects.filter(user=user, recipe=OuterRef('pk'))))
+        return queryset
+
+    def get_etag(self, recipe):
+        request = self.request
+        parts = [
+            recipe.pk,
+            recipe.updated_at.isoformat(),
+            request.user.pk or '',
+            getattr(recipe, 'liked', False),
+            request.accepted_media_type,
+            caching.normalize_query(request.query_params),
+        ]
+        return 'W/' + quote_etag(hashlib.md5(':'.join(map(str, parts)).encode('utf-8')).hexdigest())
+
+    def get_not_modified_response(self, recipe=None):
+        """
+        Return a 304 response when the client copy of `recipe` is current, or None
+        """
+        if recipe is not None:
+            self.validators = (self.get_etag(recipe), int(recipe.updated_at.timestamp()))
+        if self.validators is None:
+            return None
+
+        etag, last_modified = self.validators
+        return get_conditional_response(self.request, etag=etag, last_modified=last_modified)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.validators is not None and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            etag, last_modified = self.validators
+            response.headers['ETag'] = etag
+            response.headers['Last-Modified'] = http_date(last_modified)
+        return response
@@ -1,11 +1,18 @@
+import hashlib
 import uuid
 
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Case, F, IntegerField, Prefetch, Q, Value, When, prefetch_related_objects
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.utils import timezone
-from django.utils.text import slugify
 from rest_framework import serializers
 
+from apps.recipes.fields import FullTextField
+from apps.recipes.hyperloglog import HyperLogLog
+from apps.recipes.slugs import save_with_slug
+
 User = get_user_model()
 
 
@@ -25,14 +32,7 @@ class Tag(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.name)
-
-            base_slug = self.slug
-            counter = 1
-            while Tag.objects.filter(slug=self.slug).exists():
-                self.slug = f'{base_slug}-{counter}'
-                counter += 1
-
+            return save_with_slug(self, self.name, super().save, *args, **kwargs)
         super().save(*args, **kwargs)
 
 
@@ -95,12 +95,77 @@ class TagSuggestion(models.Model):
         self.save()
 
 
+class Ingredient(models.Model):
+    """
+    Normalized ingredient name, '2 cups of Eggs' and 'egg' are both 'egg'
+    """
+    name = models.CharField(max_length=128, unique=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
 class RecipeStatus(models.TextChoices):
     DRAFT = 'draft', 'Draft'
     PUBLISHED = 'published', 'Published'
     PENDING = 'pending', 'Pending Moderation'
 
 
+# Recipes anyone may see, shared by the public querysets and their partial indexes
+PUBLIC_RECIPES = Q(
+    status=RecipeStatus.PUBLISHED,
+    is_private=False,
+    is_banned=False,
+    is_deleted=False,
+)
+
+
+class RecipeQuerySet(models.QuerySet):
+    def public(self):
+        """
+        Published recipes that are not private, banned or deleted
+        """
+        return self.filter(PUBLIC_RECIPES)
+
+    def visible_to(self, user):
+        """
+        Public recipes plus the non-deleted recipes authored by `user`
+        """
+        if not user.is_authenticated:
+            return self.public()
+        return self.filter(PUBLIC_RECIPES | Q(author=user, is_deleted=False))
+
+    def with_details(self):
+        """
+        Load the author, tags and ordered blocks needed to fully serialize recipes
+        """
+        return self.select_related('author').prefetch_related(*detail_prefetches())
+
+    def touch(self):
+        """
+        Bump `updated_at` after a change to blocks or tags, which the ETags are derived from
+        """
+        return self.update(updated_at=timezone.now())
+
+
+def detail_prefetches():
+    return [
+        Prefetch('tags', queryset=Tag.objects.order_by('name')),
+        Prefetch('blocks', queryset=RecipeBlock.objects.order_by('order')),
+        Prefetch('special_blocks', queryset=RecipeSpecialBlock.objects.order_by('order')),
+    ]
+
+
+def prefetch_details(recipes):
+    """
+    Load the tags and ordered blocks of already fetched recipes, as `with_details()` does
+    """
+    prefetch_related_objects(recipes, *detail_prefetches())
+
+
 class Recipe(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     title = models.CharField(max_length=64)
@@ -110,7 +175,7 @@ class Recipe(models.Model):
     final_image = models.ImageField(upload_to='static/recipes/', null=True, blank=True)
     source_url = models.URLField(blank=True, null=True)
 
-    # Macronutrient information
+    # Macronutrient information, copied from the special blocks by `apps.recipes.nutrition`
     calories = models.PositiveIntegerField(null=True, blank=True)
     protein = models.FloatField(null=True, blank=True)
     fat = models.FloatField(null=True, blank=True)
@@ -119,6 +184,8 @@ class Recipe(models.Model):
     # Relations
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='recipes')
     tags = models.ManyToManyField(Tag, related_name='recipes', blank=True)
+    # Derived from the ingredients block by `apps.recipes.ingredients`, never edited directly
+    ingredients = models.ManyToManyField(Ingredient, through='RecipeIngredient', related_name='recipes', blank=True)
 
     # Status
     is_private = models.BooleanField(default=False)
@@ -127,6 +194,12 @@ class Recipe(models.Model):
     is_deleted = models.BooleanField(default=False)
     deleted_at = models.DateTimeField(null=True, blank=True)
 
+    # Counters, maintained with F() updates and rebuilt by `rebuild_recipe_counters`
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    views_count = models.PositiveIntegerField(default=0, editable=False)
+    # Estimate of the sketch in `RecipeVisitors`, kept here for lists and sorting
+    unique_visitors = models.PositiveIntegerField(default=0, editable=False)
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -136,15 +209,52 @@ class Recipe(models.Model):
     meta_title = models.CharField(max_length=64, blank=True)
     meta_description = models.CharField(max_length=256, blank=True)
 
+    COUNTER_FIELDS = ('likes_count', 'views_count', 'unique_visitors')
+    # Recipe fields of the search documents, the blocks are indexed on their own signals
+    SEARCH_FIELDS = ('title', 'description')
+
+    objects = RecipeQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['id', 'slug'], name='recipe_id_slug_idx'),
+            # Public feed orderings
+            models.Index(fields=['created_at', 'id'], condition=PUBLIC_RECIPES, name='recipe_public_created_idx'),
+            models.Index(fields=['published_at', 'id'], condition=PUBLIC_RECIPES, name='recipe_public_published_idx'),
+            models.Index(fields=['likes_count', 'id'], condition=PUBLIC_RECIPES, name='recipe_public_likes_idx'),
+            # Nutrition ranges of the public lists, the leading column is scanned and the others checked in the index
+            models.Index(fields=['calories', 'protein', 'fat', 'carbs'], condition=PUBLIC_RECIPES, name='recipe_public_calories_idx'),
+            models.Index(fields=['protein', 'calories'], condition=PUBLIC_RECIPES, name='recipe_public_protein_idx'),
+            # Own recipes of an author, next to the public ones
+            models.Index(fields=['author', 'created_at'], condition=Q(is_deleted=False), name='recipe_live_author_idx'),
+            # Sort keys of the recipe lists, the primary key is the keyset tie-breaker
+            models.Index(fields=['created_at', 'id'], condition=Q(is_deleted=False), name='recipe_live_created_idx'),
+            models.Index(fields=['published_at', 'id'], condition=Q(is_deleted=False), name='recipe_live_published_idx'),
+            models.Index(fields=['likes_count', 'id'], condition=Q(is_deleted=False), name='recipe_live_likes_idx'),
+            models.Index(fields=['views_count', 'id'], condition=Q(is_deleted=False), name='recipe_live_views_idx'),
+            models.Index(fields=['title', 'id'], condition=Q(is_deleted=False), name='recipe_live_title_idx'),
         ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_search_values = instance._search_values()
+        return instance
+
+    def _search_values(self):
+        # Deferred fields are left unloaded
+        return tuple(self.__dict__.get(field) for field in self.SEARCH_FIELDS)
+
+    def search_fields_changed(self):
+        """
+        True unless the title and description are known to match the stored ones
+        """
+        saved = getattr(self, '_saved_search_values', None)
+        return saved is None or saved != self._search_values()
+
     def clean(self):
         super().clean()
 
@@ -154,16 +264,31 @@ class Recipe(models.Model):
     def save(self, *args, **kwargs):
         self.full_clean()
 
-        if not self.slug:
-            self.slug = slugify(self.title)
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Never write back counters that may have been incremented since this instance was loaded
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
 
-            base_slug = self.slug
-            counter = 1
-            while Recipe.objects.filter(slug=self.slug).exists():
-                self.slug = f'{base_slug}-{counter}'
-                counter += 1
+        update_fields = kwargs.get('update_fields')
+        if self.stamp_published() and update_fields is not None and 'published_at' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'published_at']
 
-        super().save(*args, **kwargs)
+        if not self.slug:
+            save_with_slug(self, self.title, super().save, *args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+        self._saved_search_values = self._search_values()
+
+    def stamp_published(self, now=None):
+        """
+        Set `published_at` the first time the recipe is published, returns True when it was set
+        """
+        if self.status != RecipeStatus.PUBLISHED or self.published_at is not None:
+            return False
+        self.published_at = now or timezone.now()
+        return True
 
     def delete(self, using=None, keep_parents=False):
         self.is_deleted = True
@@ -178,33 +303,70 @@ class Recipe(models.Model):
             return False
         return timezone.now() >= self.scheduled_permanent_deletion_time()
 
+    def is_public(self):
+        """
+        In-memory counterpart of `Recipe.objects.public()`
+        """
+        return (
+            self.status == RecipeStatus.PUBLISHED and
+            not self.is_private and
+            not self.is_banned and
+            not self.is_deleted
+        )
+
+    def _increment(self, field, amount):
+        Recipe.objects.filter(pk=self.pk).update(**{field: F(field) + amount})
+
+    def like(self, user):
+        """
+        Returns True if a new like was recorded
+        """
+        with transaction.atomic():
+            like, created = Like.objects.get_or_create(user=user, recipe=self)
+            if created:
+                self._increment('likes_count', 1)
+                EngagementEvent.build(self.pk, EngagementEvent.LIKE, user_viewer(user)).save()
+                UserRecommendations.objects.filter(user=user).update(is_stale=True)
+        return created
+
+    def unlike(self, user):
+        """
+        Returns True if an existing like was removed
+        """
+        with transaction.atomic():
+            deleted, _ = Like.objects.filter(user=user, recipe=self).delete()
+            if deleted:
+                self._increment('likes_count', -1)
+                EngagementEvent.build(self.pk, EngagementEvent.UNLIKE, user_viewer(user)).save()
+                UserRecommendations.objects.filter(user=user).update(is_stale=True)
+        return bool(deleted)
+
     def toggle_like(self, user):
         if not user.is_authenticated:
             return None
 
-        like, created = Like.objects.get_or_create(user=user, recipe=self)
-        if not created:
-            like.delete()
-            return False
-        return True
+        if self.like(user):
+            return True
+        self.unlike(user)
+        return False
 
     def is_liked_by(self, user):
         if not user.is_authenticated:
             return False
         return self.likes.filter(user=user).exists()
 
-    @property
-    def likes_count(self):
-        return self.likes.count()
-
     def add_view(self, user):
+        """
+        Record a view right away, request handlers go through the view buffer instead
+        """
         if not user.is_authenticated:
             return
-        View.objects.get_or_create(recipe=self, user=user)
 
-    @property
-    def views_count(self):
-        return self.views.count()
+        viewer = user_viewer(user)
+        with transaction.atomic():
+            EngagementEvent.build(self.pk, EngagementEvent.VIEW, viewer).save()
+            self._increment('views_count', 1)
+            RecipeVisitors.add({self.pk: [viewer]})
 
 
 class RecipeSpecialBlock(models.Model):
@@ -222,7 +384,7 @@ class RecipeSpecialBlock(models.Model):
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='special_blocks')
-    type = models.CharField(max_length=32, choices=BLOCK_TYPE_CHOICES, unique=True)
+    type = models.CharField(max_length=32, choices=BLOCK_TYPE_CHOICES)
     content = models.JSONField(
         null=True,
         blank=True,
@@ -304,6 +466,20 @@ class RecipeSpecialBlock(models.Model):
         super().save(*args, **kwargs)
 
 
+class RecipeIngredient(models.Model):
+    """
+    Ingredient of a recipe, the `(ingredient, recipe)` index is the inverted index of ingredient search
+    """
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='ingredient_links')
+    ingredient = models.ForeignKey(Ingredient, on_delete=models.CASCADE, related_name='recipe_links')
+
+    class Meta:
+        unique_together = ('recipe', 'ingredient')
+        indexes = [
+            models.Index(fields=['ingredient', 'recipe'], name='ingredient_recipe_idx'),
+        ]
+
+
 class RecipeBlock(models.Model):
     TEXT = 'text'
     IMAGE = 'image'
@@ -370,6 +546,34 @@ class RecipeBlock(models.Model):
         super().save(*args, **kwargs)
 
 
+class RecipeSearchDocument(models.Model):
+    """
+    Row of the recipe full-text index
+
+    The table is an SQLite FTS5 virtual table created and kept in sync by
+    `apps.recipes.search`, so it is not managed by Django.
+    """
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_constraint=False,
+        related_name='search_document',
+    )
+    title = models.TextField()
+    description = models.TextField()
+    body = models.TextField()
+    ingredients = models.TextField()
+
+    # FTS5 hidden columns
+    document = FullTextField(db_column='recipes_recipe_search')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'recipes_recipe_search'
+
+
 class Like(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='likes')
@@ -383,16 +587,227 @@ class Like(models.Model):
         ]
 
 
-class View(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='views')
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='viewed_recipes')
-    timestamp = models.DateTimeField(auto_now_add=True)
+def viewer_hash(value):
+    """
+    Signed 64-bit key identifying a viewer in engagement events without storing who it is
+    """
+    digest = hashlib.blake2b(value.encode('utf-8'), digest_size=8, key=settings.SECRET_KEY.encode('utf-8')[:64]).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def user_viewer(user):
+    return viewer_hash(f'user:{user.pk}')
+
+
+class EngagementEvent(models.Model):
+    """
+    Append-only log of recipe views and likes
+
+    Rows are compact: an integer key, a small-int type, the timestamp
+    truncated to the minute and a hashed viewer. Repeated events of a viewer
+    in the same bucket are stored once with their `count`. `month` (YYYYMM)
+    is the partition key used by retention and compaction, which work a whole
+    month at a time.
+    """
+    VIEW = 1
+    LIKE = 2
+    UNLIKE = 3
+
+    TYPE_CHOICES = [
+        (VIEW, 'View'),
+        (LIKE, 'Like'),
+        (UNLIKE, 'Unlike'),
+    ]
+
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='+', db_index=False)
+    type = models.PositiveSmallIntegerField(choices=TYPE_CHOICES)
+    month = models.PositiveIntegerField()
+    bucket = models.DateTimeField()
+    viewer = models.BigIntegerField()
+    count = models.PositiveIntegerField(default=1)
 
     class Meta:
-        unique_together = ('recipe', 'user')
         indexes = [
-            models.Index(fields=['recipe', 'timestamp']),
+            models.Index(fields=['month', 'recipe'], name='engagement_month_idx'),
+            models.Index(fields=['bucket', 'type'], name='engagement_bucket_idx'),
+            models.Index(fields=['recipe', 'type', 'bucket'], name='engagement_recipe_idx'),
+        ]
+
+    @staticmethod
+    def bucket_for(timestamp):
+        return timestamp.replace(second=0, microsecond=0)
+
+    @staticmethod
+    def month_for(bucket):
+        return bucket.year * 100 + bucket.month
+
+    @classmethod
+    def build(cls, recipe_id, event_type, viewer, timestamp=None, count=1):
+        bucket = cls.bucket_for(timestamp or timezone.now())
+        return cls(
+            recipe_id=recipe_id,
+            type=event_type,
+            month=cls.month_for(bucket),
+            bucket=bucket,
+            viewer=viewer,
+            count=count,
+        )
+
+
+class RecipeVisitors(models.Model):
+    """
+    HyperLogLog sketch of the distinct viewers of a recipe, users and anonymous clients alike
+    """
+    recipe = models.OneToOneField(Recipe, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    sketch = models.BinaryField()
+
+    class Meta:
+        verbose_name = 'Recipe Visitors'
+        verbose_name_plural = 'Recipe Visitors'
+
+    @classmethod
+    def add(cls, viewers):
+        """
+        Merge `{recipe_id: viewer keys}` into the sketches and refresh `Recipe.unique_visitors`
+
+        Writes every sketch of the batch with one insert and one update,
+        whatever the number of views.
+        """
+        if not viewers:
+            return
+
+        with transaction.atomic():
+            existing = {
+                row.recipe_id: row
+                for row in cls.objects.select_for_update().filter(recipe_id__in=viewers)
+            }
+            created = []
+            estimates = {}
+            for recipe_id, keys in viewers.items():
+                row = existing.get(recipe_id)
+                if row is None:
+                    row = cls(recipe_id=recipe_id)
+                    created.append(row)
+                sketch = HyperLogLog(row.sketch)
+                sketch.update(keys)
+                row.sketch = bytes(sketch)
+                estimates[recipe_id] = sketch.count()
+
+            cls.objects.bulk_create(created, batch_size=1000)
+            cls.objects.bulk_update(existing.values(), ['sketch'], batch_size=1000)
+            Recipe.objects.filter(pk__in=estimates).update(
+                unique_visitors=Case(
+                    *[When(pk=recipe_id, then=Value(estimate)) for recipe_id, estimate in estimates.items()],
+                    default=F('unique_visitors'),
+                    output_field=IntegerField(),
+                )
+            )
+
+
+class RecipeStats(models.Model):
+    """
+    Views and likes of a recipe in the period starting at `bucket`
+
+    Maintained by the `rollup_recipe_statistics` command, statistics read
+    these rows instead of the engagement events.
+    """
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='+')
+    bucket = models.DateTimeField()
+    views = models.PositiveIntegerField(default=0)
+    likes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+        unique_together = ('recipe', 'bucket')
+
+
+class RecipeHourlyStats(RecipeStats):
+    class Meta(RecipeStats.Meta):
+        verbose_name = 'Hourly Recipe Statistics'
+        verbose_name_plural = 'Hourly Recipe Statistics'
+
+
+class RecipeDailyStats(RecipeStats):
+    class Meta(RecipeStats.Meta):
+        verbose_name = 'Daily Recipe Statistics'
+        verbose_name_plural = 'Daily Recipe Statistics'
+
+
+class StatsRollup(models.Model):
+    """
+    Bucket up to which engagement events are counted in the statistics rollups
+    """
+    name = models.CharField(max_length=32, primary_key=True)
+    rolled_up_to = models.DateTimeField()
+
+
+class RecipeRanking(models.Model):
+    """
+    Position of a recipe in a ranked feed, rebuilt by the `rank_recipes` command
+
+    Feeds are read with an indexed range scan over `(feed, position)`
+    instead of aggregating engagement on every request.
+    """
+    POPULAR = 'popular'
+    TRENDING = 'trending'
+
+    FEED_CHOICES = [
+        (POPULAR, 'Popular'),
+        (TRENDING, 'Trending'),
+    ]
+
+    feed = models.CharField(max_length=16, choices=FEED_CHOICES)
+    position = models.PositiveIntegerField()
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='rankings')
+    score = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['feed', 'position']
+        unique_together = ('feed', 'position')
+
+
+class RecipeNeighbor(models.Model):
+    """
+    The `position`-th most similar public recipe to `recipe`, rebuilt by `build_recipe_neighbors`
+    """
+    CONTENT = 'content'
+    LIKES = 'likes'
+
+    KIND_CHOICES = [
+        (CONTENT, 'Content'),
+        (LIKES, 'Liked together'),
+    ]
+
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='+')
+    neighbor = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='neighbor_of')
+    position = models.PositiveIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['kind', 'recipe', 'position']
+        unique_together = ('kind', 'recipe', 'position')
+
+
+class UserRecommendations(models.Model):
+    """
+    Recipes recommended to a user from the recipes liked together with theirs
+
+    Refreshed offline by `refresh_recommendations`. A like or unlike marks
+    the list stale and the next run recomputes only the stale lists.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='recipe_recommendations')
+    # `[[recipe_id, score], ...]`, best first
+    recipes = models.JSONField(default=list)
+    is_stale = models.BooleanField(default=False)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'User Recommendations'
+        verbose_name_plural = 'User Recommendations'
+        indexes = [
+            models.Index(fields=['user'], condition=Q(is_stale=True), name='recommendations_stale_idx'),
         ]
 
 
@@ -0,0 +1,48 @@
+from collections import defaultdict
+
+from apps.recipes.models import Recipe, RecipeSpecialBlock
+
+
+# Recipe columns copied from the special blocks, filtered by range in the recipe lists
+NUTRITION_FIELDS = ('calories', 'protein', 'fat', 'carbs')
+
+NUTRITION_BLOCKS = (RecipeSpecialBlock.CALORIES, RecipeSpecialBlock.MACRONUTRIENTS)
+
+
+def nutrition_values(blocks):
+    """
+    Nutrition columns of a recipe from its `(type, content)` special blocks, None when not given
+
+    The calories block wins over a `calories` key of the macronutrients block.
+    """
+    values = dict.fromkeys(NUTRITION_FIELDS)
+    for block_type, content in blocks:
+        content = content or {}
+        if block_type == RecipeSpecialBlock.CALORIES:
+            values['calories'] = content.get('kcal')
+        elif block_type == RecipeSpecialBlock.MACRONUTRIENTS:
+            values.update(
+                (field, content.get(field)) for field in NUTRITION_FIELDS if values[field] is None
+            )
+    return values
+
+
+def sync_recipes(recipe_ids):
+    """
+    Copy the nutrition of the given recipes from their special blocks, in two queries
+    """
+    recipe_ids = list(recipe_ids)
+    if not recipe_ids:
+        return
+
+    blocks = defaultdict(list)
+    for recipe_id, block_type, content in RecipeSpecialBlock.objects.filter(
+        recipe_id__in=recipe_ids,
+        type__in=NUTRITION_BLOCKS,
+    ).values_list('recipe_id', 'type', 'content'):
+        blocks[recipe_id].append((block_type, content))
+
+    Recipe.objects.bulk_update(
+        [Recipe(pk=recipe_id, **nutrition_values(blocks[recipe_id])) for recipe_id in recipe_ids],
+        NUTRITION_FIELDS,
+    )
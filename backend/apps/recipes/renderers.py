@@ -1,4 +1,6 @@
+from rest_framework.negotiation import DefaultContentNegotiation
 from rest_framework.renderers import BaseRenderer
+from types import SimpleNamespace
 import json
 
 
@@ -9,3 +11,12 @@ class PlainTextRenderer(BaseRenderer):
     def render(self, data, media_type=None, renderer_context=None):
         content = json.dumps(data, ensure_ascii=False, indent=4)
         return content.encode('utf-8')
+
+
+class ExportContentNegotiation(DefaultContentNegotiation):
+    """
+    Content negotiation for views that read `?format=` themselves
+
+    Renderers are picked from the Accept header only, `?format=` names the export format.
+    """
+    settings = SimpleNamespace(URL_FORMAT_OVERRIDE=None)
@@ -0,0 +1,177 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from apps.recipes.models import (
+    EngagementEvent,
+    RecipeHourlyStats,
+    RecipeDailyStats,
+    StatsRollup,
+)
+
+
+ROLLUP_NAME = 'recipes'
+
+# Rollup table and bucket truncation per granularity
+ROLLUPS = [
+    (RecipeHourlyStats, TruncHour),
+    (RecipeDailyStats, TruncDay),
+]
+
+# Engagement event type and the rollup column it is counted in
+EVENTS = [
+    (EngagementEvent.VIEW, 'views'),
+    (EngagementEvent.LIKE, 'likes'),
+]
+
+
+def _count_events(event_type, trunc, start, end):
+    queryset = EngagementEvent.objects.filter(type=event_type, bucket__lt=end)
+    if start is not None:
+        queryset = queryset.filter(bucket__gte=start)
+    return (
+        queryset
+        .annotate(period=trunc('bucket'))
+        .values_list('recipe_id', 'period')
+        .annotate(total=Sum('count'))
+        .order_by()
+    )
+
+
+def _apply(model, deltas):
+    """
+    Add `{(recipe_id, bucket): {column: count}}` to the rollup rows of `model`
+    """
+    if not deltas:
+        return
+
+    existing = {
+        (row.recipe_id, row.bucket): row
+        for row in model.objects.filter(
+            recipe_id__in={recipe_id for recipe_id, _ in deltas},
+            bucket__gte=min(bucket for _, bucket in deltas),
+        )
+    }
+
+    created = []
+    updated = []
+    for key, counts in deltas.items():
+        row = existing.get(key)
+        if row is None:
+            row = model(recipe_id=key[0], bucket=key[1])
+            created.append(row)
+        else:
+            updated.append(row)
+        for column, count in counts.items():
+            setattr(row, column, getattr(row, column) + count)
+
+    model.objects.bulk_create(created, batch_size=1000)
+    model.objects.bulk_update(updated, ['views', 'likes'], batch_size=1000)
+
+
+def roll_up(now=None):
+    """
+    Count the view and like events since the previous run into the rollups
+
+    Buckets younger than `RECIPE_STATS_ROLLUP_LAG` seconds are left for the
+    next run, so events still buffered or in flight are not skipped. Returns the number
+    of events counted per rollup column.
+    """
+    now = now or timezone.now()
+    end = now - timedelta(seconds=settings.RECIPE_STATS_ROLLUP_LAG)
+    totals = {column: 0 for _, column in EVENTS}
+
+    with transaction.atomic():
+        state = StatsRollup.objects.select_for_update().filter(name=ROLLUP_NAME).first()
+        start = state.rolled_up_to if state else None
+        if start is not None and start >= end:
+            return totals
+
+        for model, trunc in ROLLUPS:
+            deltas = defaultdict(dict)
+            for event_type, column in EVENTS:
+                for recipe_id, bucket, count in _count_events(event_type, trunc, start, end):
+                    deltas[recipe_id, bucket][column] = count
+            _apply(model, deltas)
+
+        # Every event falls in exactly one bucket of each rollup
+        for counts in deltas.values():
+            for column, count in counts.items():
+                totals[column] += count
+
+        StatsRollup.objects.update_or_create(name=ROLLUP_NAME, defaults={'rolled_up_to': end})
+
+    return totals
+
+
+def shift_month(month, months):
+    """
+    `month` (YYYYMM) moved by `months`
+    """
+    year, month = divmod(month, 100)
+    index = year * 12 + month - 1 + months
+    return index // 12 * 100 + index % 12 + 1
+
+
+def rolled_up_month():
+    """
+    Month of the rollup position, events of earlier months are all rolled up
+    """
+    state = StatsRollup.objects.filter(name=ROLLUP_NAME).first()
+    return EngagementEvent.month_for(state.rolled_up_to) if state else None
+
+
+def expire_events(retention_months):
+    """
+    Delete the events of rolled up months older than `retention_months`, returns the number of rows deleted
+    """
+    rolled_up = rolled_up_month()
+    if rolled_up is None:
+        return 0
+
+    cutoff = shift_month(EngagementEvent.month_for(timezone.now()), -retention_months)
+    deleted, _ = EngagementEvent.objects.filter(month__lt=min(cutoff, rolled_up)).delete()
+    return deleted
+
+
+def compact_events():
+    """
+    Fold the minute buckets of rolled up months into hour buckets
+
+    Each month becomes one row per recipe, type, viewer and hour, which is
+    all the rollups and unique viewer counts need. Returns the number of rows removed.
+    """
+    rolled_up = rolled_up_month()
+    if rolled_up is None:
+        return 0
+
+    months = (
+        EngagementEvent.objects.filter(month__lt=rolled_up)
+        .exclude(bucket__minute=0)
+        .values_list('month', flat=True)
+        .distinct()
+        .order_by('month')
+    )
+
+    removed = 0
+    for month in list(months):
+        with transaction.atomic():
+            events = EngagementEvent.objects.filter(month=month)
+            merged = [
+                EngagementEvent(recipe_id=recipe_id, type=event_type, month=month, bucket=hour, viewer=viewer, count=total)
+                for recipe_id, event_type, viewer, hour, total in (
+                    events.annotate(hour=TruncHour('bucket'))
+                    .values_list('recipe_id', 'type', 'viewer', 'hour')
+                    .annotate(total=Sum('count'))
+                    .order_by()
+                )
+            ]
+            deleted, _ = events.delete()
+            EngagementEvent.objects.bulk_create(merged, batch_size=1000)
+        removed += deleted - len(merged)
+    return removed
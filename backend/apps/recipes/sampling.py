@@ -0,0 +1,115 @@
+import random
+import threading
+import time
+
+from apps.recipes.models import Recipe
+
+
+RANDOM_POOL_TIMEOUT = 60 * 5
+RANDOM_POOL_ATTEMPTS = 3
+
+
+class RandomRecipePool:
+    """
+    In-process pool of the IDs of recipes eligible for random selection
+
+    Picks, additions and removals are O(1). The pool is loaded lazily, kept
+    current by the Recipe signals and reloaded after `timeout` seconds so
+    changes made by other processes are picked up.
+    """
+    def __init__(self, timeout=RANDOM_POOL_TIMEOUT):
+        self.timeout = timeout
+        self._ids = []
+        self._positions = {}
+        self._expires_at = 0
+        self._lock = threading.Lock()
+
+    def _is_loaded(self):
+        return time.monotonic() < self._expires_at
+
+    def eligible(self, queryset):
+        return queryset.public()
+
+    def is_eligible(self, recipe):
+        return recipe.is_public()
+
+    def _load(self):
+        ids = list(self.eligible(Recipe.objects.all()).values_list('pk', flat=True))
+        self._ids = ids
+        self._positions = {pk: position for position, pk in enumerate(ids)}
+        self._expires_at = time.monotonic() + self.timeout
+
+    def invalidate(self):
+        with self._lock:
+            self._expires_at = 0
+
+    def add(self, pk):
+        with self._lock:
+            if self._is_loaded() and pk not in self._positions:
+                self._positions[pk] = len(self._ids)
+                self._ids.append(pk)
+
+    def discard(self, pk):
+        with self._lock:
+            position = self._positions.pop(pk, None)
+            if position is None:
+                return
+
+            last = self._ids.pop()
+            if last != pk:
+                self._ids[position] = last
+                self._positions[last] = position
+
+    def sync(self, recipe):
+        if self.is_eligible(recipe):
+            self.add(recipe.pk)
+        else:
+            self.discard(recipe.pk)
+
+    def choice(self):
+        with self._lock:
+            if not self._is_loaded():
+                self._load()
+            return random.choice(self._ids) if self._ids else None
+
+    def pick(self, queryset=None):
+        """
+        Return a random eligible recipe fetched through `queryset`, or None
+
+        IDs that turn out to be stale are dropped, and the pool is reloaded once
+        if every attempt missed.
+        """
+        queryset = self.eligible(queryset if queryset is not None else Recipe.objects.all())
+
+        for reload in (False, True):
+            if reload:
+                self.invalidate()
+
+            for _ in range(RANDOM_POOL_ATTEMPTS):
+                pk = self.choice()
+                if pk is None:
+                    return None
+
+                recipe = queryset.filter(pk=pk).first()
+                if recipe is not None:
+                    return recipe
+                self.discard(pk)
+
+        return None
+
+
+class StaffRandomRecipePool(RandomRecipePool):
+    """
+    Pool of the recipes superusers may get at random, drafts and private recipes included
+    """
+    def eligible(self, queryset):
+        return queryset.filter(is_banned=False, is_deleted=False)
+
+    def is_eligible(self, recipe):
+        return not recipe.is_banned and not recipe.is_deleted
+
+
+random_recipe_pool = RandomRecipePool()
+staff_random_recipe_pool = StaffRandomRecipePool()
+
+RANDOM_RECIPE_POOLS = (random_recipe_pool, staff_random_recipe_pool)
@@ -0,0 +1,156 @@
+import re
+from collections import defaultdict
+
+from django.db import connections, router
+from django.db.models import F, Q
+
+from apps.recipes.models import (
+    Recipe,
+    RecipeBlock,
+    RecipeSpecialBlock,
+    RecipeSearchDocument,
+)
+
+
+SEARCH_TABLE = RecipeSearchDocument._meta.db_table
+SEARCH_COLUMNS = ('title', 'description', 'body', 'ingredients')
+
+# bm25() weights for recipe_id, title, description, body and ingredients
+RANK_WEIGHTS = (0.0, 10.0, 4.0, 1.0, 6.0)
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _connection():
+    return connections[router.db_for_write(RecipeSearchDocument)]
+
+
+def is_available():
+    """
+    Full-text search is backed by FTS5 and only available on SQLite
+    """
+    return _connection().vendor == 'sqlite'
+
+
+def create_search_index(using):
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+
+    table = connection.ops.quote_name(SEARCH_TABLE)
+    weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+            f"recipe_id UNINDEXED, {', '.join(SEARCH_COLUMNS)}, "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        cursor.execute(f"INSERT INTO {table}({table}, rank) VALUES ('rank', 'bm25({weights})')")
+
+
+def _rowid(recipe_id):
+    """
+    Stable positive 63-bit FTS5 rowid so documents are replaced without scanning the index
+    """
+    return recipe_id.int >> 65
+
+
+def _build_documents(recipe_ids):
+    body = defaultdict(list)
+    for recipe_id, content in RecipeBlock.objects.filter(
+        recipe_id__in=recipe_ids,
+        type=RecipeBlock.TEXT,
+    ).order_by('order').values_list('recipe_id', 'content'):
+        body[recipe_id].append(content or '')
+
+    ingredients = defaultdict(list)
+    for recipe_id, content in RecipeSpecialBlock.objects.filter(
+        recipe_id__in=recipe_ids,
+        type=RecipeSpecialBlock.INGREDIENTS,
+    ).values_list('recipe_id', 'content'):
+        ingredients[recipe_id].extend((content or {}).get('items', []))
+
+    for recipe_id, title, description in Recipe.objects.filter(
+        pk__in=recipe_ids,
+    ).values_list('pk', 'title', 'description'):
+        yield (
+            recipe_id,
+            title or '',
+            description or '',
+            '\n'.join(body[recipe_id]),
+            '\n'.join(ingredients[recipe_id]),
+        )
+
+
+def remove_recipes(recipe_ids):
+    if not recipe_ids or not is_available():
+        return
+
+    connection = _connection()
+    table = connection.ops.quote_name(SEARCH_TABLE)
+    rowids = [_rowid(recipe_id) for recipe_id in recipe_ids]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {table} WHERE rowid IN ({', '.join(['%s'] * len(rowids))})",
+            rowids,
+        )
+
+
+def index_recipes(recipe_ids):
+    """
+    (Re)build the index documents of the given recipes in a constant number of queries
+    """
+    recipe_ids = list(recipe_ids)
+    if not recipe_ids or not is_available():
+        return
+
+    remove_recipes(recipe_ids)
+
+    connection = _connection()
+    table = connection.ops.quote_name(SEARCH_TABLE)
+    pk_field = Recipe._meta.pk
+    rows = [
+        (_rowid(recipe_id), pk_field.get_db_prep_value(recipe_id, connection), *columns)
+        for recipe_id, *columns in _build_documents(recipe_ids)
+    ]
+    if not rows:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {table}(rowid, recipe_id, {', '.join(SEARCH_COLUMNS)}) "
+            f"VALUES (%s, %s, {', '.join(['%s'] * len(SEARCH_COLUMNS))})",
+            rows,
+        )
+
+
+def to_match_expression(query):
+    """
+    Turn free text into an FTS5 query where every word is a required prefix
+    """
+    tokens = TOKEN_RE.findall(query)
+    if not tokens:
+        return None
+
+    terms = ' '.join(f'"{token}"*' for token in tokens)
+    return f"{{{' '.join(SEARCH_COLUMNS)}}} : ({terms})"
+
+
+def search_recipes(queryset, query):
+    """
+    Filter `queryset` by `query`, ordered by relevance (`search_rank`, lower is better)
+
+    Falls back to a case-insensitive substring search when FTS5 is unavailable
+    """
+    if not is_available():
+        return queryset.filter(Q(title__icontains=query) | Q(description__icontains=query))
+
+    match = to_match_expression(query)
+    if match is None:
+        return queryset.none()
+
+    return queryset.filter(
+        search_document__document__match=match,
+    ).annotate(
+        search_rank=F('search_document__rank'),
+    ).order_by('search_rank')
@@ -1,20 +1,15 @@
-from datetime import timedelta, datetime
-
-from django.utils import timezone
-from django.utils.text import slugify
+from django.db import transaction
 from rest_framework import serializers, exceptions
-from django.db.models import Count
-from django.db.models.functions import TruncHour, TruncDate, TruncWeek, TruncMonth, TruncYear
 from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework.exceptions import ValidationError as DRFValidationError
 
+from apps.recipes import analytics, ingredients, nutrition, search
 from apps.recipes.models import (
     Recipe,
+    RecipeStatus,
     RecipeBlock,
     RecipeSpecialBlock,
     RecipeReport,
-    Like,
-    View,
 )
 
 
@@ -44,6 +39,10 @@ class BaseSerializer(serializers.ModelSerializer):
     )
 
     def get_is_liked(self, obj):
+        liked_recipe_ids = self.context.get('liked_recipe_ids')
+        if liked_recipe_ids is not None:
+            return obj.pk in liked_recipe_ids
+
         user = self.context['request'].user
         return obj.is_liked_by(user)
 
@@ -85,7 +84,8 @@ class RecipeSpecialBlockSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
 
         try:
-            instance.full_clean()
+            # The recipe is only known once it is saved
+            instance.full_clean(exclude=['recipe'])
         except DjangoValidationError as e:
             raise DRFValidationError(e.message_dict)
 
@@ -114,7 +114,8 @@ class RecipeBlockSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
 
         try:
-            instance.full_clean()
+            # The recipe is only known once it is saved
+            instance.full_clean(exclude=['recipe'])
         except DjangoValidationError as e:
             raise DRFValidationError(e.message_dict)
 
@@ -151,6 +152,7 @@ class RecipeSerializer(BaseSerializer):
 
             'is_liked',
             'views_count',
+            'unique_visitors',
             'likes_count',
             'blocks',
             'special_blocks',
@@ -167,7 +169,14 @@ class RecipeSerializer(BaseSerializer):
             'id',
             'author',
 
+            # Copied from the special blocks by `apps.recipes.nutrition`
+            'calories',
+            'protein',
+            'fat',
+            'carbs',
+
             'views_count',
+            'unique_visitors',
             'likes_count',
 
             'created_at',
@@ -178,13 +187,8 @@ class RecipeSerializer(BaseSerializer):
     def update(self, instance, validated_data):
         title = validated_data.get('title')
         if title and title != instance.title:
-            new_slug = slugify(title)
-            base_slug = new_slug
-            counter = 1
-            while Recipe.objects.filter(slug=new_slug).exclude(id=instance.id).exists():
-                new_slug = f'{base_slug}-{counter}'
-                counter += 1
-            instance.slug = new_slug
+            # Saving allocates a slug from the new title
+            instance.slug = None
         return super().update(instance, validated_data)
 
 
@@ -221,6 +225,7 @@ class RecipeAdminSerializer(BaseSerializer):
 
             'is_liked',
             'views_count',
+            'unique_visitors',
             'likes_count',
             'blocks',
             'special_blocks',
@@ -239,6 +244,7 @@ class RecipeMinimalSerializer(BaseSerializer):
     is_liked = serializers.SerializerMethodField()
     likes_count = serializers.IntegerField(read_only=True)
     views_count = serializers.IntegerField(read_only=True)
+    unique_visitors = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Recipe
@@ -253,6 +259,7 @@ class RecipeMinimalSerializer(BaseSerializer):
 
             'is_liked',
             'views_count',
+            'unique_visitors',
             'likes_count',
             
             'published_at',
@@ -260,7 +267,22 @@ class RecipeMinimalSerializer(BaseSerializer):
         read_only_fields = fields
 
 
+class RecipeBulkCreateSerializer(serializers.ListSerializer):
+    def create(self, validated_data):
+        return self.child.create_many(validated_data)
+
+
 class RecipeCreateSerializer(serializers.ModelSerializer):
+    """
+    Create recipes with their blocks and special blocks
+
+    Everything is validated up front, then each batch is written in one
+    transaction with the blocks and tag links inserted by `bulk_create`.
+    Use `many=True` for batch imports.
+    """
+    blocks = RecipeBlockSerializer(many=True, required=False)
+    special_blocks = RecipeSpecialBlockSerializer(many=True, required=False)
+
     class Meta:
         model = Recipe
         fields = [
@@ -271,7 +293,10 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             'source_url',
             'tags',
             'is_private',
+            'blocks',
+            'special_blocks',
         ]
+        list_serializer_class = RecipeBulkCreateSerializer
 
     def validate_title(self, value):
         if len(value) > 64:
@@ -281,36 +306,75 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
     def validate_description(self, value):
         return value
 
+    def validate_special_blocks(self, value):
+        types = [block['type'] for block in value]
+        if len(types) != len(set(types)):
+            raise exceptions.ValidationError('Each special block type may only be used once.')
+        return value
+
+    def validate(self, data):
+        if data.get('status') == RecipeStatus.PUBLISHED and not data.get('final_image'):
+            raise exceptions.ValidationError({'final_image': 'A published recipe must have a final image.'})
+        return data
+
     def _get_macronutrients(self, special_blocks: list[dict]) -> dict:
         """
-        Extracts macronutrients from the special blocks if available
+        Nutrition columns from the special blocks, as the block signals keep them afterwards
         """
-        for block in special_blocks:
-            if block.get('type') == 'macronutrients':
-                content = block.get('content', {})
-                return {
-                    'calories': content.get('calories'),
-                    'protein': content.get('protein'),
-                    'fat': content.get('fat'),
-                    'carbs': content.get('carbs'),
-                }
-        return {}
+        return nutrition.nutrition_values((block.get('type'), block.get('content')) for block in special_blocks)
 
     def create(self, validated_data):
-        user = self.context['request'].user
-        tags = validated_data.pop('tags', [])
-        blocks = self.context.get('blocks', [])
-        special_blocks = self.context.get('special_blocks', [])
-        macronutrients = self._get_macronutrients(special_blocks)
-
-        recipe = Recipe.objects.create(
-            author=user,
-            **validated_data,
-            **macronutrients
-        )
+        return self.create_many([validated_data])[0]
 
-        recipe.tags.set(tags)
-        return recipe
+    def create_many(self, validated_data):
+        user = self.context['request'].user
+        recipes = []
+        tag_links = []
+        blocks = []
+        special_blocks = []
+
+        with transaction.atomic():
+            for data in validated_data:
+                data = dict(data)
+                tags = data.pop('tags', [])
+                recipe_blocks = data.pop('blocks', [])
+                recipe_special_blocks = data.pop('special_blocks', [])
+
+                recipe = Recipe.objects.create(
+                    author=user,
+                    **data,
+                    **self._get_macronutrients(recipe_special_blocks)
+                )
+                recipes.append(recipe)
+
+                tag_links.extend(Recipe.tags.through(recipe=recipe, tag=tag) for tag in tags)
+                blocks.extend(RecipeBlock(recipe=recipe, **block) for block in recipe_blocks)
+                special_blocks.extend(RecipeSpecialBlock(recipe=recipe, **block) for block in recipe_special_blocks)
+
+            Recipe.tags.through.objects.bulk_create(tag_links)
+            RecipeBlock.objects.bulk_create(blocks)
+            RecipeSpecialBlock.objects.bulk_create(special_blocks)
+
+            # bulk_create skips the block signals that keep the indexes current
+            if blocks or special_blocks:
+                search.index_recipes([recipe.pk for recipe in recipes])
+            if any(block.type == RecipeSpecialBlock.INGREDIENTS for block in special_blocks):
+                ingredients.index_recipes([recipe.pk for recipe in recipes])
+
+        return recipes
+
+
+class RecipeImportSerializer(RecipeCreateSerializer):
+    """
+    Validate the rows of `import_recipes`, tags are given by name
+    """
+    tags = serializers.ListField(child=serializers.CharField(max_length=64), required=False)
+
+    class Meta(RecipeCreateSerializer.Meta):
+        fields = [
+            field for field in RecipeCreateSerializer.Meta.fields
+            if field != 'final_image'
+        ]
 
 
 class DeletedRecipeSerializer(RecipeSerializer):
@@ -360,6 +424,7 @@ class RecipeBanSerializer(RecipeAdminSerializer):
 class RecipeStatisticsSerializer(serializers.ModelSerializer):
     likes_count = serializers.IntegerField(read_only=True)
     views_count = serializers.IntegerField(read_only=True)
+    unique_visitors = serializers.IntegerField(read_only=True)
     time_series_data = serializers.SerializerMethodField()
 
     class Meta:
@@ -372,6 +437,7 @@ class RecipeStatisticsSerializer(serializers.ModelSerializer):
             'tags',
 
             'views_count',
+            'unique_visitors',
             'likes_count',
             'time_series_data',
 
@@ -381,176 +447,19 @@ class RecipeStatisticsSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = fields
 
-    def _get_time_range_dates(self, time_range):
-        end_date = timezone.now()
-
-        if time_range == 'day':
-            start_date = end_date.replace(hour=0, minute=0, second=0, microsecond=0)
-        elif time_range == '3days':
-            start_date = (end_date - timedelta(days=2)).replace(hour=0, minute=0, second=0, microsecond=0)
-        elif time_range == 'week':
-            start_date = (end_date - timedelta(days=6)).replace(hour=0, minute=0, second=0, microsecond=0)
-        elif time_range == 'month':
-            start_date = (end_date - timedelta(days=29)).replace(hour=0, minute=0, second=0, microsecond=0)
-        elif time_range == '3months':
-            start_date = (end_date - timedelta(days=89)).replace(hour=0, minute=0, second=0, microsecond=0)
-        elif time_range == '6months':
-            start_date = (end_date - timedelta(days=179)).replace(hour=0, minute=0, second=0, microsecond=0)
-        elif time_range == 'year':
-            start_date = (end_date - timedelta(days=364)).replace(hour=0, minute=0, second=0, microsecond=0)
-        else:
-            start_date = (end_date - timedelta(days=6)).replace(hour=0, minute=0, second=0, microsecond=0)
-        return start_date, end_date
-
-    def _get_trunc_function(self, time_view):
-        if time_view == 'hour':
-            return TruncHour, 'hour'
-        elif time_view == 'day':
-            return TruncDate, 'date'
-        elif time_view == 'week':
-            return TruncWeek, 'week'
-        elif time_view == 'month':
-            return TruncMonth, 'month'
-        elif time_view == 'year':
-            return TruncYear, 'year'
-        else:
-            return TruncDate, 'date'
-
-    def _get_formatted_date(self, date_value, time_view):
-        """
-        Format dates consistently based on the time view
-        """
-        if time_view == 'hour':
-            return date_value.strftime('%Y-%m-%d %H:00')
-        elif time_view == 'day':
-            return date_value.strftime('%Y-%m-%d')
-        elif time_view == 'week':
-            return f"{date_value.strftime('%Y')}-W{date_value.strftime('%V')}"
-        elif time_view == 'month':
-            return date_value.strftime('%Y-%m')
-        elif time_view == 'year':
-            return date_value.strftime('%Y')
-        else:
-            return date_value.strftime('%Y-%m-%d')
-
-    def _get_aggregated_data(self, obj, model_class, start_date, end_date, trunc_func, date_format):
-        return {
-            self._format_date(item['period'], date_format): item['count']
-            for item in model_class.objects.filter(
-                recipe=obj,
-                timestamp__gte=start_date,
-                timestamp__lte=end_date
-            ).annotate(
-                period=trunc_func('timestamp')
-            ).values('period').annotate(
-                count=Count('id')
-            ).order_by('period')
-        }
-
     def get_time_series_data(self, obj):
         time_range = self.context['request'].query_params.get('time-range', 'week')
         time_view = self.context['request'].query_params.get('time-view', 'day')
 
-        start_date, end_date = self._get_time_range_dates(time_range)
-        trunc_func, date_field = self._get_trunc_function(time_view)
-
-        views_by_date = View.objects.filter(
-            recipe=obj,
-            timestamp__gte=start_date,
-            timestamp__lte=end_date
-        ).annotate(
-            period=trunc_func('timestamp')
-        ).values('period').annotate(
-            count=Count('id')
-        ).order_by('period')
-
-        likes_by_date = Like.objects.filter(
-            recipe=obj,
-            timestamp__gte=start_date,
-            timestamp__lte=end_date
-        ).annotate(
-            period=trunc_func('timestamp')
-        ).values('period').annotate(
-            count=Count('id')
-        ).order_by('period')
-
-        views_dict = {
-            self._get_formatted_date(item['period'], time_view): item['count']
-            for item in views_by_date
-        }
-        likes_dict = {
-            self._get_formatted_date(item['period'], time_view): item['count']
-            for item in likes_by_date
-        }
-
-        time_series = []
-
-        if time_view == 'hour':
-            current_date = start_date
-            while current_date <= end_date:
-                date_str = self._get_formatted_date(current_date, time_view)
-                time_series.append({
-                    'period': date_str,
-                    'views': views_dict.get(date_str, 0),
-                    'likes': likes_dict.get(date_str, 0)
-                })
-                current_date += timedelta(hours=1)
-        elif time_view == 'day':
-            current_date = start_date.date()
-            while current_date <= end_date.date():
-                date_str = self._get_formatted_date(current_date, time_view)
-                time_series.append({
-                    'period': date_str,
-                    'views': views_dict.get(date_str, 0),
-                    'likes': likes_dict.get(date_str, 0)
-                })
-                current_date += timedelta(days=1)
-        elif time_view == 'week':
-            current_date = start_date - timedelta(days=start_date.weekday())
-            while current_date <= end_date:
-                date_str = self._get_formatted_date(current_date, time_view)
-                time_series.append({
-                    'period': date_str,
-                    'views': views_dict.get(date_str, 0),
-                    'likes': likes_dict.get(date_str, 0)
-                })
-                current_date += timedelta(weeks=1)
-        elif time_view == 'month':
-            current_date = start_date.replace(day=1)
-            while current_date <= end_date:
-                date_str = self._get_formatted_date(current_date, time_view)
-                time_series.append({
-                    'period': date_str,
-                    'views': views_dict.get(date_str, 0),
-                    'likes': likes_dict.get(date_str, 0)
-                })
-                if current_date.month == 12:
-                    current_date = current_date.replace(year=current_date.year + 1, month=1)
-                else:
-                    current_date = current_date.replace(month=current_date.month + 1)
-        elif time_view == 'year':
-            current_year = start_date.year
-            end_year = end_date.year
-            while current_year <= end_year:
-                current_date = timezone.datetime(current_year, 1, 1)
-                date_str = self._get_formatted_date(current_date, time_view)
-                time_series.append({
-                    'period': date_str,
-                    'views': views_dict.get(date_str, 0),
-                    'likes': likes_dict.get(date_str, 0)
-                })
-                current_year += 1
-
-        total_views = sum(entry['views'] for entry in time_series)
-        total_likes = sum(entry['likes'] for entry in time_series)
+        start_date, end_date = analytics.time_range_dates(time_range)
+        rows = analytics.rollup_queryset(start_date, end_date, time_view).filter(
+            recipe=obj
+        ).order_by('bucket').values_list('bucket', 'views', 'likes')
 
         return {
             'time_range': time_range,
             'time_view': time_view,
-            'total_views': total_views,
-            'total_likes': total_likes,
-            'engagement_rate': round((total_likes / total_views) * 100) if total_views > 0 else 0,
-            'data': time_series
+            **analytics.time_series(rows, start_date, end_date, time_view),
         }
 
 
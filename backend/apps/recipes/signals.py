@@ -0,0 +1,133 @@
+from django.core.signals import request_finished
+from django.db.models.signals import post_save, post_delete, pre_delete, post_migrate, m2m_changed
+from django.dispatch import receiver
+
+from apps.recipes import caching, exporting, ingredients, nutrition, search
+from apps.recipes.models import Recipe, RecipeBlock, RecipeSpecialBlock, Tag
+from apps.recipes.sampling import RANDOM_RECIPE_POOLS
+from apps.recipes.tracking import recipe_view_buffer
+
+
+@receiver(post_save, sender=Recipe)
+def sync_random_recipe_pools(sender, instance, **kwargs):
+    for pool in RANDOM_RECIPE_POOLS:
+        pool.sync(instance)
+
+
+@receiver(post_delete, sender=Recipe)
+def remove_from_random_recipe_pools(sender, instance, **kwargs):
+    for pool in RANDOM_RECIPE_POOLS:
+        pool.discard(instance.pk)
+
+
+@receiver(request_finished)
+def flush_recipe_view_buffer(sender, **kwargs):
+    recipe_view_buffer.flush_if_due()
+
+
+@receiver(post_migrate)
+def create_search_index(sender, using, **kwargs):
+    if sender.name == 'apps.recipes':
+        search.create_search_index(using)
+
+
+@receiver(post_save, sender=Recipe)
+def index_recipe(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not set(Recipe.SEARCH_FIELDS) & set(update_fields):
+        return
+    # `Recipe.save` lists every field in `update_fields`, so compare with the loaded values
+    if not instance.search_fields_changed():
+        return
+    search.index_recipes([instance.pk])
+
+
+@receiver(post_delete, sender=Recipe)
+def remove_recipe_from_index(sender, instance, **kwargs):
+    search.remove_recipes([instance.pk])
+
+
+@receiver(post_save, sender=RecipeBlock)
+@receiver(post_delete, sender=RecipeBlock)
+@receiver(post_save, sender=RecipeSpecialBlock)
+@receiver(post_delete, sender=RecipeSpecialBlock)
+def index_block_recipe(sender, instance, **kwargs):
+    search.index_recipes([instance.recipe_id])
+
+
+@receiver(post_save, sender=RecipeSpecialBlock)
+@receiver(post_delete, sender=RecipeSpecialBlock)
+def index_block_ingredients(sender, instance, **kwargs):
+    if instance.type == RecipeSpecialBlock.INGREDIENTS:
+        ingredients.index_recipes([instance.recipe_id])
+
+
+@receiver(post_save, sender=RecipeSpecialBlock)
+@receiver(post_delete, sender=RecipeSpecialBlock)
+def sync_block_nutrition(sender, instance, **kwargs):
+    if instance.type in nutrition.NUTRITION_BLOCKS:
+        nutrition.sync_recipes([instance.recipe_id])
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipe_cache(sender, instance, **kwargs):
+    caching.invalidate_recipes([instance.pk])
+
+
+@receiver(post_delete, sender=Recipe)
+def remove_recipe_exports(sender, instance, **kwargs):
+    exporting.remove_artifacts(instance.pk)
+
+
+@receiver(post_save, sender=RecipeBlock)
+@receiver(post_delete, sender=RecipeBlock)
+@receiver(post_save, sender=RecipeSpecialBlock)
+@receiver(post_delete, sender=RecipeSpecialBlock)
+def invalidate_block_recipe_cache(sender, instance, **kwargs):
+    caching.invalidate_recipes([instance.recipe_id])
+
+
+@receiver(post_save, sender=RecipeBlock)
+@receiver(post_delete, sender=RecipeBlock)
+@receiver(post_save, sender=RecipeSpecialBlock)
+@receiver(post_delete, sender=RecipeSpecialBlock)
+def touch_block_recipe(sender, instance, **kwargs):
+    Recipe.objects.filter(pk=instance.recipe_id).touch()
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def touch_tag_recipes(sender, instance, **kwargs):
+    Recipe.objects.filter(tags=instance).touch()
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def invalidate_tag_recipes_cache(sender, instance, **kwargs):
+    caching.invalidate_recipes(instance.recipes.values_list('pk', flat=True))
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def touch_recipe_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        Recipe.objects.filter(pk=instance.pk).touch()
+    elif action == 'pre_clear':
+        Recipe.objects.filter(tags=instance).touch()
+    else:
+        Recipe.objects.filter(pk__in=pk_set).touch()
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_recipe_tags_cache(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        caching.invalidate_recipes([instance.pk])
+    elif action == 'pre_clear':
+        caching.invalidate_recipes(instance.recipes.values_list('pk', flat=True))
+    else:
+        caching.invalidate_recipes(pk_set)
@@ -0,0 +1,240 @@
+import re
+from collections import defaultdict
+
+import numpy as np
+from scipy import sparse
+
+from django.conf import settings
+from django.db import transaction
+
+from apps.recipes.models import (
+    Recipe,
+    Like,
+    RecipeNeighbor,
+    RecipeSpecialBlock,
+)
+from apps.recipes.ingredients import STOP_WORDS
+
+
+# Words of an ingredient line, quantities left out
+TOKEN_RE = re.compile(r'[^\W\d_]+', re.UNICODE)
+
+# Share of the similarity carried by each group of features
+TAG_WEIGHT = 0.35
+INGREDIENT_WEIGHT = 0.5
+MACRO_WEIGHT = 0.15
+
+# Cells of the dense block of similarities computed at once, 32 MB of floats,
+# so the rows per block shrink as the catalogue grows
+BLOCK_CELLS = 2 ** 22
+
+# Liked recipes whose neighbors make up the recommendations of a user
+RECENT_LIKES = 20
+
+
+def ingredient_tokens(items):
+    tokens = set()
+    for item in items:
+        for token in TOKEN_RE.findall(item.lower()):
+            if len(token) > 2 and token not in STOP_WORDS:
+                tokens.add(token)
+    return tokens
+
+
+def macro_shares(protein, fat, carbs):
+    """
+    Shares of the energy coming from protein, fat and carbs, or None when unknown
+    """
+    if protein is None or fat is None or carbs is None:
+        return None
+    energy = (protein * 4, fat * 9, carbs * 4)
+    total = sum(energy)
+    if not total:
+        return None
+    return [value / total for value in energy]
+
+
+def normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix
+
+
+def tfidf(documents):
+    """
+    Sparse TF-IDF matrix of sets of terms, rare terms weigh more than common ones
+    """
+    vocabulary = {}
+    indices = []
+    indptr = [0]
+    for terms in documents:
+        indices.extend(vocabulary.setdefault(term, len(vocabulary)) for term in terms)
+        indptr.append(len(indices))
+
+    indices = np.asarray(indices, dtype=np.int64)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(indices)), indices, indptr),
+        shape=(len(documents), len(vocabulary)),
+    )
+    document_frequency = np.bincount(indices, minlength=len(vocabulary))
+    idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1
+    return matrix @ sparse.diags(idf)
+
+
+def macro_matrix(shares):
+    """
+    Energy shares centered on their mean, so only departures from a typical recipe count
+    """
+    known = [share for share in shares if share is not None]
+    if not known:
+        return sparse.csr_matrix((len(shares), 3))
+
+    mean = np.mean(known, axis=0)
+    rows = [np.asarray(share) - mean if share is not None else np.zeros(3) for share in shares]
+    return sparse.csr_matrix(np.vstack(rows))
+
+
+def feature_matrix(tags, ingredients, shares):
+    """
+    Unit rows of weighted tag, ingredient and macronutrient features, one per recipe
+    """
+    groups = [
+        (tfidf(tags), TAG_WEIGHT),
+        (tfidf(ingredients), INGREDIENT_WEIGHT),
+        (macro_matrix(shares), MACRO_WEIGHT),
+    ]
+    return normalize_rows(sparse.hstack(
+        [normalize_rows(matrix) * np.sqrt(weight) for matrix, weight in groups]
+    ).tocsr())
+
+
+def top_neighbors(matrix, k):
+    """
+    Yield `(row, [(neighbor_row, cosine), ...])` with the `k` most similar other rows
+
+    Rows are unit length, so products are cosines. The macronutrient
+    features make nearly every product nonzero, so blocks are dense and
+    hold `BLOCK_CELLS` cosines at most, whatever the number of rows. Rows
+    sharing no feature are left out.
+    """
+    count = matrix.shape[0]
+    k = min(k, count - 1)
+    if k <= 0:
+        return
+
+    chunk_size = max(1, BLOCK_CELLS // count)
+    transposed = matrix.T.tocsc()
+    for start in range(0, count, chunk_size):
+        block = (matrix[start:start + chunk_size] @ transposed).toarray()
+        rows = np.arange(block.shape[0])
+        block[rows, rows + start] = -np.inf
+
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(block, top, axis=1)
+        order = np.argsort(-scores, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        scores = np.take_along_axis(scores, order, axis=1)
+
+        for offset in rows:
+            yield start + offset, [
+                (int(column), float(score))
+                for column, score in zip(top[offset], scores[offset])
+                if score > 1e-9
+            ]
+
+
+def _recipe_features():
+    public = Recipe.objects.public()
+    recipes = list(public.order_by('pk').values_list('pk', 'protein', 'fat', 'carbs'))
+    index = {recipe_id: position for position, (recipe_id, *_) in enumerate(recipes)}
+
+    tags = [set() for _ in recipes]
+    for recipe_id, tag_id in Recipe.tags.through.objects.filter(recipe__in=public).values_list('recipe_id', 'tag_id'):
+        tags[index[recipe_id]].add(tag_id)
+
+    ingredients = [set() for _ in recipes]
+    shares = [macro_shares(protein, fat, carbs) for _, protein, fat, carbs in recipes]
+    for recipe_id, block_type, content in RecipeSpecialBlock.objects.filter(
+        recipe__in=public,
+        type__in=[RecipeSpecialBlock.INGREDIENTS, RecipeSpecialBlock.MACRONUTRIENTS],
+    ).values_list('recipe_id', 'type', 'content').iterator():
+        position = index[recipe_id]
+        content = content or {}
+        if block_type == RecipeSpecialBlock.INGREDIENTS:
+            ingredients[position] = ingredient_tokens(content.get('items', []))
+        elif shares[position] is None:
+            shares[position] = macro_shares(content.get('protein'), content.get('fat'), content.get('carbs'))
+
+    return [recipe_id for recipe_id, *_ in recipes], feature_matrix(tags, ingredients, shares)
+
+
+def store_neighbors(kind, recipe_ids, neighbors):
+    """
+    Replace the neighbors of `kind` by the `(row, [(neighbor_row, score), ...])` pairs of `neighbors`
+
+    Rows index `recipe_ids`. Returns the number of recipes with neighbors.
+    """
+    stored = 0
+    with transaction.atomic():
+        RecipeNeighbor.objects.filter(kind=kind).delete()
+        batch = []
+        for row, row_neighbors in neighbors:
+            stored += bool(row_neighbors)
+            batch.extend(
+                RecipeNeighbor(
+                    kind=kind,
+                    recipe_id=recipe_ids[row],
+                    neighbor_id=recipe_ids[column],
+                    position=position,
+                    score=score,
+                )
+                for position, (column, score) in enumerate(row_neighbors, start=1)
+            )
+            if len(batch) >= 5000:
+                RecipeNeighbor.objects.bulk_create(batch)
+                batch = []
+        RecipeNeighbor.objects.bulk_create(batch)
+    return stored
+
+
+def build_neighbors(k=None):
+    """
+    Replace the content neighbors of every public recipe, returns the number of recipes with neighbors
+    """
+    recipe_ids, matrix = _recipe_features()
+    return store_neighbors(RecipeNeighbor.CONTENT, recipe_ids, top_neighbors(matrix, k or settings.RECIPE_NEIGHBORS))
+
+
+def similar_recipes(recipe, queryset=None, kind=RecipeNeighbor.CONTENT):
+    """
+    Public neighbors of `recipe` from most to least similar, one indexed read
+    """
+    queryset = queryset if queryset is not None else Recipe.objects.all()
+    return queryset.public().filter(
+        neighbor_of__kind=kind,
+        neighbor_of__recipe=recipe,
+    ).order_by('neighbor_of__position')
+
+
+def recommended_recipes(user, limit=10, kind=RecipeNeighbor.CONTENT):
+    """
+    Public recipes most similar to the last `RECENT_LIKES` recipes liked by `user`
+
+    Scores of a recipe neighbor to several liked recipes add up, liked
+    recipes themselves are left out.
+    """
+    liked = list(
+        Like.objects.filter(user=user).order_by('-timestamp').values_list('recipe_id', flat=True)[:RECENT_LIKES]
+    )
+    if not liked:
+        return []
+
+    scores = defaultdict(float)
+    for neighbor_id, score in RecipeNeighbor.objects.filter(kind=kind, recipe_id__in=liked).values_list('neighbor_id', 'score'):
+        scores[neighbor_id] += score
+    for recipe_id in liked:
+        scores.pop(recipe_id, None)
+
+    ranked = sorted(scores, key=lambda recipe_id: (-scores[recipe_id], str(recipe_id)))
+    recipes = Recipe.objects.public().in_bulk(ranked[:limit * 2])
+    return [recipes[recipe_id] for recipe_id in ranked if recipe_id in recipes][:limit]
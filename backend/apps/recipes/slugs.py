@@ -0,0 +1,95 @@
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Count, Max, Q
+from django.db.models.functions import Cast, Substr
+from django.utils.text import slugify
+
+
+# Attempts at saving with a fresh slug when concurrent saves keep taking it
+SAVE_ATTEMPTS = 3
+
+# Longest numeric suffix counted, longer ones would overflow the cast
+SUFFIX_DIGITS = 18
+
+
+def _split_suffix(slug):
+    base, _, suffix = slug.rpartition('-')
+    if base and suffix.isdigit():
+        return base, int(suffix)
+    return None, None
+
+
+def allocate_slugs(model, names, exclude=None):
+    """
+    Unique slugs for `names`, in order, with a single query
+
+    A slug already taken in the table gets the suffix after the highest one in
+    use, `-<max + 1>`, duplicates within `names` get the following ones. The
+    row with primary key `exclude` does not count, so a renamed row may keep
+    its slug.
+
+    Whether each base is taken and its highest numeric suffix are aggregated
+    in the database, so one row comes back however many slugs share a base.
+    """
+    bases = [slugify(name) or model._meta.model_name for name in names]
+    unique_bases = list(dict.fromkeys(bases))
+
+    queryset = model.objects.filter(
+        reduce(or_, (Q(slug=base) | Q(slug__startswith=f'{base}-') for base in unique_bases))
+    )
+    if exclude is not None:
+        queryset = queryset.exclude(pk=exclude)
+
+    aggregates = {}
+    for index, base in enumerate(unique_bases):
+        aggregates[f'taken_{index}'] = Count('pk', filter=Q(slug=base))
+        aggregates[f'suffix_{index}'] = Max(
+            Cast(Substr('slug', len(base) + 2), BigIntegerField()),
+            filter=Q(slug__regex=rf'^{base}-[0-9]{{1,{SUFFIX_DIGITS}}}$'),
+        )
+    in_use = queryset.aggregate(**aggregates)
+
+    taken = {base for index, base in enumerate(unique_bases) if in_use[f'taken_{index}']}
+    max_suffix = {
+        base: in_use[f'suffix_{index}']
+        for index, base in enumerate(unique_bases)
+        if in_use[f'suffix_{index}'] is not None
+    }
+
+    slugs = []
+    for base in bases:
+        slug = base if base not in taken else f'{base}-{max_suffix.get(base, 0) + 1}'
+        taken.add(slug)
+        slug_base, suffix = _split_suffix(slug)
+        if slug_base is not None:
+            max_suffix[slug_base] = max(max_suffix.get(slug_base, 0), suffix)
+        slugs.append(slug)
+    return slugs
+
+
+def allocate_slug(model, name, exclude=None):
+    return allocate_slugs(model, [name], exclude=exclude)[0]
+
+
+def save_with_slug(instance, name, save, *args, **kwargs):
+    """
+    Give `instance` a slug allocated from `name` and save it with `save`
+
+    The slug is checked and written in separate queries, so a concurrent save
+    may take it first. The unique constraint then fails and a new slug is
+    allocated, up to `SAVE_ATTEMPTS` times.
+    """
+    model = type(instance)
+    exclude = None if instance._state.adding else instance.pk
+
+    for attempt in range(1, SAVE_ATTEMPTS + 1):
+        instance.slug = allocate_slug(model, name, exclude=exclude)
+        try:
+            with transaction.atomic():
+                return save(*args, **kwargs)
+        except IntegrityError:
+            taken = model.objects.filter(slug=instance.slug).exclude(pk=instance.pk).exists()
+            if attempt == SAVE_ATTEMPTS or not taken:
+                raise
@@ -0,0 +1,22 @@
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+
+from apps.recipes.models import Recipe, RecipeStatus, RecipeNeighbor, Tag
+
+
+@pytest.mark.django_db
+def test_build_recipe_neighbors_command(create_client):
+    author = create_client()
+    tag = Tag.objects.create(name='breakfast')
+    for title in ['Pancakes', 'Waffles']:
+        recipe = Recipe.objects.create(title=title, author=author)
+        Recipe.objects.filter(pk=recipe.pk).update(status=RecipeStatus.PUBLISHED)
+        recipe.tags.add(tag)
+
+    stdout = StringIO()
+    call_command('build_recipe_neighbors', '--neighbors', '5', stdout=stdout)
+    assert 'Built neighbors for 2 recipes.' in stdout.getvalue()
+    assert RecipeNeighbor.objects.count() == 2
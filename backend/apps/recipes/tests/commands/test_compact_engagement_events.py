@@ -0,0 +1,46 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.recipes.models import Recipe, EngagementEvent, RecipeDailyStats, user_viewer
+from apps.recipes.rollups import roll_up
+
+
+@pytest.mark.django_db
+def test_compact_engagement_events(create_client):
+    author = create_client()
+    reader = create_client()
+    recipe = Recipe.objects.create(title='Pancakes', author=author)
+    now = timezone.now()
+    last_month = (now.replace(day=1) - timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+    two_years_ago = now - timedelta(days=730)
+
+    viewer = user_viewer(reader)
+    EngagementEvent.objects.bulk_create([
+        EngagementEvent.build(recipe.pk, EngagementEvent.VIEW, viewer, two_years_ago),
+        *(
+            EngagementEvent.build(recipe.pk, EngagementEvent.VIEW, viewer, last_month + timedelta(minutes=minutes))
+            for minutes in (1, 5, 30)
+        ),
+        EngagementEvent.build(recipe.pk, EngagementEvent.VIEW, viewer, now - timedelta(hours=1)),
+    ])
+
+    # Months not rolled up yet are left alone
+    call_command('compact_engagement_events', stdout=StringIO())
+    assert EngagementEvent.objects.count() == 5
+
+    roll_up(now)
+    stdout = StringIO()
+    call_command('compact_engagement_events', stdout=stdout)
+    assert 'Deleted 1 expired events, compaction removed 2 rows.' in stdout.getvalue()
+
+    compacted = EngagementEvent.objects.get(month=EngagementEvent.month_for(last_month))
+    assert (compacted.bucket, compacted.count) == (last_month, 3)
+    assert EngagementEvent.objects.count() == 2
+
+    # The rollups still hold every view
+    assert sum(RecipeDailyStats.objects.values_list('views', flat=True)) == 5
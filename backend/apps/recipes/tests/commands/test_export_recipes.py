@@ -0,0 +1,37 @@
+import json
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+
+from apps.recipes.models import Recipe
+
+
+@pytest.mark.django_db
+def test_export_recipes_stdout(create_client):
+    author = create_client()
+    public = Recipe.objects.create(title='Pancakes', author=author)
+    Recipe.objects.filter(pk=public.pk).update(status='published', final_image='static/recipes/pancakes.jpg')
+    Recipe.objects.create(title='Waffles', author=author)
+
+    stdout = StringIO()
+    call_command('export_recipes', stdout=stdout)
+    assert [json.loads(line)['title'] for line in stdout.getvalue().splitlines()] == ['Pancakes', 'Waffles']
+
+    stdout = StringIO()
+    call_command('export_recipes', public_only=True, stdout=stdout)
+    assert [json.loads(line)['title'] for line in stdout.getvalue().splitlines()] == ['Pancakes']
+
+
+@pytest.mark.django_db
+def test_export_recipes_csv_round_trip(tmp_path, create_client):
+    author = create_client()
+    Recipe.objects.create(title='Pancakes', description='Fluffy', author=author)
+    path = tmp_path / 'recipes.csv'
+
+    call_command('export_recipes', format='csv', output=str(path), stdout=StringIO())
+    call_command('import_recipes', str(path), author=author.username, stdout=StringIO(), stderr=StringIO())
+
+    assert sorted(Recipe.objects.values_list('slug', flat=True)) == ['pancakes', 'pancakes-1']
+    assert Recipe.objects.get(slug='pancakes-1').description == 'Fluffy'
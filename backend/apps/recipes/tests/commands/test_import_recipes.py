@@ -0,0 +1,114 @@
+import json
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from apps.recipes.importing import RecipeImporter
+from apps.recipes.models import (
+    Recipe,
+    RecipeStatus,
+    RecipeBlock,
+    RecipeSpecialBlock,
+    Tag,
+)
+from apps.recipes.search import search_recipes
+
+
+def write_jsonl(path, rows):
+    path.write_text('\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows))
+    return path
+
+
+def import_recipes(path, author, **options):
+    stdout, stderr = StringIO(), StringIO()
+    call_command('import_recipes', str(path), author=author.username, stdout=stdout, stderr=stderr, **options)
+    return stdout.getvalue(), stderr.getvalue()
+
+
+@pytest.mark.django_db
+def test_import_recipes_jsonl(tmp_path, create_client):
+    author = create_client()
+    Tag.objects.create(name='Bread')
+    Recipe.objects.create(title='Sourdough', author=author)
+
+    rows = [
+        {
+            'title': 'Sourdough',
+            'tags': ['bread', 'slow'],
+            'blocks': [{'type': 'text', 'content': f'Step {i}', 'order': i} for i in range(3)],
+            'special_blocks': [
+                {'type': 'ingredients', 'content': {'items': ['flour', 'water']}},
+                {'type': 'macronutrients', 'content': {'protein': 8, 'carbs': 50, 'fat': 1}},
+            ],
+        },
+        {'title': 'Sourdough', 'tags': ['Slow']},
+        {'title': 'Focaccia', 'tags': ['bread'], 'status': 'published'},
+        'not json',
+        {'title': 'Bagels', 'special_blocks': [{'type': 'ingredients', 'content': {'items': []}}]},
+    ]
+    stdout, stderr = import_recipes(write_jsonl(tmp_path / 'recipes.jsonl', rows), author, batch_size=2)
+
+    assert 'Imported 3 recipes' in stdout
+    assert 'skipped 2 invalid rows' in stdout
+    assert 'Line 3:' in stderr
+    assert 'Line 4:' in stderr
+
+    assert sorted(Recipe.objects.values_list('slug', flat=True)) == ['bagels', 'sourdough', 'sourdough-1', 'sourdough-2']
+    assert set(Tag.objects.values_list('name', flat=True)) == {'Bread', 'slow'}
+
+    recipe = Recipe.objects.get(slug='sourdough-1')
+    assert sorted(recipe.tags.values_list('name', flat=True)) == ['Bread', 'slow']
+    assert recipe.blocks.count() == 3
+    assert recipe.special_blocks.count() == 2
+    assert recipe.protein == 8
+    assert Recipe.objects.get(slug='sourdough-2').tags.get().name == 'slow'
+
+    assert list(search_recipes(Recipe.objects.all(), 'water')) == [recipe]
+
+
+@pytest.mark.django_db
+def test_import_recipes_csv(tmp_path, create_client):
+    author = create_client()
+    path = tmp_path / 'recipes.csv'
+    path.write_text(
+        'title,description,tags,steps,ingredients,is_private\n'
+        'Pancakes,Fluffy,breakfast|sweet,Mix|Fry,flour|milk|eggs,false\n'
+        'Omelette,,breakfast,Whisk,eggs,true\n'
+    )
+
+    stdout, stderr = import_recipes(path, author)
+    assert 'Imported 2 recipes' in stdout
+    assert stderr == ''
+
+    pancakes = Recipe.objects.get(slug='pancakes')
+    assert pancakes.description == 'Fluffy'
+    assert list(pancakes.blocks.values_list('content', flat=True)) == ['Mix', 'Fry']
+    assert pancakes.special_blocks.get().content == {'items': ['flour', 'milk', 'eggs']}
+    assert sorted(pancakes.ingredients.values_list('name', flat=True)) == ['egg', 'flour', 'milk']
+    assert Recipe.objects.get(slug='omelette').is_private is True
+    assert Tag.objects.get(name='breakfast').recipes.count() == 2
+    assert RecipeBlock.objects.count() == 3
+    assert RecipeSpecialBlock.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_import_recipes_unknown_author(tmp_path):
+    path = write_jsonl(tmp_path / 'recipes.jsonl', [{'title': 'Soup'}])
+
+    with pytest.raises(CommandError):
+        call_command('import_recipes', str(path), author='nobody')
+
+
+@pytest.mark.django_db
+def test_import_stamps_published_recipes(create_client):
+    importer = RecipeImporter(create_client())
+    importer.import_chunk([
+        {'title': 'Focaccia', 'status': RecipeStatus.PUBLISHED, 'final_image': 'static/recipes/focaccia.jpg'},
+        {'title': 'Sourdough'},
+    ])
+
+    assert Recipe.objects.get(title='Focaccia').published_at is not None
+    assert Recipe.objects.get(title='Sourdough').published_at is None
@@ -0,0 +1,20 @@
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.recipes.models import Recipe, RecipeStatus, RecipeDailyStats, RecipeRanking
+
+
+@pytest.mark.django_db
+def test_rank_recipes_command(create_client):
+    recipe = Recipe.objects.create(title='Pancakes', author=create_client())
+    Recipe.objects.filter(pk=recipe.pk).update(status=RecipeStatus.PUBLISHED)
+    RecipeDailyStats.objects.create(recipe=recipe, bucket=timezone.now().replace(hour=0), views=3, likes=1)
+
+    stdout = StringIO()
+    call_command('rank_recipes', stdout=stdout)
+    assert 'Ranked 1 popular and 0 trending recipes.' in stdout.getvalue()
+    assert RecipeRanking.objects.get().recipe == recipe
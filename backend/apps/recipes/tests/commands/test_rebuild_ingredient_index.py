@@ -0,0 +1,21 @@
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+
+from apps.recipes.models import Recipe, RecipeSpecialBlock, RecipeIngredient
+
+
+@pytest.mark.django_db
+def test_rebuild_ingredient_index(create_client):
+    author = create_client()
+    for title in ['Pancakes', 'Waffles', 'Toast']:
+        recipe = Recipe.objects.create(title=title, author=author)
+        RecipeSpecialBlock.objects.create(recipe=recipe, type=RecipeSpecialBlock.INGREDIENTS, content={'items': ['flour', 'eggs']})
+    RecipeIngredient.objects.all().delete()
+
+    stdout = StringIO()
+    call_command('rebuild_ingredient_index', '--batch-size', '2', stdout=stdout)
+    assert 'Indexed the ingredients of 3 recipes.' in stdout.getvalue()
+    assert RecipeIngredient.objects.count() == 6
@@ -0,0 +1,46 @@
+import pytest
+
+from django.core.management import call_command
+
+from apps.recipes.models import Recipe, Like, EngagementEvent, user_viewer
+
+
+@pytest.mark.django_db
+def test_rebuild_recipe_counters(create_client):
+    author = create_client()
+    readers = [create_client() for _ in range(3)]
+
+    recipe = Recipe.objects.create(title='Pancakes', author=author)
+    other = Recipe.objects.create(title='Waffles', author=author)
+
+    EngagementEvent.objects.bulk_create(
+        EngagementEvent.build(recipe.pk, EngagementEvent.VIEW, user_viewer(reader)) for reader in readers
+    )
+    Like.objects.create(recipe=recipe, user=readers[0])
+    Recipe.objects.filter(pk=other.pk).update(likes_count=5, views_count=7)
+
+    call_command('rebuild_recipe_counters')
+
+    recipe.refresh_from_db()
+    other.refresh_from_db()
+    assert (recipe.likes_count, recipe.views_count) == (1, 3)
+    assert (other.likes_count, other.views_count) == (0, 0)
+
+
+@pytest.mark.django_db
+def test_save_does_not_overwrite_counters(create_client):
+    author = create_client()
+    reader = create_client()
+
+    recipe = Recipe.objects.create(title='Pancakes', author=author)
+    stale = Recipe.objects.get(pk=recipe.pk)
+
+    recipe.like(reader)
+    recipe.add_view(reader)
+
+    stale.title = 'Fluffy Pancakes'
+    stale.save()
+
+    recipe.refresh_from_db()
+    assert recipe.title == 'Fluffy Pancakes'
+    assert (recipe.likes_count, recipe.views_count) == (1, 1)
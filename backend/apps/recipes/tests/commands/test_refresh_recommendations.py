@@ -0,0 +1,21 @@
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+
+from apps.recipes.models import Recipe, RecipeStatus, UserRecommendations
+
+
+@pytest.mark.django_db
+def test_refresh_recommendations_command(create_client):
+    author = create_client()
+    recipe = Recipe.objects.create(title='Pancakes', author=author)
+    Recipe.objects.filter(pk=recipe.pk).update(status=RecipeStatus.PUBLISHED)
+    recipe.like(author)
+
+    stdout = StringIO()
+    call_command('refresh_recommendations', '--full', stdout=stdout)
+    assert 'Built liked together neighbors for 0 recipes.' in stdout.getvalue()
+    assert 'Refreshed recommendations for 1 users.' in stdout.getvalue()
+    assert UserRecommendations.objects.get(user=author).recipes == []
@@ -0,0 +1,58 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.recipes.models import (
+    Recipe,
+    EngagementEvent,
+    RecipeHourlyStats,
+    RecipeDailyStats,
+    user_viewer,
+)
+from apps.recipes.rollups import roll_up
+
+
+def add_event(recipe, event_type, user, timestamp):
+    EngagementEvent.build(recipe.pk, event_type, user_viewer(user), timestamp).save()
+
+
+@pytest.mark.django_db
+def test_roll_up_is_incremental(create_client):
+    author = create_client()
+    readers = [create_client() for _ in range(4)]
+    recipe = Recipe.objects.create(title='Pancakes', author=author)
+    now = timezone.now().replace(minute=30, second=0, microsecond=0)
+
+    for reader in readers[:3]:
+        add_event(recipe, EngagementEvent.VIEW, reader, now - timedelta(hours=2))
+    add_event(recipe, EngagementEvent.LIKE, readers[0], now - timedelta(hours=2))
+
+    assert roll_up(now) == {'views': 3, 'likes': 1}
+    hourly = RecipeHourlyStats.objects.get()
+    assert hourly.bucket == now.replace(minute=0) - timedelta(hours=2)
+    assert (hourly.views, hourly.likes) == (3, 1)
+
+    # Nothing is counted twice, only rows newer than the previous run are added
+    assert roll_up(now) == {'views': 0, 'likes': 0}
+    add_event(recipe, EngagementEvent.VIEW, readers[3], now + timedelta(minutes=5))
+    assert roll_up(now + timedelta(hours=1)) == {'views': 1, 'likes': 0}
+
+    assert RecipeHourlyStats.objects.count() == 2
+    assert sum(RecipeDailyStats.objects.values_list('views', flat=True)) == 4
+    assert sum(RecipeDailyStats.objects.values_list('likes', flat=True)) == 1
+
+
+@pytest.mark.django_db
+def test_rollup_recipe_statistics_command(create_client):
+    author = create_client()
+    recipe = Recipe.objects.create(title='Pancakes', author=author)
+    add_event(recipe, EngagementEvent.LIKE, author, timezone.now() - timedelta(hours=1))
+
+    stdout = StringIO()
+    call_command('rollup_recipe_statistics', stdout=stdout)
+    assert 'Rolled up 0 views and 1 likes.' in stdout.getvalue()
+    assert RecipeDailyStats.objects.get().likes == 1
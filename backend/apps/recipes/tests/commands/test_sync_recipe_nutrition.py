@@ -0,0 +1,21 @@
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+
+from apps.recipes.models import Recipe, RecipeSpecialBlock
+
+
+@pytest.mark.django_db
+def test_sync_recipe_nutrition(create_client):
+    author = create_client()
+    for title in ['Pancakes', 'Waffles', 'Toast']:
+        recipe = Recipe.objects.create(title=title, author=author)
+        RecipeSpecialBlock.objects.create(recipe=recipe, type=RecipeSpecialBlock.CALORIES, content={'kcal': 200})
+    Recipe.objects.update(calories=None)
+
+    stdout = StringIO()
+    call_command('sync_recipe_nutrition', '--batch-size', '2', stdout=stdout)
+    assert 'Synced the nutrition of 3 recipes.' in stdout.getvalue()
+    assert list(Recipe.objects.values_list('calories', flat=True)) == [200, 200, 200]
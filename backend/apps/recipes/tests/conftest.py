@@ -10,6 +10,39 @@ from rest_framework.test import APIClient
 
 from apps.users.models import User
 from apps.recipes.models import Recipe
+from apps.recipes.caching import get_cache
+from apps.recipes.tracking import recipe_view_buffer
+
+
+@pytest.fixture(autouse=True)
+def view_buffer(settings):
+    """
+    Start every test with an empty view buffer that is only flushed on demand
+    """
+    settings.RECIPE_VIEW_FLUSH_INTERVAL = 60 * 60
+    recipe_view_buffer.clear()
+    yield recipe_view_buffer
+    recipe_view_buffer.clear()
+
+
+@pytest.fixture(autouse=True)
+def response_cache():
+    """
+    Start every test with an empty response cache
+    """
+    cache = get_cache()
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def export_root(settings, tmp_path):
+    """
+    Write rendered exports to a temporary directory
+    """
+    settings.RECIPE_EXPORT_ROOT = str(tmp_path / 'exports')
+    return tmp_path / 'exports'
 
 
 @pytest.fixture
@@ -87,8 +120,14 @@ def api_recipe_endpoints():
     return {
         'list': f'{BASE}',
         'admin-list': f'{BASE}list/',
+        'catalogue-export': f'{BASE}export/',
         'create': f'{BASE}create/',
+        'create-bulk': f'{BASE}create/bulk/',
+        'feed': lambda feed: f'{BASE}feed/{feed}/',
+        'recommended': f'{BASE}recommended/',
+        'cook': f'{BASE}cook/',
         'random': f'{BASE}random/',
+        'analytics': f'{BASE}analytics/',
         'deleted': f'{BASE}deleted/',
 
         'detail': lambda slug=None: with_slug('', slug),
@@ -99,6 +138,7 @@ def api_recipe_endpoints():
         'report': lambda slug=None: with_slug('report/', slug),
         'ban': lambda slug=None: with_slug('ban/', slug),
         'like': lambda slug=None: with_slug('like/', slug),
+        'similar': lambda slug=None: with_slug('similar/', slug),
         'statistics': lambda slug=None: with_slug('statistics/', slug),
     }
 
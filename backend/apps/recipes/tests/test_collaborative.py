@@ -0,0 +1,99 @@
+import uuid
+
+import pytest
+
+from apps.recipes.collaborative import (
+    build_like_neighbors,
+    refresh_recommendations,
+    user_recommendations,
+)
+from apps.recipes.models import Recipe, RecipeStatus, RecipeNeighbor, UserRecommendations
+
+
+def make_user(create_client):
+    name = uuid.uuid4().hex[:12]
+    return create_client(username=name, email=f'{name}@example.com')
+
+
+@pytest.fixture
+def catalogue(create_client):
+    author = make_user(create_client)
+    recipes = {}
+    for title in ['Pancakes', 'Waffles', 'Crepes', 'Steak', 'Burger']:
+        recipe = Recipe.objects.create(title=title, author=author)
+        Recipe.objects.filter(pk=recipe.pk).update(status=RecipeStatus.PUBLISHED)
+        recipes[title] = recipe
+    return recipes
+
+
+@pytest.fixture
+def likes(catalogue, create_client):
+    users = {}
+    for name, titles in [
+        ('ann', ['Pancakes', 'Waffles', 'Crepes']),
+        ('bob', ['Pancakes', 'Waffles']),
+        ('cid', ['Steak', 'Burger']),
+        ('dan', ['Steak', 'Burger', 'Waffles']),
+        ('eve', ['Pancakes']),
+    ]:
+        user = make_user(create_client)
+        for title in titles:
+            catalogue[title].like(user)
+        users[name] = user
+    return users
+
+
+def titles(recipes):
+    return [recipe.title for recipe in recipes]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('like_chunk_size', [2, 5000])
+def test_build_like_neighbors(catalogue, likes, monkeypatch, like_chunk_size):
+    monkeypatch.setattr('apps.recipes.collaborative.LIKE_CHUNK_SIZE', like_chunk_size)
+    assert build_like_neighbors(k=2) == 5
+
+    pancakes = RecipeNeighbor.objects.filter(kind=RecipeNeighbor.LIKES, recipe=catalogue['Pancakes'])
+    assert list(pancakes.values_list('neighbor__title', flat=True)) == ['Waffles', 'Crepes']
+    steak = RecipeNeighbor.objects.filter(kind=RecipeNeighbor.LIKES, recipe=catalogue['Steak'])
+    assert steak.values_list('neighbor__title', flat=True)[0] == 'Burger'
+    # Content neighbors are left alone
+    assert not RecipeNeighbor.objects.filter(kind=RecipeNeighbor.CONTENT).exists()
+
+
+@pytest.mark.django_db
+def test_refresh_recommendations(catalogue, likes, monkeypatch):
+    monkeypatch.setattr('apps.recipes.collaborative.USER_CHUNK_SIZE', 2)
+    build_like_neighbors()
+
+    assert refresh_recommendations() == 5
+    assert titles(user_recommendations(likes['eve']))[0] == 'Waffles'
+    assert 'Pancakes' not in titles(user_recommendations(likes['eve']))
+    assert titles(user_recommendations(likes['cid']))[0] == 'Waffles'
+
+    # Only lists made stale by a like or unlike are recomputed
+    assert refresh_recommendations() == 0
+    catalogue['Waffles'].like(likes['eve'])
+    assert UserRecommendations.objects.get(user=likes['eve']).is_stale
+    assert refresh_recommendations() == 1
+    assert 'Waffles' not in titles(user_recommendations(likes['eve']))
+    assert not UserRecommendations.objects.filter(is_stale=True).exists()
+
+
+@pytest.mark.django_db
+def test_full_refresh_drops_users_without_likes(catalogue, likes):
+    build_like_neighbors()
+    refresh_recommendations()
+    catalogue['Pancakes'].unlike(likes['eve'])
+
+    assert refresh_recommendations(full=True) == 4
+    assert not UserRecommendations.objects.filter(user=likes['eve']).exists()
+
+
+@pytest.mark.django_db
+def test_user_recommendations_hide_recipes_no_longer_public(catalogue, likes):
+    build_like_neighbors()
+    refresh_recommendations()
+    Recipe.objects.filter(pk=catalogue['Waffles'].pk).update(is_private=True)
+
+    assert 'Waffles' not in titles(user_recommendations(likes['eve']))
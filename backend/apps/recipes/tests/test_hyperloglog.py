@@ -0,0 +1,48 @@
+import pytest
+
+from apps.recipes.hyperloglog import HyperLogLog, REGISTERS
+from apps.recipes.models import Recipe, RecipeVisitors, viewer_hash
+
+
+def hashes(start, stop):
+    return [viewer_hash(f'visitor:{index}') for index in range(start, stop)]
+
+
+@pytest.mark.parametrize('count', [0, 1, 10, 1000, 50000])
+def test_count_is_close(count):
+    sketch = HyperLogLog.from_values(hashes(0, count))
+    assert abs(sketch.count() - count) <= max(1, count * 0.1)
+
+
+def test_repeats_and_merges_are_idempotent():
+    sketch = HyperLogLog.from_values(hashes(0, 5000))
+    estimate = sketch.count()
+
+    sketch.update(hashes(0, 5000))
+    sketch.merge(HyperLogLog(bytes(sketch)))
+    assert sketch.count() == estimate
+    assert len(bytes(sketch)) == REGISTERS
+
+
+def test_merge_counts_the_union():
+    first = HyperLogLog.from_values(hashes(0, 3000))
+    second = HyperLogLog.from_values(hashes(2000, 5000))
+    assert first.merge(second).count() == HyperLogLog.from_values(hashes(0, 5000)).count()
+
+
+def test_rejects_wrong_size():
+    with pytest.raises(ValueError):
+        HyperLogLog(b'\x00' * 16)
+
+
+@pytest.mark.django_db
+def test_add_merges_into_stored_sketches(create_client):
+    author = create_client()
+    recipe = Recipe.objects.create(title='Pancakes', author=author)
+
+    RecipeVisitors.add({recipe.pk: hashes(0, 300)})
+    RecipeVisitors.add({recipe.pk: hashes(200, 600)})
+
+    recipe.refresh_from_db()
+    assert abs(recipe.unique_visitors - 600) <= 60
+    assert HyperLogLog(RecipeVisitors.objects.get(recipe=recipe).sketch).count() == recipe.unique_visitors
@@ -0,0 +1,75 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.recipes.ingredients import cook_with, normalize_ingredient
+from apps.recipes.models import Recipe, RecipeStatus, RecipeSpecialBlock, Ingredient
+
+
+def add_recipe(author, title, items, public=True):
+    recipe = Recipe.objects.create(title=title, author=author)
+    if public:
+        Recipe.objects.filter(pk=recipe.pk).update(status=RecipeStatus.PUBLISHED)
+    RecipeSpecialBlock.objects.create(recipe=recipe, type=RecipeSpecialBlock.INGREDIENTS, content={'items': items})
+    return recipe
+
+
+def ingredient_names(recipe):
+    return sorted(recipe.ingredients.values_list('name', flat=True))
+
+
+@pytest.mark.parametrize(
+    'line, name',
+    [
+        ('2 cups All-Purpose Flour, sifted', 'all-purpose flour'),
+        ('3 Eggs', 'egg'),
+        ('1 (400g) can of tomatoes', 'can tomato'),
+        ('Fresh berries', 'berry'),
+        ('Salt, to taste', 'salt'),
+        ('Couscous', 'couscous'),
+        ('2 tbsp', ''),
+    ]
+)
+def test_normalize_ingredient(line, name):
+    assert normalize_ingredient(line) == name
+
+
+@pytest.mark.django_db
+def test_blocks_keep_ingredients_current(create_client):
+    recipe = add_recipe(create_client(), 'Pancakes', ['2 cups flour', '2 eggs', '1 egg yolk', 'Eggs'])
+    assert ingredient_names(recipe) == ['egg', 'egg yolk', 'flour']
+
+    block = RecipeSpecialBlock.objects.get(recipe=recipe)
+    block.content = {'items': ['flour', 'milk']}
+    block.save()
+    assert ingredient_names(recipe) == ['flour', 'milk']
+
+    block.delete()
+    assert ingredient_names(recipe) == []
+    # Ingredients are shared and outlive their recipes
+    assert Ingredient.objects.filter(name='egg').exists()
+
+
+@pytest.mark.django_db
+def test_cook_with(create_client):
+    author = create_client()
+    pancakes = add_recipe(author, 'Pancakes', ['flour', 'eggs', 'milk'])
+    crepes = add_recipe(author, 'Crepes', ['flour', 'eggs', 'milk', 'butter'])
+    omelette = add_recipe(author, 'Omelette', ['eggs'])
+    add_recipe(author, 'Steak', ['beef', 'salt'])
+    add_recipe(author, 'Draft', ['flour'], public=False)
+
+    with CaptureQueriesContext(connection) as queries:
+        results = cook_with(['Flour', '2 eggs', 'milk'])
+    assert len(queries) == 4
+    assert [(recipe.title, matched, missing) for recipe, matched, missing in results] == [
+        ('Pancakes', 3, []),
+        ('Omelette', 1, []),
+        ('Crepes', 3, ['butter']),
+    ]
+
+    assert [recipe for recipe, _, _ in cook_with(['flour', 'eggs', 'milk'], limit=1)] == [pancakes]
+    assert [recipe for recipe, _, _ in cook_with(['eggs'], max_missing=0)] == [omelette]
+    assert cook_with(['saffron']) == []
+    assert crepes in [recipe for recipe, _, _ in cook_with(['butter'])]
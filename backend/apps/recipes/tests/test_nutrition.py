@@ -0,0 +1,50 @@
+import pytest
+
+from apps.recipes.models import Recipe, RecipeSpecialBlock
+from apps.recipes.nutrition import nutrition_values
+
+
+def nutrition(recipe):
+    return Recipe.objects.values('calories', 'protein', 'fat', 'carbs').get(pk=recipe.pk)
+
+
+@pytest.mark.parametrize(
+    'blocks, values',
+    [
+        ([], {'calories': None, 'protein': None, 'fat': None, 'carbs': None}),
+        (
+            [('macronutrients', {'protein': 5, 'fat': 10, 'carbs': 20, 'calories': 190})],
+            {'calories': 190, 'protein': 5, 'fat': 10, 'carbs': 20},
+        ),
+        (
+            [('calories', {'kcal': 200}), ('macronutrients', {'protein': 5, 'fat': 10, 'carbs': 20, 'calories': 190})],
+            {'calories': 200, 'protein': 5, 'fat': 10, 'carbs': 20},
+        ),
+        (
+            [('macronutrients', {'protein': 5, 'fat': 10, 'carbs': 20, 'calories': 190}), ('calories', {'kcal': 200})],
+            {'calories': 200, 'protein': 5, 'fat': 10, 'carbs': 20},
+        ),
+        ([('times', {'prep_minutes': 5, 'cook_minutes': 10})], {'calories': None, 'protein': None, 'fat': None, 'carbs': None}),
+    ]
+)
+def test_nutrition_values(blocks, values):
+    assert nutrition_values(blocks) == values
+
+
+@pytest.mark.django_db
+def test_blocks_keep_nutrition_current(create_client):
+    recipe = Recipe.objects.create(title='Pancakes', author=create_client())
+    macros = RecipeSpecialBlock.objects.create(
+        recipe=recipe, type=RecipeSpecialBlock.MACRONUTRIENTS, content={'protein': 5, 'fat': 10, 'carbs': 20},
+    )
+    assert nutrition(recipe) == {'calories': None, 'protein': 5, 'fat': 10, 'carbs': 20}
+
+    calories = RecipeSpecialBlock.objects.create(recipe=recipe, type=RecipeSpecialBlock.CALORIES, content={'kcal': 190})
+    macros.content = {'protein': 8, 'fat': 10, 'carbs': 20}
+    macros.save()
+    assert nutrition(recipe) == {'calories': 190, 'protein': 8, 'fat': 10, 'carbs': 20}
+
+    macros.delete()
+    assert nutrition(recipe) == {'calories': 190, 'protein': None, 'fat': None, 'carbs': None}
+    calories.delete()
+    assert nutrition(recipe) == {'calories': None, 'protein': None, 'fat': None, 'carbs': None}
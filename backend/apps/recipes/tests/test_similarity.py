@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+from scipy import sparse
+
+from apps.recipes.models import Recipe, RecipeStatus, RecipeSpecialBlock, RecipeNeighbor, Tag
+from apps.recipes.similarity import (
+    build_neighbors,
+    ingredient_tokens,
+    macro_shares,
+    recommended_recipes,
+    top_neighbors,
+)
+
+
+@pytest.fixture
+def catalogue(create_client):
+    author = create_client()
+    breakfast = Tag.objects.create(name='breakfast')
+    dinner = Tag.objects.create(name='dinner')
+
+    recipes = {}
+    for title, tags, items, macros in [
+        ('Pancakes', [breakfast], ['2 cups flour', '2 eggs', '1 cup milk', 'sugar'], (10, 8, 60)),
+        ('Waffles', [breakfast], ['flour', '3 eggs', 'milk', 'butter'], (9, 12, 55)),
+        ('Crepes', [breakfast], ['flour', 'eggs', 'milk'], None),
+        ('Steak', [dinner], ['beef steak', 'salt', 'pepper'], (60, 30, 0)),
+        ('Burger', [dinner], ['ground beef', 'buns', 'salt'], (40, 25, 30)),
+        ('Draft', [breakfast], ['flour', 'eggs', 'milk'], None),
+    ]:
+        recipe = Recipe.objects.create(title=title, author=author)
+        if title != 'Draft':
+            Recipe.objects.filter(pk=recipe.pk).update(status=RecipeStatus.PUBLISHED)
+        recipe.tags.set(tags)
+        RecipeSpecialBlock.objects.create(recipe=recipe, type=RecipeSpecialBlock.INGREDIENTS, content={'items': items})
+        if macros:
+            protein, fat, carbs = macros
+            RecipeSpecialBlock.objects.create(
+                recipe=recipe,
+                type=RecipeSpecialBlock.MACRONUTRIENTS,
+                content={'protein': protein, 'fat': fat, 'carbs': carbs},
+            )
+        recipes[title] = recipe
+    return recipes
+
+
+def neighbors_of(recipe):
+    return list(
+        RecipeNeighbor.objects.filter(kind=RecipeNeighbor.CONTENT, recipe=recipe).values_list('neighbor__title', flat=True)
+    )
+
+
+def test_ingredient_tokens():
+    assert ingredient_tokens(['2 cups of Flour', '1 tbsp olive oil', 'salt, to taste']) == {'flour', 'olive', 'oil', 'salt'}
+
+
+def test_macro_shares():
+    assert macro_shares(25, 0, 25) == [0.5, 0.0, 0.5]
+    assert macro_shares(None, 1, 1) is None
+    assert macro_shares(0, 0, 0) is None
+
+
+@pytest.mark.parametrize('block_cells', [1, 5, 2 ** 22])
+def test_top_neighbors(monkeypatch, block_cells):
+    monkeypatch.setattr('apps.recipes.similarity.BLOCK_CELLS', block_cells)
+    matrix = sparse.csr_matrix(np.array([
+        [1.0, 0.0, 0.0],
+        [0.8, 0.6, 0.0],
+        [0.0, 0.6, 0.8],
+        [0.0, 0.0, 0.0],
+    ]))
+    result = dict(top_neighbors(matrix, 2))
+    assert [row for row, _ in result[0]] == [1]
+    assert [row for row, _ in result[1]] == [0, 2]
+    assert result[1][0][1] == pytest.approx(0.8)
+    assert result[3] == []
+
+
+@pytest.mark.django_db
+def test_build_neighbors(catalogue, monkeypatch):
+    # A block per row
+    monkeypatch.setattr('apps.recipes.similarity.BLOCK_CELLS', 1)
+
+    assert build_neighbors(k=2) == 5
+    assert set(neighbors_of(catalogue['Pancakes'])) == {'Waffles', 'Crepes'}
+    assert neighbors_of(catalogue['Steak'])[0] == 'Burger'
+    # Only public recipes are ranked
+    assert neighbors_of(catalogue['Draft']) == []
+    assert 'Draft' not in RecipeNeighbor.objects.values_list('neighbor__title', flat=True)
+
+    # Rebuilding replaces the previous neighbors
+    build_neighbors(k=1)
+    assert RecipeNeighbor.objects.count() == 5
+
+
+@pytest.mark.django_db
+def test_recommended_recipes(catalogue, create_client):
+    reader = create_client()
+    build_neighbors(k=3)
+
+    assert recommended_recipes(reader) == []
+
+    catalogue['Steak'].like(reader)
+    catalogue['Pancakes'].like(reader)
+    recommended = [recipe.title for recipe in recommended_recipes(reader, limit=3)]
+    # Neighbors of both liked recipes, without the liked ones
+    assert set(recommended) == {'Waffles', 'Crepes', 'Burger'}
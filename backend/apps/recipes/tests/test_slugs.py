@@ -0,0 +1,80 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.recipes import slugs
+from apps.recipes.models import Recipe, Tag
+from apps.recipes.serializers.recipe import RecipeSerializer
+from apps.recipes.slugs import allocate_slugs
+
+
+@pytest.fixture
+def author(create_client):
+    return create_client()
+
+
+@pytest.mark.django_db
+def test_allocate_slugs_after_highest_suffix(author):
+    for slug in ['pancakes', 'pancakes-2', 'pancakes-best', 'pancakes-best-7']:
+        Recipe.objects.create(title='Pancakes', slug=slug, author=author)
+
+    with CaptureQueriesContext(connection) as queries:
+        allocated = allocate_slugs(Recipe, ['Pancakes', 'Waffles', 'pancakes', 'Pancakes Best'])
+    assert allocated == ['pancakes-3', 'waffles', 'pancakes-4', 'pancakes-best-8']
+    assert len(queries) == 1
+    # The suffixes are aggregated in the database, not loaded
+    assert 'MAX(' in queries[0]['sql'].upper()
+
+
+@pytest.mark.django_db
+def test_allocate_slugs_compares_suffixes_as_numbers(author):
+    for slug in ['toast', 'toast-9', 'toast-10', 'toast-10-2', 'toast-99999999999999999999']:
+        Recipe.objects.create(title='Toast', slug=slug, author=author)
+
+    assert allocate_slugs(Recipe, ['Toast']) == ['toast-11']
+
+
+@pytest.mark.django_db
+def test_allocate_slugs_within_names(author):
+    Recipe.objects.create(title='Crepes 2', author=author)
+
+    assert allocate_slugs(Recipe, ['Crepes', 'Crepes', 'Crepes 3', 'Crepes']) == ['crepes', 'crepes-3', 'crepes-3-1', 'crepes-4']
+    assert allocate_slugs(Recipe, ['', '!!']) == ['recipe', 'recipe-1']
+
+
+@pytest.mark.django_db
+def test_save_allocates_slug_with_one_lookup(author):
+    for _ in range(5):
+        Recipe.objects.create(title='Pancakes', author=author)
+
+    with CaptureQueriesContext(connection) as queries:
+        recipe = Recipe.objects.create(title='Pancakes', author=author)
+    assert recipe.slug == 'pancakes-5'
+    assert len([query for query in queries if 'slug' in query['sql'] and query['sql'].startswith('SELECT')]) == 1
+
+    assert Tag.objects.create(name='Quick').slug == 'quick'
+
+
+@pytest.mark.django_db
+def test_save_retries_taken_slug(author, monkeypatch):
+    Recipe.objects.create(title='Pancakes', author=author)
+
+    # The first allocation misses the row, as if it were inserted concurrently
+    allocate_slug = slugs.allocate_slug
+    stale = iter(['pancakes'])
+    monkeypatch.setattr(slugs, 'allocate_slug', lambda *args, **kwargs: next(stale, None) or allocate_slug(*args, **kwargs))
+
+    assert Recipe.objects.create(title='Pancakes', author=author).slug == 'pancakes-1'
+
+
+@pytest.mark.django_db
+def test_rename_keeps_or_reallocates_slug(author):
+    recipe = Recipe.objects.create(title='Pancakes', author=author)
+    Recipe.objects.create(title='Waffles', author=author)
+
+    RecipeSerializer().update(recipe, {'title': 'PANCAKES'})
+    assert recipe.slug == 'pancakes'
+
+    RecipeSerializer().update(recipe, {'title': 'Waffles'})
+    assert recipe.slug == 'waffles-1'
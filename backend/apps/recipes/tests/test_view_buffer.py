@@ -0,0 +1,126 @@
+import pytest
+
+from django.contrib.auth.models import AnonymousUser
+from django.db import DatabaseError, connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from apps.recipes.models import Recipe, RecipeStatus, EngagementEvent, user_viewer
+
+
+@pytest.fixture
+def published_recipe(create_client):
+    author = create_client()
+    recipe = Recipe.objects.create(title='Pancakes', author=author)
+    Recipe.objects.filter(pk=recipe.pk).update(status=RecipeStatus.PUBLISHED)
+    recipe.refresh_from_db()
+    return recipe
+
+
+def viewer_request(user=None, address='127.0.0.1'):
+    request = RequestFactory().get('/', REMOTE_ADDR=address, HTTP_USER_AGENT='pytest')
+    request.user = user or AnonymousUser()
+    return request
+
+
+@pytest.mark.django_db
+def test_detail_view_does_not_write(auth_client, published_recipe, api_recipe_endpoints, view_buffer):
+    client, user = auth_client
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(api_recipe_endpoints['detail'](published_recipe.slug))
+    assert response.status_code == status.HTTP_200_OK
+
+    writes = [query for query in queries if query['sql'].startswith(('INSERT', 'UPDATE'))]
+    assert writes == []
+    assert len(view_buffer) == 1
+    assert not EngagementEvent.objects.exists()
+
+
+@pytest.mark.django_db
+def test_flush_writes_every_view_and_counters(create_client, published_recipe, view_buffer):
+    readers = [create_client() for _ in range(3)]
+
+    for reader in readers + readers:
+        view_buffer.record(published_recipe.pk, viewer_request(reader))
+    view_buffer.record(published_recipe.pk, viewer_request(address='10.0.0.1'))
+    view_buffer.record(published_recipe.pk, viewer_request(address='10.0.0.2'))
+
+    with CaptureQueriesContext(connection) as queries:
+        assert view_buffer.flush() == 8
+    assert len(view_buffer) == 0
+    # One insert for the events, one for the new visitor sketch
+    assert len([query for query in queries if query['sql'].startswith('INSERT')]) == 2
+
+    # Repeats of a viewer within the minute share a row
+    events = EngagementEvent.objects.filter(recipe=published_recipe, type=EngagementEvent.VIEW)
+    assert events.count() == 5
+    assert events.get(viewer=user_viewer(readers[0])).count == 2
+    assert len(set(events.values_list('viewer', flat=True))) == 5
+
+    published_recipe.refresh_from_db()
+    assert published_recipe.views_count == 8
+    assert published_recipe.unique_visitors == 5
+
+
+@pytest.mark.django_db
+def test_anonymous_views_recorded_from_cache(client, published_recipe, api_recipe_endpoints, view_buffer):
+    Recipe.objects.filter(pk=published_recipe.pk).update(final_image='static/recipes/pancakes.jpg')
+
+    for _ in range(3):
+        response = client.get(api_recipe_endpoints['detail'](published_recipe.slug))
+        assert response.status_code == status.HTTP_200_OK
+
+    assert len(view_buffer) == 3
+
+
+@pytest.mark.django_db
+def test_flush_when_buffer_is_full(auth_client, published_recipe, api_recipe_endpoints, view_buffer, settings):
+    client, user = auth_client
+    settings.RECIPE_VIEW_BUFFER_SIZE = 1
+
+    response = client.get(api_recipe_endpoints['detail'](published_recipe.slug))
+    assert response.status_code == status.HTTP_200_OK
+
+    assert len(view_buffer) == 0
+    published_recipe.refresh_from_db()
+    assert published_recipe.views_count == 1
+
+
+@pytest.mark.django_db
+def test_record_arms_flush_timer(published_recipe, view_buffer, settings):
+    view_buffer.record(published_recipe.pk, viewer_request())
+    timer = view_buffer._timer
+    assert timer is not None and timer.interval == settings.RECIPE_VIEW_FLUSH_INTERVAL
+
+    # Later views share the timer, a flush disarms it
+    view_buffer.record(published_recipe.pk, viewer_request())
+    assert view_buffer._timer is timer
+    view_buffer.flush()
+    assert view_buffer._timer is None
+    assert timer.finished.is_set()
+
+
+@pytest.mark.django_db
+def test_flush_drops_views_of_deleted_recipes(create_client, published_recipe, view_buffer):
+    deleted = Recipe.objects.create(title='Waffles', author=create_client())
+    view_buffer.record(published_recipe.pk, viewer_request())
+    view_buffer.record(deleted.pk, viewer_request())
+    Recipe.objects.filter(pk=deleted.pk).delete()
+
+    assert view_buffer.flush() == 1
+    assert list(EngagementEvent.objects.values_list('recipe_id', flat=True)) == [published_recipe.pk]
+
+
+@pytest.mark.django_db
+def test_flush_errors_do_not_escape_request(published_recipe, view_buffer, settings, monkeypatch, caplog):
+    settings.RECIPE_VIEW_BUFFER_SIZE = 1
+    view_buffer.record(published_recipe.pk, viewer_request())
+
+    def fail(*args, **kwargs):
+        raise DatabaseError('database is gone')
+
+    monkeypatch.setattr(EngagementEvent.objects, 'bulk_create', fail)
+    assert view_buffer.flush_if_due() == 0
+    assert 'Failed to flush the recipe view buffer' in caplog.text
@@ -5,9 +5,12 @@ from rest_framework import status
 
 from apps.recipes.views.recipe import (
     recipe_create_view,
+    recipe_bulk_create_view,
     recipe_list_view,
     recipe_admin_list_view,
+    recipe_catalogue_export_view,
     random_recipe_view,
+    recipe_analytics_view,
 
     recipe_detail_view,
     recipe_update_view,
@@ -27,8 +30,11 @@ from apps.recipes.views.recipe import (
     [
         ('recipe-list-user', None, recipe_list_view),
         ('recipe-list', None, recipe_admin_list_view),
+        ('recipe-catalogue-export', None, recipe_catalogue_export_view),
         ('recipe-create', None, recipe_create_view),
+        ('recipe-create-bulk', None, recipe_bulk_create_view),
         ('recipe-random', None, random_recipe_view),
+        ('recipe-analytics', None, recipe_analytics_view),
         ('recipe-deleted', None, deleted_recipe_list_view),
 
         ('recipe-detail', {'slug': 'test-slug'}, recipe_detail_view),
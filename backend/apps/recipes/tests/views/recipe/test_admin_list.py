@@ -43,7 +43,7 @@ def test_admin_list_recipes_success(verified_user_with_recipe, api_recipe_endpoi
     )
     assert response.status_code == status.HTTP_200_OK
 
-    response_data = response.json()
+    response_data = response.json()['results']
     assert len(response_data) == 4
     
     response_ids = {recipe['id'] for recipe in response_data}
@@ -64,7 +64,7 @@ def test_admin_list_recipes_success(verified_user_with_recipe, api_recipe_endpoi
 @pytest.mark.django_db
 def test_admin_list_recipes_failure_unathenticated(client, api_recipe_endpoints):
     response = client.get(
-        api_recipe_endpoints['list'],
+        api_recipe_endpoints['admin-list'],
         HTTP_ACCEPT='application/json',
     )
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -84,4 +84,4 @@ def test_admin_list_recipes_no_recipes(auth_client, api_recipe_endpoints):
         HTTP_ACCEPT='application/json',
     )
     assert response.status_code == status.HTTP_200_OK
-    assert response.json() == []
+    assert response.json()['results'] == []
@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+
+from apps.recipes.models import Recipe, RecipeDailyStats, RecipeHourlyStats
+
+
+@pytest.fixture
+def recipes(auth_client, create_client):
+    client, user = auth_client
+    yesterday = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(days=1)
+    recipes = []
+    for title, views, likes in [('Pancakes', 10, 1), ('Waffles', 40, 2), ('Crepes', 4, 3), ('Toast', 0, 0)]:
+        recipe = Recipe.objects.create(title=title, author=user)
+        if views:
+            RecipeHourlyStats.objects.create(recipe=recipe, bucket=yesterday, views=views, likes=likes)
+            RecipeDailyStats.objects.create(recipe=recipe, bucket=yesterday.replace(hour=0), views=views, likes=likes)
+        recipes.append(recipe)
+
+    # Other authors are left out
+    other = Recipe.objects.create(title='Other', author=create_client())
+    RecipeDailyStats.objects.create(recipe=other, bucket=yesterday.replace(hour=0), views=100, likes=100)
+    return recipes
+
+
+def get_analytics(client, api_recipe_endpoints, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(api_recipe_endpoints['analytics'], params, HTTP_ACCEPT='application/json')
+    return response, len(queries)
+
+
+@pytest.mark.django_db
+def test_analytics_totals(auth_client, recipes, api_recipe_endpoints):
+    client, user = auth_client
+
+    response, _ = get_analytics(client, api_recipe_endpoints)
+    assert response.status_code == status.HTTP_200_OK
+    analytics = response.json()['analytics']
+
+    assert analytics['recipes_count'] == 4
+    assert analytics['total_views'] == 54
+    assert analytics['total_likes'] == 6
+    assert len(analytics['data']) == 7
+    assert analytics['data'][-2]['views'] == 54
+
+    assert [recipe['title'] for recipe in analytics['recipes']] == ['Waffles', 'Pancakes', 'Crepes', 'Toast']
+    waffles = analytics['recipes'][0]
+    assert (waffles['total_views'], waffles['total_likes'], waffles['engagement_rate']) == (40, 2, 5)
+    assert waffles['data'][-2] == {'period': analytics['data'][-2]['period'], 'views': 40, 'likes': 2}
+
+
+@pytest.mark.django_db
+def test_analytics_top_n(auth_client, recipes, api_recipe_endpoints):
+    client, user = auth_client
+
+    response, _ = get_analytics(client, api_recipe_endpoints, sort='engagement', limit=2)
+    analytics = response.json()['analytics']
+    assert [recipe['title'] for recipe in analytics['recipes']] == ['Crepes', 'Pancakes']
+    # Totals still cover every recipe
+    assert analytics['total_views'] == 54
+
+    response, _ = get_analytics(client, api_recipe_endpoints, sort='likes', limit=1, **{'time-view': 'hour'})
+    assert response.json()['analytics']['recipes'][0]['title'] == 'Crepes'
+
+
+@pytest.mark.django_db
+def test_analytics_constant_queries(auth_client, recipes, api_recipe_endpoints):
+    client, user = auth_client
+    _, few = get_analytics(client, api_recipe_endpoints)
+
+    day = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=2)
+    for i in range(20):
+        recipe = Recipe.objects.create(title=f'Recipe {i}', author=user)
+        RecipeDailyStats.objects.create(recipe=recipe, bucket=day, views=i, likes=0)
+
+    _, many = get_analytics(client, api_recipe_endpoints)
+    assert many == few
+
+
+@pytest.mark.django_db
+def test_analytics_invalid_sort(auth_client, api_recipe_endpoints):
+    client, user = auth_client
+
+    response, _ = get_analytics(client, api_recipe_endpoints, sort='title')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'sort' in response.json()
+
+
+@pytest.mark.django_db
+def test_analytics_unauthenticated(client, api_recipe_endpoints):
+    response, _ = get_analytics(client, api_recipe_endpoints)
+    assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,125 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from apps.recipes.models import (
+    Recipe,
+    RecipeBlock,
+    Tag,
+)
+
+
+@pytest.fixture
+def public_recipe(create_client):
+    author = create_client()
+    recipe = Recipe.objects.create(title='Cached Recipe', author=author)
+    Recipe.objects.filter(pk=recipe.pk).update(status='published', final_image='static/recipes/cached.jpg')
+    recipe.refresh_from_db()
+    return recipe
+
+
+def get_json(client, url, params=None):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params, HTTP_ACCEPT='application/json')
+    assert response.status_code == status.HTTP_200_OK
+    return response.json(), len(queries)
+
+
+@pytest.mark.django_db
+def test_detail_anonymous_cached(client, public_recipe, api_recipe_endpoints):
+    url = api_recipe_endpoints['detail'](public_recipe.slug)
+
+    data, first_queries = get_json(client, url)
+    cached_data, cached_queries = get_json(client, url)
+
+    assert first_queries > 0
+    assert cached_queries == 0
+    assert cached_data == data
+
+
+@pytest.mark.django_db
+def test_detail_cache_invalidated_by_recipe_change(client, public_recipe, api_recipe_endpoints):
+    url = api_recipe_endpoints['detail'](public_recipe.slug)
+    get_json(client, url)
+
+    public_recipe.title = 'Renamed Recipe'
+    public_recipe.save()
+
+    data, queries = get_json(client, url)
+    assert queries > 0
+    assert data['recipe']['title'] == 'Renamed Recipe'
+
+
+@pytest.mark.django_db
+def test_detail_cache_invalidated_by_block_change(client, public_recipe, api_recipe_endpoints):
+    url = api_recipe_endpoints['detail'](public_recipe.slug)
+    get_json(client, url)
+
+    RecipeBlock.objects.create(recipe=public_recipe, content='New step', order=0)
+
+    data, _ = get_json(client, url)
+    assert [block['content'] for block in data['recipe']['blocks']] == ['New step']
+
+
+@pytest.mark.django_db
+def test_detail_cache_invalidated_by_tag_change(client, public_recipe, api_recipe_endpoints):
+    url = api_recipe_endpoints['detail'](public_recipe.slug)
+    tag = Tag.objects.create(name='soup')
+    public_recipe.tags.add(tag)
+    get_json(client, url)
+
+    tag.name = 'stew'
+    tag.save()
+
+    _, queries = get_json(client, url)
+    assert queries > 0
+
+
+@pytest.mark.django_db
+def test_detail_cache_invalidated_by_ban(client, public_recipe, api_recipe_endpoints):
+    url = api_recipe_endpoints['detail'](public_recipe.slug)
+    get_json(client, url)
+
+    public_recipe.is_banned = True
+    public_recipe.save(update_fields=['is_banned'])
+
+    response = client.get(url, HTTP_ACCEPT='application/json')
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_detail_authenticated_not_cached(auth_client, public_recipe, api_recipe_endpoints):
+    client, user = auth_client
+    url = api_recipe_endpoints['detail'](public_recipe.slug)
+
+    get_json(client, url)
+    _, queries = get_json(client, url)
+    assert queries > 0
+
+
+@pytest.mark.django_db
+def test_list_anonymous_cached(client, public_recipe, api_recipe_endpoints):
+    url = api_recipe_endpoints['list']
+
+    data, _ = get_json(client, url, {'sort': 'title', 'page_size': 5})
+    cached_data, cached_queries = get_json(client, url, {'page_size': 5, 'sort': 'title'})
+
+    assert cached_queries == 0
+    assert cached_data == data
+
+    _, queries = get_json(client, url, {'sort': '-title', 'page_size': 5})
+    assert queries > 0
+
+
+@pytest.mark.django_db
+def test_list_cache_invalidated_by_delete(client, public_recipe, api_recipe_endpoints):
+    url = api_recipe_endpoints['list']
+    data, _ = get_json(client, url)
+    assert len(data['results']) == 1
+
+    public_recipe.delete()
+
+    data, _ = get_json(client, url)
+    assert data['results'] == []
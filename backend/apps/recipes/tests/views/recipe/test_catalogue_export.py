@@ -0,0 +1,141 @@
+import csv
+import io
+import json
+
+import pytest
+import yaml
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from apps.recipes.models import (
+    Recipe,
+    RecipeBlock,
+    RecipeSpecialBlock,
+    Tag,
+)
+
+
+@pytest.fixture
+def admin_client(auth_client):
+    client, user = auth_client
+    user.is_verified = True
+    user.is_staff = True
+    user.is_superuser = True
+    user.save()
+    return client, user
+
+
+@pytest.fixture
+def catalogue(create_client):
+    author = create_client(username='baker')
+    tag = Tag.objects.create(name='bread')
+    recipes = []
+    for i in range(5):
+        recipe = Recipe.objects.create(title=f'Loaf {i}', description='Crusty', author=author)
+        recipe.tags.add(tag)
+        RecipeBlock.objects.create(recipe=recipe, content='Knead', order=0)
+        RecipeBlock.objects.create(recipe=recipe, content='Bake', order=1)
+        RecipeSpecialBlock.objects.create(
+            recipe=recipe, type=RecipeSpecialBlock.INGREDIENTS, content={'items': ['flour', 'water']}
+        )
+        recipes.append(recipe)
+    Recipe.objects.filter(pk=recipes[0].pk).update(is_deleted=True)
+    return recipes
+
+
+def export(client, url, **params):
+    response = client.get(url, params)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.streaming
+    return response, b''.join(response.streaming_content).decode('utf-8')
+
+
+@pytest.mark.django_db
+def test_catalogue_export_jsonl(admin_client, catalogue, api_recipe_endpoints):
+    client, user = admin_client
+
+    response, content = export(client, api_recipe_endpoints['catalogue-export'])
+    assert response['Content-Type'].startswith('application/x-ndjson')
+    assert response['Content-Disposition'] == 'attachment; filename="recipes.jsonl"'
+
+    documents = [json.loads(line) for line in content.splitlines()]
+    assert [document['title'] for document in documents] == ['Loaf 1', 'Loaf 2', 'Loaf 3', 'Loaf 4']
+    assert documents[0]['author'] == 'baker'
+    assert documents[0]['tags'] == ['bread']
+    assert documents[0]['steps'] == ['Knead', 'Bake']
+    assert documents[0]['ingredients'] == ['flour', 'water']
+
+
+@pytest.mark.django_db
+def test_catalogue_export_csv(admin_client, catalogue, api_recipe_endpoints):
+    client, user = admin_client
+
+    response, content = export(client, api_recipe_endpoints['catalogue-export'], format='csv')
+    assert response['Content-Type'].startswith('text/csv')
+
+    rows = list(csv.DictReader(io.StringIO(content)))
+    assert len(rows) == 4
+    assert rows[0]['steps'] == 'Knead|Bake'
+    assert rows[0]['ingredients'] == 'flour|water'
+
+
+@pytest.mark.django_db
+def test_catalogue_export_yaml(admin_client, catalogue, api_recipe_endpoints):
+    client, user = admin_client
+
+    response, content = export(client, api_recipe_endpoints['catalogue-export'], format='yaml')
+    documents = yaml.safe_load(content)
+    assert [document['slug'] for document in documents] == [recipe.slug for recipe in catalogue[1:]]
+
+
+@pytest.mark.django_db
+def test_catalogue_export_markdown(admin_client, catalogue, api_recipe_endpoints):
+    client, user = admin_client
+
+    response, content = export(client, api_recipe_endpoints['catalogue-export'], format='md')
+    assert content.count('# Loaf') == 4
+    assert '## Ingredients\n\n- flour\n- water' in content
+    assert '1. Knead\n2. Bake' in content
+
+
+@pytest.mark.django_db
+def test_catalogue_export_filtered(admin_client, catalogue, api_recipe_endpoints):
+    client, user = admin_client
+
+    response, content = export(client, api_recipe_endpoints['catalogue-export'], title='Loaf 3')
+    assert [json.loads(line)['title'] for line in content.splitlines()] == ['Loaf 3']
+
+
+@pytest.mark.django_db
+def test_catalogue_export_chunked_queries(admin_client, catalogue, api_recipe_endpoints, monkeypatch):
+    client, user = admin_client
+    monkeypatch.setattr('apps.recipes.views.recipe.RecipeCatalogueExportView.chunk_size', 2)
+
+    with CaptureQueriesContext(connection) as small:
+        export(client, api_recipe_endpoints['catalogue-export'])
+    monkeypatch.setattr('apps.recipes.views.recipe.RecipeCatalogueExportView.chunk_size', 100)
+    with CaptureQueriesContext(connection) as large:
+        export(client, api_recipe_endpoints['catalogue-export'])
+
+    # Prefetches run once per chunk, not once per recipe
+    assert len(small) > len(large)
+    assert len(large) < 10
+
+
+@pytest.mark.django_db
+def test_catalogue_export_unsupported_format(admin_client, api_recipe_endpoints):
+    client, user = admin_client
+
+    response = client.get(api_recipe_endpoints['catalogue-export'], {'format': 'pdf'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'format' in response.json()
+
+
+@pytest.mark.django_db
+def test_catalogue_export_requires_admin(auth_client, api_recipe_endpoints):
+    client, user = auth_client
+
+    response = client.get(api_recipe_endpoints['catalogue-export'])
+    assert response.status_code == status.HTTP_403_FORBIDDEN
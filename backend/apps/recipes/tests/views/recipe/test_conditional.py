@@ -0,0 +1,141 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from apps.recipes.models import (
+    Recipe,
+    RecipeBlock,
+    Tag,
+)
+
+
+@pytest.fixture
+def verified_client(auth_client):
+    client, user = auth_client
+    user.is_verified = True
+    user.save()
+    return client, user
+
+
+@pytest.fixture
+def public_recipe(create_client):
+    author = create_client()
+    recipe = Recipe.objects.create(title='Conditional Recipe', author=author)
+    Recipe.objects.filter(pk=recipe.pk).update(status='published', final_image='static/recipes/conditional.jpg')
+    RecipeBlock.objects.create(recipe=recipe, content='Step', order=0)
+    recipe.refresh_from_db()
+    return recipe
+
+
+def conditional_get(client, url, accept='application/json', **headers):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, HTTP_ACCEPT=accept, **headers)
+    return response, len(queries)
+
+
+@pytest.mark.django_db
+def test_detail_validators(verified_client, public_recipe, api_recipe_endpoints):
+    client, user = verified_client
+
+    response = client.get(api_recipe_endpoints['detail'](public_recipe.slug), HTTP_ACCEPT='application/json')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers['ETag'].startswith('W/"')
+    assert 'Last-Modified' in response.headers
+
+
+@pytest.mark.django_db
+def test_detail_if_none_match(verified_client, public_recipe, api_recipe_endpoints):
+    client, user = verified_client
+    url = api_recipe_endpoints['detail'](public_recipe.slug)
+    etag = client.get(url, HTTP_ACCEPT='application/json').headers['ETag']
+
+    response, queries = conditional_get(client, url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers['ETag'] == etag
+    assert not response.content
+    # Only the recipe row, nothing is prefetched or serialized
+    assert queries == 1
+
+
+@pytest.mark.django_db
+def test_detail_if_modified_since(verified_client, public_recipe, api_recipe_endpoints):
+    client, user = verified_client
+    url = api_recipe_endpoints['detail'](public_recipe.slug)
+    last_modified = client.get(url, HTTP_ACCEPT='application/json').headers['Last-Modified']
+
+    response, _ = conditional_get(client, url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('change', ['block', 'tag', 'like'])
+def test_detail_etag_changes(verified_client, public_recipe, api_recipe_endpoints, change):
+    client, user = verified_client
+    url = api_recipe_endpoints['detail'](public_recipe.slug)
+    etag = client.get(url, HTTP_ACCEPT='application/json').headers['ETag']
+
+    if change == 'block':
+        RecipeBlock.objects.create(recipe=public_recipe, content='Another step', order=1)
+    elif change == 'tag':
+        public_recipe.tags.add(Tag.objects.create(name='quick'))
+    else:
+        public_recipe.like(user)
+
+    response, _ = conditional_get(client, url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_detail_etag_ignores_counters(verified_client, auth_client_2, public_recipe, api_recipe_endpoints):
+    client, user = verified_client
+    other_client, other_user = auth_client_2
+    url = api_recipe_endpoints['detail'](public_recipe.slug)
+    etag = client.get(url, HTTP_ACCEPT='application/json').headers['ETag']
+
+    public_recipe.like(other_user)
+    Recipe.objects.filter(pk=public_recipe.pk).update(views_count=100)
+
+    response, _ = conditional_get(client, url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+def test_detail_etag_per_user(verified_client, auth_client_2, public_recipe, api_recipe_endpoints):
+    client, user = verified_client
+    other_client, other_user = auth_client_2
+    url = api_recipe_endpoints['detail'](public_recipe.slug)
+
+    etag = client.get(url, HTTP_ACCEPT='application/json').headers['ETag']
+    assert other_client.get(url, HTTP_ACCEPT='application/json').headers['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_detail_anonymous_if_none_match_cached(client, public_recipe, api_recipe_endpoints):
+    url = api_recipe_endpoints['detail'](public_recipe.slug)
+    etag = client.get(url, HTTP_ACCEPT='application/json').headers['ETag']
+
+    response, queries = conditional_get(client, url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers['ETag'] == etag
+    assert queries == 0
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('export_format', [None, 'json', 'txt'])
+def test_export_if_none_match(verified_client, public_recipe, api_recipe_endpoints, export_format):
+    client, user = verified_client
+    url = api_recipe_endpoints['export'](public_recipe.slug)
+    if export_format:
+        url = f'{url}?format={export_format}'
+    accept = 'text/plain' if export_format == 'txt' else 'application/json'
+
+    response = client.get(url, HTTP_ACCEPT=accept)
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers['ETag']
+
+    response, queries = conditional_get(client, url, accept=accept, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert queries == 1
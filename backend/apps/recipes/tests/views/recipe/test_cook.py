@@ -0,0 +1,51 @@
+import pytest
+
+from rest_framework import status
+
+from apps.recipes.models import Recipe, RecipeStatus, RecipeSpecialBlock
+
+
+@pytest.fixture
+def recipes(create_client):
+    author = create_client()
+    recipes = []
+    for title, items in [('Pancakes', ['flour', 'eggs', 'milk']), ('Crepes', ['flour', 'eggs', 'milk', 'butter'])]:
+        recipe = Recipe.objects.create(title=title, author=author)
+        Recipe.objects.filter(pk=recipe.pk).update(status=RecipeStatus.PUBLISHED)
+        RecipeSpecialBlock.objects.create(recipe=recipe, type=RecipeSpecialBlock.INGREDIENTS, content={'items': items})
+        recipes.append(recipe)
+    return recipes
+
+
+@pytest.mark.django_db
+def test_cook(client, recipes, api_recipe_endpoints):
+    response = client.get(api_recipe_endpoints['cook'], {'ingredients': 'flour,eggs,milk'}, HTTP_ACCEPT='application/json')
+    assert response.status_code == status.HTTP_200_OK
+
+    results = response.json()['recipes']
+    assert [(recipe['title'], recipe['matched_ingredients'], recipe['missing_ingredients']) for recipe in results] == [
+        ('Pancakes', 3, []),
+        ('Crepes', 3, ['butter']),
+    ]
+
+
+@pytest.mark.django_db
+def test_cook_max_missing(client, recipes, api_recipe_endpoints):
+    response = client.get(
+        api_recipe_endpoints['cook'], {'ingredients': 'flour,eggs,milk', 'max-missing': 0}, HTTP_ACCEPT='application/json',
+    )
+    assert [recipe['title'] for recipe in response.json()['recipes']] == ['Pancakes']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', [{}, {'ingredients': ' , '}, {'ingredients': 'flour', 'limit': 'ten'}])
+def test_cook_invalid(client, recipes, api_recipe_endpoints, params):
+    response = client.get(api_recipe_endpoints['cook'], params, HTTP_ACCEPT='application/json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_list_filter_by_ingredients(client, recipes, api_recipe_endpoints):
+    response = client.get(api_recipe_endpoints['list'], {'ingredients': 'Butter,flour'}, HTTP_ACCEPT='application/json')
+    assert response.status_code == status.HTTP_200_OK
+    assert [recipe['title'] for recipe in response.json()['results']] == ['Crepes']
@@ -1,8 +1,41 @@
 import pytest
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 
-from apps.recipes.models import Recipe
+from apps.recipes.models import (
+    Recipe,
+    RecipeBlock,
+    RecipeSpecialBlock,
+    Tag,
+)
+
+
+@pytest.fixture
+def verified_client(auth_client):
+    client, user = auth_client
+    user.is_verified = True
+    user.save()
+    return client, user
+
+
+def recipe_payload(title, step_count=3, **overrides):
+    payload = {
+        'title': title,
+        'description': 'A test description',
+        'status': 'draft',
+        'blocks': [
+            {'type': 'text', 'content': f'Step {order}', 'order': order}
+            for order in range(step_count)
+        ],
+        'special_blocks': [
+            {'type': 'ingredients', 'content': {'items': ['flour', 'milk']}, 'order': 0},
+            {'type': 'macronutrients', 'content': {'protein': 5, 'carbs': 20, 'fat': 10}, 'order': 1},
+        ],
+    }
+    payload.update(overrides)
+    return payload
 
 
 @pytest.mark.django_db
@@ -97,3 +130,91 @@ def test_create_recipe_banned_user(client, auth_client, api_recipe_endpoints, ge
     response = response.json()
     assert response.get('recipe') is None
     assert response.get('detail') == 'User must be verified, active, and not banned.'
+
+
+@pytest.mark.django_db
+def test_create_recipe_with_blocks(verified_client, api_recipe_endpoints):
+    client, user = verified_client
+    tag = Tag.objects.create(name='bread')
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post(
+            api_recipe_endpoints['create'],
+            recipe_payload('Bread', step_count=40, tags=[str(tag.pk)]),
+            format='json',
+        )
+    assert response.status_code == status.HTTP_201_CREATED
+
+    recipe = response.json()['recipe']
+    assert [block['content'] for block in recipe['blocks']] == [f'Step {order}' for order in range(40)]
+    assert [block['type'] for block in recipe['special_blocks']] == ['ingredients', 'macronutrients']
+    assert recipe['tags'] == [str(tag.pk)]
+    assert recipe['protein'] == 5
+
+    block_inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "recipes_recipeblock"')]
+    assert len(block_inserts) == 1
+
+
+@pytest.mark.django_db
+def test_create_recipe_invalid_block(verified_client, api_recipe_endpoints):
+    client, user = verified_client
+
+    payload = recipe_payload('Broken')
+    payload['blocks'].append({'type': 'text', 'content': '', 'order': 3})
+    response = client.post(api_recipe_endpoints['create'], payload, format='json')
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'blocks' in response.json()
+    assert not Recipe.objects.exists()
+    assert not RecipeBlock.objects.exists()
+
+
+@pytest.mark.django_db
+def test_create_recipe_duplicate_special_block(verified_client, api_recipe_endpoints):
+    client, user = verified_client
+
+    payload = recipe_payload('Duplicate')
+    payload['special_blocks'].append({'type': 'ingredients', 'content': {'items': ['salt']}, 'order': 2})
+    response = client.post(api_recipe_endpoints['create'], payload, format='json')
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'special_blocks' in response.json()
+
+
+@pytest.mark.django_db
+def test_bulk_create_recipes(verified_client, api_recipe_endpoints):
+    client, user = verified_client
+
+    response = client.post(
+        api_recipe_endpoints['create-bulk'],
+        [recipe_payload(f'Batch {i}') for i in range(3)],
+        format='json',
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert len(response.json()['recipes']) == 3
+
+    assert Recipe.objects.filter(author=user).count() == 3
+    assert RecipeBlock.objects.count() == 9
+    # Every recipe has its own ingredients block
+    assert RecipeSpecialBlock.objects.filter(type=RecipeSpecialBlock.INGREDIENTS).count() == 3
+
+
+@pytest.mark.django_db
+def test_bulk_create_recipes_all_or_nothing(verified_client, api_recipe_endpoints):
+    client, user = verified_client
+
+    payloads = [recipe_payload(f'Batch {i}') for i in range(3)]
+    payloads[2]['special_blocks'][0]['content'] = {'items': 'flour'}
+    response = client.post(api_recipe_endpoints['create-bulk'], payloads, format='json')
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not Recipe.objects.exists()
+
+
+@pytest.mark.django_db
+def test_bulk_create_recipes_requires_list(verified_client, api_recipe_endpoints):
+    client, user = verified_client
+
+    response = client.post(api_recipe_endpoints['create-bulk'], recipe_payload('Single'), format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()['detail'] == 'Expected a list of recipes.'
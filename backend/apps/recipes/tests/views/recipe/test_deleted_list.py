@@ -80,7 +80,7 @@ def test_deleted_recipe_list_success(verified_user_with_recipe, api_recipe_endpo
         api_recipe_endpoints['deleted'],
     )
     assert response.status_code == status.HTTP_200_OK
-    response_data = response.json()
+    response_data = response.json()['results']
     assert len(response_data) == 4
     
     response_ids = {recipe['id'] for recipe in response_data}
@@ -96,7 +96,7 @@ def test_deleted_recipe_list_mixed_recipes(verified_user_with_mixed_recipes, api
         api_recipe_endpoints['deleted'],
     )
     assert response.status_code == status.HTTP_200_OK
-    response_data = response.json()
+    response_data = response.json()['results']
     assert len(response_data) == 3
     
     response_ids = {recipe['id'] for recipe in response_data}
@@ -122,7 +122,7 @@ def test_deleted_recipe_list_no_deleted_recipes(auth_client, api_recipe_endpoint
         api_recipe_endpoints['deleted'],
     )
     assert response.status_code == status.HTTP_200_OK
-    assert response.json() == []
+    assert response.json()['results'] == []
 
 
 @pytest.mark.django_db
@@ -142,4 +142,4 @@ def test_deleted_recipe_list_unverified_user(auth_client, api_recipe_endpoints):
         api_recipe_endpoints['deleted'],
     )
     assert response.status_code == status.HTTP_200_OK
-    assert response.json() == []
+    assert response.json()['results'] == []
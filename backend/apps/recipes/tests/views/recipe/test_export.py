@@ -0,0 +1,171 @@
+import json
+
+import pytest
+import yaml
+
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from apps.recipes.exporting import get_exporter, open_export_artifact
+from apps.recipes.models import (
+    Recipe,
+    RecipeBlock,
+    RecipeSpecialBlock,
+    Tag,
+)
+
+
+@pytest.fixture
+def verified_client(auth_client):
+    client, user = auth_client
+    user.is_verified = True
+    user.save()
+    return client, user
+
+
+@pytest.fixture
+def recipe(create_client):
+    author = create_client(username='cook')
+    recipe = Recipe.objects.create(
+        title='Tomato (Soup)', description='Warm & red', author=author, calories=120, protein=3.5
+    )
+    Recipe.objects.filter(pk=recipe.pk).update(status='published', final_image='static/recipes/soup.jpg')
+    recipe.tags.add(Tag.objects.create(name='soup'))
+    RecipeBlock.objects.create(recipe=recipe, content='Chop tomatoes', order=0)
+    RecipeBlock.objects.create(recipe=recipe, content='Simmer', order=1)
+    RecipeSpecialBlock.objects.create(
+        recipe=recipe, type=RecipeSpecialBlock.INGREDIENTS, content={'items': ['tomatoes', 'salt']}
+    )
+    recipe.refresh_from_db()
+    return recipe
+
+
+def export(client, recipe, api_recipe_endpoints, export_format):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(api_recipe_endpoints['export'](recipe.slug), {'format': export_format})
+    assert response.status_code == status.HTTP_200_OK
+    return response, b''.join(response.streaming_content), len(queries)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'export_format, content_type',
+    [
+        ('txt', 'text/plain'),
+        ('json', 'application/json'),
+        ('jsonl', 'application/x-ndjson'),
+        ('csv', 'text/csv'),
+        ('yaml', 'application/yaml'),
+        ('html', 'text/html'),
+        ('md', 'text/markdown'),
+        ('pdf', 'application/pdf'),
+    ]
+)
+def test_export_formats(verified_client, recipe, api_recipe_endpoints, export_format, content_type):
+    client, user = verified_client
+
+    response, content, _ = export(client, recipe, api_recipe_endpoints, export_format)
+    assert response['Content-Type'].startswith(content_type)
+    assert response['Content-Disposition'] == f'attachment; filename="{recipe.slug}.{export_format}"'
+    assert int(response['Content-Length']) == len(content)
+    assert 'ETag' in response.headers
+
+
+@pytest.mark.django_db
+def test_export_content(verified_client, recipe, api_recipe_endpoints):
+    client, user = verified_client
+
+    _, content, _ = export(client, recipe, api_recipe_endpoints, 'txt')
+    text = content.decode('utf-8')
+    assert text.startswith(f'Author: cook\nTitle: Tomato (Soup)\n')
+    assert 'Calories: 120 kcal\nProtein: 3.5g\n' in text
+    assert 'Tags: soup\n' in text
+    assert '1. Chop tomatoes\n2. Simmer\n' in text
+
+    _, content, _ = export(client, recipe, api_recipe_endpoints, 'json')
+    assert json.loads(content)['ingredients'] == ['tomatoes', 'salt']
+
+    _, content, _ = export(client, recipe, api_recipe_endpoints, 'yaml')
+    assert yaml.safe_load(content)[0]['steps'] == ['Chop tomatoes', 'Simmer']
+
+    _, content, _ = export(client, recipe, api_recipe_endpoints, 'html')
+    assert '<h1>Tomato (Soup)</h1>' in content.decode('utf-8')
+    assert 'Warm &amp; red' in content.decode('utf-8')
+
+    _, content, _ = export(client, recipe, api_recipe_endpoints, 'pdf')
+    assert content.startswith(b'%PDF-1.4')
+    assert content.rstrip().endswith(b'%%EOF')
+    assert b'(Title: Tomato \\(Soup\\)) Tj' in content
+
+
+@pytest.mark.django_db
+def test_export_served_from_disk(verified_client, recipe, api_recipe_endpoints, export_root):
+    client, user = verified_client
+
+    _, first, rendering_queries = export(client, recipe, api_recipe_endpoints, 'md')
+    _, second, queries = export(client, recipe, api_recipe_endpoints, 'md')
+
+    assert second == first
+    # Only the recipe row, tags and blocks are not loaded again
+    assert queries == 1 < rendering_queries
+    assert len(list((export_root / str(recipe.pk)).glob('*.md'))) == 1
+
+
+@pytest.mark.django_db
+def test_export_rendered_again_after_change(verified_client, recipe, api_recipe_endpoints, export_root):
+    client, user = verified_client
+
+    _, before, _ = export(client, recipe, api_recipe_endpoints, 'md')
+    RecipeBlock.objects.create(recipe=recipe, content='Serve hot', order=2)
+    _, after, _ = export(client, recipe, api_recipe_endpoints, 'md')
+
+    assert b'Serve hot' not in before
+    assert b'3. Serve hot' in after
+    # The previous version is removed
+    assert len(list((export_root / str(recipe.pk)).glob('*.md'))) == 1
+
+
+@pytest.mark.django_db
+def test_export_not_rendered_again_for_counters(verified_client, recipe, api_recipe_endpoints, export_root):
+    client, user = verified_client
+
+    _, first, _ = export(client, recipe, api_recipe_endpoints, 'md')
+    Recipe.objects.filter(pk=recipe.pk).update(views_count=F('views_count') + 10, likes_count=3)
+    _, second, queries = export(client, recipe, api_recipe_endpoints, 'md')
+
+    assert second == first
+    assert queries == 1
+
+
+@pytest.mark.django_db
+def test_export_open_artifact_survives_new_version(recipe, export_root):
+    exporter = get_exporter('txt')
+    with open_export_artifact(recipe, exporter) as before:
+        RecipeBlock.objects.create(recipe=recipe, content='Serve hot', order=2)
+        recipe.refresh_from_db()
+        with open_export_artifact(recipe, exporter) as after:
+            assert b'Serve hot' in after.read()
+        assert b'Serve hot' not in before.read()
+
+
+@pytest.mark.django_db
+def test_export_removed_with_recipe(verified_client, recipe, api_recipe_endpoints, export_root):
+    client, user = verified_client
+
+    export(client, recipe, api_recipe_endpoints, 'txt')
+    assert (export_root / str(recipe.pk)).exists()
+
+    # Permanent deletion, `delete()` only soft deletes
+    Recipe.objects.filter(pk=recipe.pk).delete()
+    assert not (export_root / str(recipe.pk)).exists()
+
+
+@pytest.mark.django_db
+def test_export_unsupported_format(verified_client, recipe, api_recipe_endpoints):
+    client, user = verified_client
+
+    response = client.get(api_recipe_endpoints['export'](recipe.slug), {'format': 'docx'}, HTTP_ACCEPT='application/json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json() == {'detail': 'Unsupported format.'}
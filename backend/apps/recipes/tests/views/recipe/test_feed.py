@@ -0,0 +1,164 @@
+from datetime import timedelta
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+
+from apps.recipes.feeds import rank_all
+from apps.recipes.models import Recipe, RecipeStatus, RecipeHourlyStats, RecipeDailyStats, RecipeRanking
+
+
+@pytest.fixture
+def recipes(create_client):
+    author = create_client()
+    now = timezone.now()
+    hour = now.replace(minute=0, second=0, microsecond=0)
+    day = hour.replace(hour=0)
+
+    # Steady hit, recent burst, old favourite, private
+    activity = {
+        'Pancakes': [
+            (RecipeDailyStats, day - timedelta(days=1), 200, 20),
+            (RecipeHourlyStats, hour - timedelta(hours=30), 5, 0),
+        ],
+        'Waffles': [
+            (RecipeDailyStats, day, 60, 10),
+            (RecipeHourlyStats, hour - timedelta(hours=1), 60, 10),
+        ],
+        'Crepes': [
+            (RecipeDailyStats, day - timedelta(days=60), 4000, 100),
+        ],
+        'Toast': [
+            (RecipeDailyStats, day, 500, 50),
+            (RecipeHourlyStats, hour - timedelta(hours=1), 500, 50),
+        ],
+    }
+    recipes = {}
+    # Published oldest first, saving stamps `published_at`
+    for title, rows in reversed(activity.items()):
+        recipe = Recipe.objects.create(
+            title=title,
+            author=author,
+            final_image=f'static/recipes/{title.lower()}.jpg',
+            is_private=title == 'Toast',
+        )
+        recipe.status = RecipeStatus.PUBLISHED
+        recipe.save()
+        for model, bucket, views, likes in rows:
+            model.objects.create(recipe=recipe, bucket=bucket, views=views, likes=likes)
+        recipes[title] = recipe
+    return recipes
+
+
+def get_feed(client, api_recipe_endpoints, feed, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(api_recipe_endpoints['feed'](feed), params)
+    return response, len(queries)
+
+
+@pytest.mark.django_db
+def test_rank_all(recipes):
+    assert rank_all() == {'popular': 3, 'trending': 2}
+
+    popular = list(RecipeRanking.objects.filter(feed='popular').values_list('recipe__title', flat=True))
+    trending = list(RecipeRanking.objects.filter(feed='trending').values_list('recipe__title', flat=True))
+    # Decay outweighs the bigger but older numbers, private recipes are left out
+    assert popular == ['Pancakes', 'Crepes', 'Waffles']
+    assert trending == ['Waffles', 'Pancakes']
+
+    # Rankings are replaced, not appended
+    assert rank_all() == {'popular': 3, 'trending': 2}
+    assert RecipeRanking.objects.count() == 5
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'feed, titles',
+    [
+        ('popular', ['Pancakes', 'Crepes', 'Waffles']),
+        ('trending', ['Waffles', 'Pancakes']),
+        ('new', ['Pancakes', 'Waffles', 'Crepes']),
+    ]
+)
+def test_feed(client, recipes, api_recipe_endpoints, feed, titles):
+    rank_all()
+
+    response, queries = get_feed(client, api_recipe_endpoints, feed)
+    assert response.status_code == status.HTTP_200_OK
+    assert [recipe['title'] for recipe in response.data['recipes']] == titles
+    assert queries == 1
+
+
+@pytest.mark.django_db
+def test_feed_hides_recipes_no_longer_public(client, recipes, api_recipe_endpoints):
+    rank_all()
+    Recipe.objects.filter(pk=recipes['Pancakes'].pk).update(is_banned=True)
+
+    response, _ = get_feed(client, api_recipe_endpoints, 'popular', limit=1)
+    assert [recipe['title'] for recipe in response.data['recipes']] == ['Crepes']
+
+
+@pytest.mark.django_db
+def test_feed_is_liked(auth_client, recipes, api_recipe_endpoints):
+    client, user = auth_client
+    rank_all()
+    recipes['Waffles'].like(user)
+
+    response, queries = get_feed(client, api_recipe_endpoints, 'trending')
+    assert [recipe['is_liked'] for recipe in response.data['recipes']] == [True, False]
+    assert queries <= 4
+
+
+@pytest.mark.django_db
+def test_unknown_feed(client, api_recipe_endpoints):
+    response, _ = get_feed(client, api_recipe_endpoints, 'hot')
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_new_feed_follows_publication(auth_client, client, api_recipe_endpoints, generate_recipe_data):
+    author_client, author = auth_client
+    author.is_verified = True
+    author.save()
+
+    slugs = {}
+    for title in ['Pancakes', 'Waffles', 'Crepes']:
+        response = author_client.post(api_recipe_endpoints['create'], generate_recipe_data({'title': title}))
+        assert response.status_code == status.HTTP_201_CREATED
+        slugs[title] = Recipe.objects.get(pk=response.json()['recipe']['id']).slug
+    assert not Recipe.objects.filter(published_at__isnull=False).exists()
+
+    for title in ['Waffles', 'Crepes', 'Pancakes']:
+        response = author_client.patch(api_recipe_endpoints['update'](slugs[title]), {'status': RecipeStatus.PUBLISHED.value})
+        assert response.status_code == status.HTTP_200_OK
+
+    response, _ = get_feed(client, api_recipe_endpoints, 'new')
+    assert [recipe['title'] for recipe in response.data['recipes']] == ['Pancakes', 'Crepes', 'Waffles']
+
+    # Publishing again keeps the first publication time
+    pancakes = Recipe.objects.get(slug=slugs['Pancakes'])
+    published_at = pancakes.published_at
+    pancakes.status = RecipeStatus.DRAFT
+    pancakes.save()
+    pancakes.status = RecipeStatus.PUBLISHED
+    pancakes.save()
+    pancakes.refresh_from_db()
+    assert pancakes.published_at == published_at
+
+
+@pytest.mark.django_db
+def test_new_feed_uses_public_index(client, recipes, api_recipe_endpoints):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(api_recipe_endpoints['feed']('new'))
+    assert response.status_code == status.HTTP_200_OK
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {queries[0]['sql']}")
+        plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+
+    # SQLite may prefer the live index, which also covers the public recipes
+    assert 'recipe_public_published_idx' in plan or 'recipe_live_published_idx' in plan
+    assert 'TEMP B-TREE' not in plan
@@ -41,6 +41,9 @@ def test_like_recipe_success(verified_user_with_recipe, api_recipe_endpoints):
     assert response.json().get('detail') == 'Recipe liked.'
     assert recipe.is_liked_by(user) is True
 
+    recipe.refresh_from_db()
+    assert recipe.likes_count == 1
+
 
 @pytest.mark.django_db
 def test_unlike_recipe_success(verified_user_with_recipe, api_recipe_endpoints):
@@ -62,6 +65,9 @@ def test_unlike_recipe_success(verified_user_with_recipe, api_recipe_endpoints):
     # assert response.json().get('detail') == 'Recipe unliked.'
     assert recipe.is_liked_by(user) is False
 
+    recipe.refresh_from_db()
+    assert recipe.likes_count == 0
+
 
 @pytest.mark.django_db
 def test_like_recipe_failure(verified_user_with_recipe, api_recipe_endpoints):
@@ -83,6 +89,9 @@ def test_like_recipe_failure(verified_user_with_recipe, api_recipe_endpoints):
     assert response.json().get('detail') == 'You have already liked this recipe.'
     assert recipe.is_liked_by(user) is True
 
+    recipe.refresh_from_db()
+    assert recipe.likes_count == 1
+
 
 @pytest.mark.django_db
 def test_unlike_recipe_failure(verified_user_with_recipe, api_recipe_endpoints):
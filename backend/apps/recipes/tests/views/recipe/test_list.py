@@ -1,5 +1,7 @@
 import pytest
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 
 from apps.recipes.models import Recipe
@@ -39,7 +41,7 @@ def test_list_recipes_success(verified_user_with_recipe, api_recipe_endpoints):
     )
     assert response.status_code == status.HTTP_200_OK
 
-    response_data = response.json()
+    response_data = response.json()['results']
     assert len(response_data) == 4
     
     response_ids = {recipe['id'] for recipe in response_data}
@@ -58,13 +60,17 @@ def test_list_recipes_success(verified_user_with_recipe, api_recipe_endpoints):
 
 
 @pytest.mark.django_db
-def test_list_recipes_failure_unathenticated(client, api_recipe_endpoints):
+def test_list_recipes_unauthenticated_public_only(client, verified_user_with_recipe, api_recipe_endpoints):
+    _, user, recipes = verified_user_with_recipe
+    public = recipes[0]
+    Recipe.objects.filter(pk=public.pk).update(status='published')
+
     response = client.get(
         api_recipe_endpoints['list'],
         HTTP_ACCEPT='application/json',
     )
-    assert response.status_code == status.HTTP_401_UNAUTHORIZED
-    assert response.json().get('detail') == 'Authentication credentials were not provided.'
+    assert response.status_code == status.HTTP_200_OK
+    assert [recipe['id'] for recipe in response.json()['results']] == [str(public.id)]
 
 
 @pytest.mark.django_db
@@ -76,7 +82,121 @@ def test_list_recipes_no_recipes(auth_client, api_recipe_endpoints):
         HTTP_ACCEPT='application/json',
     )
     assert response.status_code == status.HTTP_200_OK
-    assert response.json() == []
+    assert response.json()['results'] == []
+
+
+@pytest.mark.django_db
+def test_list_recipes_cursor_pagination(verified_user_with_recipe, api_recipe_endpoints):
+    client, user, recipes = verified_user_with_recipe
+
+    response = client.get(
+        api_recipe_endpoints['list'],
+        {'page_size': 3},
+        HTTP_ACCEPT='application/json',
+    )
+    assert response.status_code == status.HTTP_200_OK
+    first_page = response.json()
+    assert len(first_page['results']) == 3
+    assert first_page['previous'] is None
+    assert first_page['next'] is not None
+
+    response = client.get(first_page['next'], HTTP_ACCEPT='application/json')
+    assert response.status_code == status.HTTP_200_OK
+    second_page = response.json()
+    assert len(second_page['results']) == 1
+    assert second_page['next'] is None
+    assert second_page['previous'] is not None
+
+    response_ids = [recipe['id'] for recipe in first_page['results'] + second_page['results']]
+    expected_ids = [str(recipe.id) for recipe in sorted(recipes, key=lambda r: (r.created_at, r.id), reverse=True)]
+    assert response_ids == expected_ids
+
+    response = client.get(second_page['previous'], HTTP_ACCEPT='application/json')
+    assert response.status_code == status.HTTP_200_OK
+    assert [recipe['id'] for recipe in response.json()['results']] == expected_ids[:3]
+
+
+@pytest.mark.django_db
+def test_list_recipes_sort_paginated(verified_user_with_recipe, api_recipe_endpoints):
+    client, user, recipes = verified_user_with_recipe
+
+    response = client.get(
+        api_recipe_endpoints['list'],
+        {'sort': 'title', 'page_size': 2},
+        HTTP_ACCEPT='application/json',
+    )
+    assert response.status_code == status.HTTP_200_OK
+    first_page = response.json()
+
+    response = client.get(first_page['next'], HTTP_ACCEPT='application/json')
+    assert response.status_code == status.HTTP_200_OK
+    second_page = response.json()
+    assert second_page['next'] is None
+
+    titles = [recipe['title'] for recipe in first_page['results'] + second_page['results']]
+    assert titles == sorted(recipe.title for recipe in recipes)
+
+
+@pytest.mark.django_db
+def test_list_recipes_is_liked_batched(verified_user_with_recipe, api_recipe_endpoints):
+    client, user, recipes = verified_user_with_recipe
+    liked = recipes[:2]
+    for recipe in liked:
+        recipe.like(user)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(
+            api_recipe_endpoints['list'],
+            HTTP_ACCEPT='application/json',
+        )
+    assert response.status_code == status.HTTP_200_OK
+
+    liked_ids = {str(recipe.id) for recipe in liked}
+    for recipe_data in response.json()['results']:
+        assert recipe_data['is_liked'] is (recipe_data['id'] in liked_ids)
+
+    like_queries = [query for query in queries if 'recipes_like' in query['sql']]
+    assert len(like_queries) == 1
+
+
+@pytest.mark.django_db
+def test_list_recipes_visibility(verified_user_with_recipe, create_client, api_recipe_endpoints):
+    client, user, recipes = verified_user_with_recipe
+    other = create_client()
+
+    def create_other_recipe(title, **fields):
+        recipe = Recipe.objects.create(title=title, author=other)
+        Recipe.objects.filter(pk=recipe.pk).update(**fields)
+        return recipe
+
+    public = create_other_recipe('Public', status='published')
+    create_other_recipe('Draft', status='draft')
+    create_other_recipe('Private', status='published', is_private=True)
+    create_other_recipe('Banned', status='published', is_banned=True)
+    create_other_recipe('Deleted', status='published', is_deleted=True)
+
+    response = client.get(
+        api_recipe_endpoints['list'],
+        HTTP_ACCEPT='application/json',
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    response_ids = {recipe['id'] for recipe in response.json()['results']}
+    assert response_ids == {str(recipe.id) for recipe in recipes} | {str(public.id)}
+    assert set(Recipe.objects.public().values_list('pk', flat=True)) == {public.pk}
+
+
+@pytest.mark.django_db
+def test_list_recipes_invalid_cursor(auth_client, api_recipe_endpoints):
+    client, user = auth_client
+
+    response = client.get(
+        api_recipe_endpoints['list'],
+        {'cursor': 'not-a-cursor'},
+        HTTP_ACCEPT='application/json',
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json().get('detail') == 'Invalid cursor'
 
 
 # TODO:
@@ -84,16 +204,106 @@ def test_list_recipes_no_recipes(auth_client, api_recipe_endpoints):
 # def test_list_recipes_tag_filter(verified_user_with_recipe, api_recipe_endpoints):
 
 
-# TODO:
-# @pytest.mark.django_db
-# def test_list_recipes_search_filter(verified_user_with_recipe, api_recipe_endpoints):
+@pytest.mark.django_db
+def test_list_recipes_sort_filter(verified_user_with_recipe, api_recipe_endpoints):
+    client, user, recipes = verified_user_with_recipe
+    for likes, recipe in enumerate(recipes):
+        Recipe.objects.filter(pk=recipe.pk).update(likes_count=likes)
 
+    deleted = recipes[-1]
+    deleted.is_deleted = True
+    deleted.save()
 
-# TODO:
-# @pytest.mark.django_db
-# def test_list_recipes_sort_filter(verified_user_with_recipe, api_recipe_endpoints):
+    response = client.get(
+        api_recipe_endpoints['list'],
+        {'sort': '-likes'},
+        HTTP_ACCEPT='application/json',
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    expected_ids = [str(recipe.id) for recipe in reversed(recipes[:-1])]
+    assert [recipe['id'] for recipe in response.json()['results']] == expected_ids
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('sort', ['author__email', 'description', '-is_deleted', '?'])
+def test_list_recipes_sort_unknown_key(auth_client, api_recipe_endpoints, sort):
+    client, user = auth_client
+
+    response = client.get(
+        api_recipe_endpoints['list'],
+        {'sort': sort},
+        HTTP_ACCEPT='application/json',
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'sort' in response.json()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('sort', ['created_at', '-published_at', 'likes', '-views', 'title'])
+def test_list_recipes_sort_uses_index(verified_user_with_recipe, api_recipe_endpoints, sort):
+    client, user, recipes = verified_user_with_recipe
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(
+            api_recipe_endpoints['list'],
+            {'sort': sort, 'page_size': 2},
+            HTTP_ACCEPT='application/json',
+        )
+    assert response.status_code == status.HTTP_200_OK
+
+    sql = next(query['sql'] for query in queries if 'ORDER BY' in query['sql'])
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+
+    assert 'recipe_live_' in plan
+    assert 'TEMP B-TREE' not in plan
 
 
 # TODO:
 # @pytest.mark.django_db
 # def test_list_recipes_field_filter(verified_user_with_recipe, api_recipe_endpoints):
+
+
+@pytest.mark.django_db
+def test_list_recipes_nutrition_filter(client, create_client, api_recipe_endpoints):
+    author = create_client()
+    for title, calories, protein in [('Salad', 150, 4), ('Chicken', 450, 40), ('Pasta', 700, 20), ('Steak', None, None)]:
+        recipe = Recipe.objects.create(title=title, author=author)
+        Recipe.objects.filter(pk=recipe.pk).update(status='published', calories=calories, protein=protein)
+
+    response = client.get(
+        api_recipe_endpoints['list'],
+        {'calories_min': 100, 'calories_max': 500, 'protein_min': 10},
+        HTTP_ACCEPT='application/json',
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert [recipe['title'] for recipe in response.json()['results']] == ['Chicken']
+
+    response = client.get(
+        api_recipe_endpoints['list'],
+        {'carbs_max': 'lots'},
+        HTTP_ACCEPT='application/json',
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'carbs_max' in response.json()
+
+
+@pytest.mark.django_db
+def test_list_recipes_sort_by_publication(verified_user_with_recipe, api_recipe_endpoints):
+    client, user, recipes = verified_user_with_recipe
+    # Publishing through save() stamps `published_at`, the drafts come last
+    for recipe in recipes[:3]:
+        recipe.status = 'published'
+        recipe.save()
+
+    response = client.get(
+        api_recipe_endpoints['list'],
+        {'sort': '-published_at'},
+        HTTP_ACCEPT='application/json',
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    published = [str(recipe.id) for recipe in reversed(recipes[:3])]
+    assert [recipe['id'] for recipe in response.json()['results']][:3] == published
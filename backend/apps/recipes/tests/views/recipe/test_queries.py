@@ -0,0 +1,133 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.recipes.models import (
+    Recipe,
+    RecipeBlock,
+    RecipeSpecialBlock,
+    Tag,
+)
+from apps.recipes.sampling import staff_random_recipe_pool
+
+
+@pytest.fixture
+def admin_client(create_client):
+    user = create_client()
+    user.is_verified = True
+    user.is_admin = True
+    user.is_staff = True
+    user.is_superuser = True
+    user.save()
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client, user
+
+
+def create_recipes(author, recipe_count, block_count, is_deleted=False):
+    """
+    Create recipes with tags and blocks, the first one also gets special blocks
+    """
+    tags = [Tag.objects.create(name=f'tag-{recipe_count}-{i}') for i in range(3)]
+    recipes = []
+
+    for i in range(recipe_count):
+        recipe = Recipe.objects.create(
+            title=f'Recipe {i}',
+            author=author,
+            is_deleted=is_deleted,
+        )
+        recipe.tags.set(tags)
+        for order in range(block_count):
+            RecipeBlock.objects.create(recipe=recipe, content=f'Step {order}', order=order)
+        recipes.append(recipe)
+
+    RecipeSpecialBlock.objects.create(
+        recipe=recipes[0],
+        type=RecipeSpecialBlock.INGREDIENTS,
+        content={'items': ['flour', 'milk']},
+    )
+    RecipeSpecialBlock.objects.create(
+        recipe=recipes[0],
+        type=RecipeSpecialBlock.TIMES,
+        content={'prep_minutes': 10, 'cook_minutes': 20},
+    )
+    return recipes
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, HTTP_ACCEPT='application/json')
+    assert response.status_code == status.HTTP_200_OK
+    return len(queries)
+
+
+def assert_constant_queries(admin_client, url_for, is_deleted=False, max_queries=None):
+    """
+    Run the same request against a small and a large data set and compare query counts
+    """
+    client, user = admin_client
+    counts = []
+
+    for recipe_count, block_count in [(1, 1), (5, 6)]:
+        Recipe.objects.all().delete()
+        RecipeSpecialBlock.objects.all().delete()
+        recipes = create_recipes(user, recipe_count, block_count, is_deleted=is_deleted)
+        counts.append(count_queries(client, url_for(recipes[0])))
+
+    assert counts[0] == counts[1]
+    if max_queries is not None:
+        assert counts[0] <= max_queries
+
+
+@pytest.mark.django_db
+def test_recipe_detail_queries(admin_client, api_recipe_endpoints):
+    assert_constant_queries(
+        admin_client,
+        lambda recipe: api_recipe_endpoints['detail'](recipe.slug),
+        max_queries=5,
+    )
+
+
+@pytest.mark.django_db
+def test_random_recipe_queries(admin_client, api_recipe_endpoints):
+    # Load the pool up front, the recipe signals keep it current afterwards
+    staff_random_recipe_pool.invalidate()
+    staff_random_recipe_pool.choice()
+    assert_constant_queries(
+        admin_client,
+        lambda recipe: api_recipe_endpoints['random'],
+        max_queries=6,
+    )
+
+
+@pytest.mark.django_db
+def test_recipe_export_queries(admin_client, api_recipe_endpoints):
+    assert_constant_queries(
+        admin_client,
+        lambda recipe: api_recipe_endpoints['export'](recipe.slug),
+        max_queries=5,
+    )
+
+
+@pytest.mark.django_db
+def test_recipe_admin_list_queries(admin_client, api_recipe_endpoints):
+    assert_constant_queries(
+        admin_client,
+        lambda recipe: api_recipe_endpoints['admin-list'],
+        max_queries=5,
+    )
+
+
+@pytest.mark.django_db
+def test_deleted_recipe_list_queries(admin_client, api_recipe_endpoints):
+    assert_constant_queries(
+        admin_client,
+        lambda recipe: api_recipe_endpoints['deleted'],
+        is_deleted=True,
+        max_queries=5,
+    )
@@ -1,8 +1,11 @@
 import pytest
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 
 from apps.recipes.models import Recipe, RecipeStatus
+from apps.recipes.sampling import random_recipe_pool, staff_random_recipe_pool
 
 
 @pytest.fixture
@@ -146,3 +149,57 @@ def test_random_recipe_success_superuser(auth_client, auth_client_2, api_recipe_
     assert response.json().get('detail') == 'Random recipe retrieved successfully.'
     assert response.json().get('recipe').get('id') == recipe.get('id')
     assert response.json().get('recipe').get('status') == RecipeStatus.DRAFT.value
+
+
+@pytest.mark.django_db
+def test_random_recipe_does_not_sort_randomly(verified_user_with_recipe, api_recipe_endpoints):
+    client, user, recipe, recipe_data, recipe_id = verified_user_with_recipe
+
+    recipe.status = RecipeStatus.PUBLISHED
+    recipe.is_private = False
+    recipe.save()
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(api_recipe_endpoints['random'])
+
+    assert_recipe_response_success(response, recipe_data, user, recipe_id)
+    assert not any('RANDOM()' in query['sql'].upper() for query in queries)
+
+
+@pytest.mark.django_db
+def test_random_recipe_pool_follows_recipe_changes(verified_user_with_recipe):
+    client, user, recipe, recipe_data, recipe_id = verified_user_with_recipe
+    random_recipe_pool.invalidate()
+
+    recipe.status = RecipeStatus.PUBLISHED
+    recipe.is_private = False
+    recipe.save()
+    assert random_recipe_pool.pick() == recipe
+
+    recipe.is_banned = True
+    recipe.save()
+    assert random_recipe_pool.pick() is None
+
+    recipe.is_banned = False
+    recipe.save()
+    Recipe.objects.filter(pk=recipe.pk).update(is_private=True)
+    assert random_recipe_pool.pick() is None
+
+
+@pytest.mark.django_db
+def test_random_recipe_superuser_does_not_offset(verified_user_with_recipe, api_recipe_endpoints):
+    client, user, recipe, recipe_data, recipe_id = verified_user_with_recipe
+    user.is_superuser = True
+    user.save()
+    staff_random_recipe_pool.invalidate()
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(api_recipe_endpoints['random'])
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json().get('recipe').get('id') == recipe_id
+    assert not any('OFFSET' in query['sql'].upper() or 'COUNT(' in query['sql'].upper() for query in queries)
+
+    recipe.is_banned = True
+    recipe.save()
+    assert staff_random_recipe_pool.pick() is None
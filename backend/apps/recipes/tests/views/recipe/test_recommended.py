@@ -0,0 +1,62 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from apps.recipes.models import Recipe, RecipeStatus, RecipeRanking, UserRecommendations
+
+
+@pytest.fixture
+def recipes(create_client):
+    author = create_client()
+    recipes = []
+    for title in ['Pancakes', 'Waffles', 'Crepes']:
+        recipe = Recipe.objects.create(title=title, author=author)
+        Recipe.objects.filter(pk=recipe.pk).update(status=RecipeStatus.PUBLISHED)
+        recipes.append(recipe)
+    return recipes
+
+
+def get_recommended(client, api_recipe_endpoints, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(api_recipe_endpoints['recommended'], params, HTTP_ACCEPT='application/json')
+    return response, len(queries)
+
+
+@pytest.mark.django_db
+def test_recommended(auth_client, recipes, api_recipe_endpoints):
+    client, user = auth_client
+    pancakes, waffles, crepes = recipes
+    UserRecommendations.objects.create(
+        user=user,
+        recipes=[[str(crepes.pk), 0.9], [str(waffles.pk), 0.5]],
+        computed_at=pancakes.created_at,
+    )
+
+    response, queries = get_recommended(client, api_recipe_endpoints)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['personalized'] is True
+    assert [recipe['title'] for recipe in response.json()['recipes']] == ['Crepes', 'Waffles']
+    assert queries <= 5
+
+    response, _ = get_recommended(client, api_recipe_endpoints, limit=1)
+    assert [recipe['title'] for recipe in response.json()['recipes']] == ['Crepes']
+
+
+@pytest.mark.django_db
+def test_recommended_falls_back_to_popular(auth_client, recipes, api_recipe_endpoints):
+    client, user = auth_client
+    RecipeRanking.objects.create(
+        feed=RecipeRanking.POPULAR, position=1, recipe=recipes[1], score=1.0, computed_at=recipes[1].created_at,
+    )
+
+    response, _ = get_recommended(client, api_recipe_endpoints)
+    assert response.json()['personalized'] is False
+    assert [recipe['title'] for recipe in response.json()['recipes']] == ['Waffles']
+
+
+@pytest.mark.django_db
+def test_recommended_requires_authentication(client, api_recipe_endpoints):
+    response, _ = get_recommended(client, api_recipe_endpoints)
+    assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
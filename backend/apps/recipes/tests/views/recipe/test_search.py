@@ -0,0 +1,118 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from apps.recipes.models import Recipe, RecipeBlock, RecipeSpecialBlock, RecipeSearchDocument
+from apps.recipes.search import search_recipes
+
+
+@pytest.fixture
+def searchable_recipes(auth_client):
+    client, user = auth_client
+
+    pancakes = Recipe.objects.create(title='Fluffy Pancakes', description='Breakfast classic', author=user)
+    waffles = Recipe.objects.create(title='Waffles', description='Crispy and sweet', author=user)
+    soup = Recipe.objects.create(title='Tomato Soup', description='Warm and simple', author=user)
+
+    RecipeBlock.objects.create(recipe=waffles, content='Use leftover pancake batter.', order=0)
+    RecipeSpecialBlock.objects.create(
+        recipe=soup,
+        type=RecipeSpecialBlock.INGREDIENTS,
+        content={'items': ['tomatoes', 'basil', 'crème fraîche']},
+    )
+
+    return client, user, {'pancakes': pancakes, 'waffles': waffles, 'soup': soup}
+
+
+def search(client, endpoint, query, **params):
+    response = client.get(
+        endpoint,
+        {'search': query, **params},
+        HTTP_ACCEPT='application/json',
+    )
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+@pytest.mark.django_db
+def test_search_ranks_title_matches_first(searchable_recipes, api_recipe_endpoints):
+    client, user, recipes = searchable_recipes
+
+    results = search(client, api_recipe_endpoints['list'], 'pancake')['results']
+
+    assert [recipe['id'] for recipe in results] == [
+        str(recipes['pancakes'].id),
+        str(recipes['waffles'].id),
+    ]
+
+
+@pytest.mark.django_db
+def test_search_matches_ingredients_and_prefixes(searchable_recipes, api_recipe_endpoints):
+    client, user, recipes = searchable_recipes
+
+    for query in ('basil', 'tomat', 'creme'):
+        results = search(client, api_recipe_endpoints['list'], query)['results']
+        assert [recipe['id'] for recipe in results] == [str(recipes['soup'].id)]
+
+
+@pytest.mark.django_db
+def test_search_index_follows_block_changes(searchable_recipes, api_recipe_endpoints):
+    client, user, recipes = searchable_recipes
+
+    recipes['waffles'].blocks.all().delete()
+    results = search(client, api_recipe_endpoints['list'], 'pancake')['results']
+    assert [recipe['id'] for recipe in results] == [str(recipes['pancakes'].id)]
+
+    recipes['soup'].title = 'Tomato Pancake Soup'
+    recipes['soup'].save()
+    results = search(client, api_recipe_endpoints['list'], 'pancake')['results']
+    assert {recipe['id'] for recipe in results} == {str(recipes['pancakes'].id), str(recipes['soup'].id)}
+
+
+@pytest.mark.django_db
+def test_search_is_paginated(searchable_recipes, api_recipe_endpoints):
+    client, user, recipes = searchable_recipes
+
+    first_page = search(client, api_recipe_endpoints['list'], 'pancake', page_size=1)
+    assert first_page['next'] is not None
+
+    response = client.get(first_page['next'], HTTP_ACCEPT='application/json')
+    second_page = response.json()
+    assert second_page['next'] is None
+
+    ids = [recipe['id'] for recipe in first_page['results'] + second_page['results']]
+    assert ids == [str(recipes['pancakes'].id), str(recipes['waffles'].id)]
+
+
+@pytest.mark.django_db
+def test_search_without_words_returns_nothing(searchable_recipes, api_recipe_endpoints):
+    client, user, recipes = searchable_recipes
+
+    assert search(client, api_recipe_endpoints['list'], '***')['results'] == []
+
+
+def search_writes(queries):
+    return [
+        query for query in queries
+        if RecipeSearchDocument._meta.db_table in query['sql'] and query['sql'].startswith(('INSERT', 'DELETE'))
+    ]
+
+
+@pytest.mark.django_db
+def test_search_index_skips_saves_without_text_changes(searchable_recipes, api_recipe_endpoints):
+    client, user, recipes = searchable_recipes
+    pancakes = Recipe.objects.get(pk=recipes['pancakes'].pk)
+
+    with CaptureQueriesContext(connection) as queries:
+        pancakes.is_banned = True
+        pancakes.save()
+        pancakes.delete()
+    assert search_writes(queries) == []
+
+    with CaptureQueriesContext(connection) as queries:
+        pancakes.title = 'Fluffy Crepes'
+        pancakes.save()
+    assert search_writes(queries)
+    assert list(search_recipes(Recipe.objects.all(), 'crepes')) == [pancakes]
@@ -0,0 +1,53 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from apps.recipes.models import Recipe, RecipeStatus, RecipeNeighbor
+
+
+@pytest.fixture
+def recipes(create_client):
+    author = create_client()
+    recipes = []
+    for title in ['Pancakes', 'Waffles', 'Crepes', 'Toast']:
+        recipe = Recipe.objects.create(title=title, author=author)
+        Recipe.objects.filter(pk=recipe.pk).update(status=RecipeStatus.PUBLISHED)
+        recipes.append(recipe)
+
+    pancakes, waffles, crepes, toast = recipes
+    for position, (neighbor, score) in enumerate([(crepes, 0.9), (waffles, 0.8), (toast, 0.1)], start=1):
+        RecipeNeighbor.objects.create(
+            kind=RecipeNeighbor.CONTENT, recipe=pancakes, neighbor=neighbor, position=position, score=score,
+        )
+    return recipes
+
+
+@pytest.mark.django_db
+def test_similar_recipes(client, recipes, api_recipe_endpoints):
+    pancakes, waffles, crepes, toast = recipes
+    Recipe.objects.filter(pk=toast.pk).update(is_private=True)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(api_recipe_endpoints['similar'](pancakes.slug), HTTP_ACCEPT='application/json')
+    assert response.status_code == status.HTTP_200_OK
+    assert [recipe['title'] for recipe in response.json()['recipes']] == ['Crepes', 'Waffles']
+    assert len(queries) == 2
+
+
+@pytest.mark.django_db
+def test_similar_recipes_limit(client, recipes, api_recipe_endpoints):
+    response = client.get(api_recipe_endpoints['similar'](recipes[0].slug), {'limit': 1}, HTTP_ACCEPT='application/json')
+    assert [recipe['title'] for recipe in response.json()['recipes']] == ['Crepes']
+
+    response = client.get(api_recipe_endpoints['similar'](recipes[1].slug), HTTP_ACCEPT='application/json')
+    assert response.json()['recipes'] == []
+
+
+@pytest.mark.django_db
+def test_similar_recipes_of_hidden_recipe(client, recipes, api_recipe_endpoints):
+    Recipe.objects.filter(pk=recipes[0].pk).update(is_private=True)
+
+    response = client.get(api_recipe_endpoints['similar'](recipes[0].slug), HTTP_ACCEPT='application/json')
+    assert response.status_code == status.HTTP_404_NOT_FOUND
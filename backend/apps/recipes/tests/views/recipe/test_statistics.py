@@ -0,0 +1,83 @@
+import uuid
+from datetime import timedelta
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+
+from apps.recipes.models import Recipe, EngagementEvent, viewer_hash
+from apps.recipes.rollups import roll_up
+
+
+@pytest.fixture
+def recipe(auth_client):
+    client, user = auth_client
+    return Recipe.objects.create(title='Pancakes', author=user)
+
+
+def add_events(recipe, count, timestamp, likes=None):
+    events = []
+    for index in range(count):
+        viewer = viewer_hash(uuid.uuid4().hex)
+        events.append(EngagementEvent.build(recipe.pk, EngagementEvent.VIEW, viewer, timestamp))
+        if likes is None or index < likes:
+            events.append(EngagementEvent.build(recipe.pk, EngagementEvent.LIKE, viewer, timestamp))
+    EngagementEvent.objects.bulk_create(events)
+
+
+def get_statistics(client, recipe, api_recipe_endpoints, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(api_recipe_endpoints['statistics'](recipe.slug), params, HTTP_ACCEPT='application/json')
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()['recipe']['time_series_data'], queries.captured_queries
+
+
+@pytest.mark.django_db
+def test_statistics_daily(auth_client, recipe, api_recipe_endpoints):
+    client, user = auth_client
+    yesterday = timezone.now() - timedelta(days=1)
+    add_events(recipe, 3, yesterday, likes=2)
+    roll_up(timezone.now())
+
+    data, _ = get_statistics(client, recipe, api_recipe_endpoints)
+    assert data['time_view'] == 'day'
+    assert len(data['data']) == 7
+    assert data['data'][-2] == {'period': yesterday.strftime('%Y-%m-%d'), 'views': 3, 'likes': 2}
+    assert data['total_views'] == 3
+    assert data['engagement_rate'] == 67
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'time_view, periods',
+    [('hour', 364 * 24), ('week', 52), ('month', 12), ('year', 1)]
+)
+def test_statistics_granularity(auth_client, recipe, api_recipe_endpoints, time_view, periods):
+    client, user = auth_client
+    add_events(recipe, 2, timezone.now() - timedelta(days=3))
+    roll_up(timezone.now())
+
+    data, _ = get_statistics(client, recipe, api_recipe_endpoints, **{'time-range': 'year', 'time-view': time_view})
+    assert periods <= len(data['data']) <= periods + 24
+    assert data['total_views'] == 2
+    assert data['total_likes'] == 2
+
+
+@pytest.mark.django_db
+def test_statistics_read_rollups_only(auth_client, recipe, api_recipe_endpoints):
+    client, user = auth_client
+    params = {'time-range': 'year', 'time-view': 'hour'}
+
+    add_events(recipe, 1, timezone.now() - timedelta(days=2))
+    roll_up(timezone.now())
+    _, few = get_statistics(client, recipe, api_recipe_endpoints, **params)
+
+    add_events(recipe, 20, timezone.now() - timedelta(days=2))
+    # Events not rolled up yet are not read
+    data, many = get_statistics(client, recipe, api_recipe_endpoints, **params)
+    assert data['total_views'] == 1
+    assert len(many) == len(few)
+    assert not any('recipes_view' in query['sql'] or 'recipes_like' in query['sql'] for query in many)
@@ -255,3 +255,16 @@ def test_update_recipe_banned_recipe(verified_user_with_recipe, api_recipe_endpo
     recipe.refresh_from_db()
     assert recipe.title == updated_data['title']
     assert recipe.is_banned is True
+
+
+@pytest.mark.django_db
+def test_update_recipe_nutrition_read_only(verified_user_with_recipe, api_recipe_endpoints):
+    client, user, recipe, recipe_data, recipe_id = verified_user_with_recipe
+    before = Recipe.objects.values('calories', 'protein').get(pk=recipe.pk)
+
+    response = client.patch(
+        api_recipe_endpoints['update'](recipe.slug),
+        {'calories': 999, 'protein': 99},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert Recipe.objects.values('calories', 'protein').get(pk=recipe.pk) == before
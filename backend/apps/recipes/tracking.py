@@ -0,0 +1,156 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from apps.recipes.models import (
+    Recipe,
+    EngagementEvent,
+    RecipeVisitors,
+    user_viewer,
+    viewer_hash,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def request_viewer(request):
+    """
+    Viewer key of the user, or of the address and user agent of an anonymous client
+    """
+    user = request.user
+    if user.is_authenticated:
+        return user_viewer(user)
+    return viewer_hash(f"anonymous:{request.META.get('REMOTE_ADDR', '')}:{request.META.get('HTTP_USER_AGENT', '')}")
+
+
+class ViewBuffer:
+    """
+    Buffer recipe views in process and write them in batches
+
+    Read requests only append to the buffer. Once `RECIPE_VIEW_BUFFER_SIZE`
+    events are queued or `RECIPE_VIEW_FLUSH_INTERVAL` seconds have passed, the
+    next finished request flushes them as view events with a single
+    `bulk_create`, repeats of a viewer within a minute folded into one row,
+    one aggregated counter update and one merge into the visitor sketches.
+
+    The first event queued also arms a timer that flushes after the
+    interval, so an idle process never holds views longer than that and
+    the statistics rollup lag can rely on it.
+    """
+    def __init__(self):
+        self._events = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._timer = None
+
+    @property
+    def max_size(self):
+        return getattr(settings, 'RECIPE_VIEW_BUFFER_SIZE', 500)
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'RECIPE_VIEW_FLUSH_INTERVAL', 10)
+
+    def __len__(self):
+        return len(self._events)
+
+    def record(self, recipe_id, request):
+        event = (recipe_id, request_viewer(request), EngagementEvent.bucket_for(timezone.now()))
+        with self._lock:
+            self._events.append(event)
+            if self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _flush_on_timer(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush_safely()
+        finally:
+            # The timer thread has a connection of its own
+            connection.close()
+
+    def clear(self):
+        with self._lock:
+            self._events = []
+            self._last_flush = time.monotonic()
+            self._cancel_timer()
+
+    def is_due(self):
+        return bool(self._events) and (
+            len(self._events) >= self.max_size or
+            time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    def flush_if_due(self):
+        if self.is_due():
+            return self.flush_safely()
+        return 0
+
+    def flush_safely(self):
+        """
+        Flush, logging errors instead of raising them into the signal handler, timer or exit hook that called
+        """
+        try:
+            return self.flush()
+        except Exception:
+            logger.exception('Failed to flush the recipe view buffer')
+            return 0
+
+    def flush(self):
+        """
+        Write the buffered views, returns the number of views written
+        """
+        with self._lock:
+            events, self._events = self._events, []
+            self._last_flush = time.monotonic()
+            self._cancel_timer()
+
+        # Views of recipes deleted since they were recorded are dropped
+        existing = set(Recipe.objects.filter(pk__in={recipe_id for recipe_id, _, _ in events}).values_list('pk', flat=True))
+        events = [event for event in events if event[0] in existing]
+        if not events:
+            return 0
+
+        rows = Counter(events)
+        increments = Counter(recipe_id for recipe_id, _, _ in events)
+        viewers = defaultdict(set)
+        for recipe_id, viewer, _ in events:
+            viewers[recipe_id].add(viewer)
+        with transaction.atomic():
+            EngagementEvent.objects.bulk_create(
+                [
+                    EngagementEvent.build(recipe_id, EngagementEvent.VIEW, viewer, timestamp=bucket, count=count)
+                    for (recipe_id, viewer, bucket), count in rows.items()
+                ],
+                batch_size=1000,
+            )
+            Recipe.objects.filter(pk__in=increments).update(
+                views_count=F('views_count') + Case(
+                    *[When(pk=recipe_id, then=Value(count)) for recipe_id, count in increments.items()],
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+            )
+            RecipeVisitors.add(viewers)
+
+        return len(events)
+
+
+recipe_view_buffer = ViewBuffer()
+atexit.register(recipe_view_buffer.flush_safely)
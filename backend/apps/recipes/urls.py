@@ -2,9 +2,15 @@ from django.urls import path, include
 
 from apps.recipes.views.recipe import (
     recipe_create_view,
+    recipe_bulk_create_view,
     recipe_list_view,
     recipe_admin_list_view,
+    recipe_catalogue_export_view,
+    recipe_feed_view,
+    recipe_recommended_view,
+    recipe_cook_view,
     random_recipe_view,
+    recipe_analytics_view,
 
     recipe_detail_view,
     recipe_update_view,
@@ -15,6 +21,7 @@ from apps.recipes.views.recipe import (
     recipe_report_view,
     recipe_ban_view,
     recipe_like_view,
+    recipe_similar_view,
     recipe_statistics_view,
 )
 from apps.recipes.views.tag import (
@@ -31,8 +38,14 @@ urlpatterns = [
     path('recipes/', include([
         path('', recipe_list_view, name='recipe-list-user'),
         path('list/', recipe_admin_list_view, name='recipe-list'),
+        path('export/', recipe_catalogue_export_view, name='recipe-catalogue-export'),
         path('create/', recipe_create_view, name='recipe-create'),
+        path('create/bulk/', recipe_bulk_create_view, name='recipe-create-bulk'),
+        path('feed/<str:feed>/', recipe_feed_view, name='recipe-feed'),
+        path('recommended/', recipe_recommended_view, name='recipe-recommended'),
+        path('cook/', recipe_cook_view, name='recipe-cook'),
         path('random/', random_recipe_view, name='recipe-random'),
+        path('analytics/', recipe_analytics_view, name='recipe-analytics'),
         path('deleted/', deleted_recipe_list_view, name='recipe-deleted'),
 
         path('view/<slug:slug>/', include([
@@ -44,6 +57,7 @@ urlpatterns = [
             path('report/', recipe_report_view, name='recipe-report'),
             path('ban/', recipe_ban_view, name='recipe-ban'),
             path('like/', recipe_like_view, name='recipe-like'),
+            path('similar/', recipe_similar_view, name='recipe-similar'),
             path('statistics/', recipe_statistics_view, name='recipe-statistics'),
         ])),
     ])),
@@ -1,6 +1,6 @@
+from django.conf import settings
 from django.utils import timezone
-from django.http import HttpResponse
-from django.db.models import Q, Count
+from django.http import FileResponse, StreamingHttpResponse
 from rest_framework import generics, status, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -9,6 +9,7 @@ from rest_framework.authentication import SessionAuthentication
 from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
 from django_filters.rest_framework import DjangoFilterBackend
 
+from apps.core.pagination import KeysetCursorPagination
 from apps.users.authentication import TokenAuthentication
 from apps.users.permissions import (
     IsAdmin,
@@ -17,11 +18,10 @@ from apps.users.permissions import (
 from apps.recipes.models import (
     Recipe,
     RecipeStatus,
-    RecipeBlock,
-    RecipeSpecialBlock,
     Like,
-    View,
     RecipeReport,
+    RecipeRanking,
+    prefetch_details,
 )
 from apps.recipes.serializers.recipe import (
     RecipeSerializer,
@@ -45,7 +45,28 @@ from apps.recipes.filters import (
 )
 from apps.recipes.renderers import (
     PlainTextRenderer,
+    ExportContentNegotiation,
 )
+from apps.recipes.mixins import (
+    LikedRecipesMixin,
+    CachedListMixin,
+    CachedDetailMixin,
+    ConditionalRecipeMixin,
+)
+from apps.recipes.sampling import random_recipe_pool, staff_random_recipe_pool
+from apps.recipes.exporting import (
+    get_exporter,
+    catalogue_formats,
+    iter_catalogue,
+    open_export_artifact,
+)
+from apps.recipes.search import search_recipes
+from apps.recipes.analytics import author_analytics
+from apps.recipes.feeds import FEEDS, feed_queryset
+from apps.recipes.similarity import similar_recipes
+from apps.recipes.collaborative import user_recommendations
+from apps.recipes.ingredients import cook_with
+from apps.recipes.tracking import recipe_view_buffer
 
 
 class RecipeCreateView(generics.CreateAPIView):
@@ -53,7 +74,7 @@ class RecipeCreateView(generics.CreateAPIView):
     Create a new recipe
 
     Creates a new recipe associated with the authenticated user, including optional
-    content blocks and structured special blocks
+    content blocks and structured special blocks, in a single transaction
     """
     queryset = Recipe.objects.all()
     serializer_class = RecipeCreateSerializer
@@ -61,31 +82,11 @@ class RecipeCreateView(generics.CreateAPIView):
     permission_classes = [IsVerifiedAndNotBanned]
 
     def create(self, request, *args, **kwargs):
-        data = request.data.copy()
-        blocks = data.pop('blocks', [])
-        special_blocks = data.pop('special_blocks', [])
-
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         recipe = serializer.save()
 
-        for block in blocks:
-            RecipeBlock.objects.create(
-                recipe=recipe,
-                type=block.get('type', RecipeBlock.TEXT),
-                content=block.get('content', ''),
-                image=block.get('image', None),
-                order=block.get('order', 0),
-            )
-
-        for block in special_blocks:
-            RecipeSpecialBlock.objects.create(
-                recipe=recipe,
-                type=block.get('type'),
-                content=block.get('content', {}),
-                order=block.get('order', 0),
-            )
-
+        recipe = Recipe.objects.with_details().get(pk=recipe.pk)
         recipe_serializer = RecipeSerializer(recipe, context={'request': request})
         return Response(
             {
@@ -96,20 +97,57 @@ class RecipeCreateView(generics.CreateAPIView):
         )
 
 
+class RecipeBulkCreateView(generics.CreateAPIView):
+    """
+    Create a batch of recipes
+
+    Accepts a list of recipes in the format of the create endpoint. All of them
+    are validated before anything is written, and they are created together or
+    not at all.
+    """
+    queryset = Recipe.objects.all()
+    serializer_class = RecipeCreateSerializer
+    authentication_classes = [TokenAuthentication, SessionAuthentication]
+    permission_classes = [IsVerifiedAndNotBanned]
+    max_batch_size = 100
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            raise ValidationError({'detail': 'Expected a list of recipes.'})
+        if len(request.data) > self.max_batch_size:
+            raise ValidationError({'detail': f'At most {self.max_batch_size} recipes can be created at once.'})
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        recipes = serializer.save()
+
+        recipes = Recipe.objects.with_details().filter(pk__in=[recipe.pk for recipe in recipes])
+        recipe_serializer = RecipeSerializer(recipes, many=True, context={'request': request})
+        return Response(
+            {
+                'recipes': recipe_serializer.data,
+                'detail': f'{len(recipe_serializer.data)} recipes created successfully.',
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
 class NoFilterBrowsableAPIRenderer(BrowsableAPIRenderer):
     def get_filter_form(self, data, view, request):
         return None
 
 
-class BaseRecipeListView(generics.ListAPIView):
+class BaseRecipeListView(LikedRecipesMixin, generics.ListAPIView):
     """
     Base view for listing recipes with filtering by tag, search, and sort
 
     Optional query parameters:
     - ?tag=<tag_name>: Filter recipes by tag
-    - ?search=<query>: Full-text search in recipe title or description
-    - ?sort=<field>: Sort recipes by a given field (e.g., created_at, -created_at)
+    - ?search=<query>: Full-text search in recipe title, description, steps and ingredients, ranked by relevance
+    - ?sort=<key>: Sort recipes by created_at, published_at, likes, views or title, prefix with '-' for descending
     - ?<field>=<value>: Filter recipes by a given field
+    - ?cursor=<cursor>: Opaque cursor taken from the 'next' or 'previous' link
+    - ?page_size=<n>: Number of recipes per page
 
     Override 'permission_classes', 'serializer_class' and 'fiterset_class' in subclasses
     """
@@ -117,15 +155,19 @@ class BaseRecipeListView(generics.ListAPIView):
     authentication_classes = [TokenAuthentication, SessionAuthentication]
     renderer_classes = [NoFilterBrowsableAPIRenderer, JSONRenderer]
     filter_backends = [DjangoFilterBackend]
+    pagination_class = KeysetCursorPagination
+
+    # Public sort keys, each one backed by a `recipe_live_*` index
+    sort_fields = {
+        'created_at': 'created_at',
+        'published_at': 'published_at',
+        'likes': 'likes_count',
+        'views': 'views_count',
+        'title': 'title',
+    }
 
     def get_queryset(self):
-        queryset = Recipe.objects.annotate(
-            view_count=Count('views'),
-            like_count=Count('likes')
-        )
-        if not self.request.query_params.get('sort'):
-            queryset = queryset.filter(is_deleted=False)
-        return queryset
+        return super().get_queryset().filter(is_deleted=False)
 
     def get(self, request, *args, **kwargs):
         tag = request.query_params.get('tag')
@@ -143,20 +185,32 @@ class BaseRecipeListView(generics.ListAPIView):
 
     def list_by_tag(self, request, tag):
         queryset = self.get_queryset().filter(tags__name__iexact=tag)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.paginated_response(queryset)
 
     def list_by_search(self, request, query):
-        queryset = self.get_queryset().filter(
-            Q(title__icontains=query) | Q(description__icontains=query)
-        )
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        queryset = search_recipes(self.get_queryset(), query)
+        return self.paginated_response(queryset)
 
     def list_by_sort(self, request, sort):
-        queryset = self.get_queryset().order_by(sort)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        queryset = self.get_queryset().order_by(self.get_sort_field(sort))
+        return self.paginated_response(queryset)
+
+    def get_sort_field(self, sort):
+        """
+        Map a public sort key to its model field, rejecting anything that is not indexed
+        """
+        descending = sort.startswith('-')
+        field = self.sort_fields.get(sort.removeprefix('-'))
+        if field is None:
+            raise ValidationError({
+                'sort': f"Unsupported sort key. Choose one of: {', '.join(self.sort_fields)}."
+            })
+        return f'-{field}' if descending else field
+
+    def paginated_response(self, queryset):
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
 class RecipeAdminListView(BaseRecipeListView):
@@ -165,52 +219,234 @@ class RecipeAdminListView(BaseRecipeListView):
 
     Optional query parameters:
     - ?tag=<tag_name>: Filter recipes by tag
-    - ?search=<query>: Full-text search in recipe title or description
-    - ?sort=<field>: Sort recipes by a given field (e.g., created_at, -created_at)
+    - ?search=<query>: Full-text search in recipe title, description, steps and ingredients, ranked by relevance
+    - ?sort=<key>: Sort recipes by created_at, published_at, likes, views or title, prefix with '-' for descending
     - ?<field>=<value>: Filter recipes by a given field
     """
+    queryset = Recipe.objects.with_details()
     serializer_class = RecipeAdminSerializer
     permission_classes = [permissions.IsAdminUser, IsAdmin]
     filterset_class = RecipeAdminFilter
 
 
-class RecipeListView(BaseRecipeListView):
+class RecipeCatalogueExportView(generics.GenericAPIView):
+    """
+    Admin view streaming the recipe catalogue as a file
+
+    Recipes are read from the database `chunk_size` at a time and written as
+    they are rendered, so memory stays flat whatever the size of the catalogue.
+
+    Query parameters:
+    - ?format=<format>: jsonl (default), csv, yaml, md, txt or html
+    - ?<field>=<value>: Filter recipes like the admin list does
+    """
+    queryset = Recipe.objects.filter(is_deleted=False)
+    permission_classes = [permissions.IsAdminUser, IsAdmin]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = RecipeAdminFilter
+    content_negotiation_class = ExportContentNegotiation
+    chunk_size = 500
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.query_params.get('format', 'jsonl')
+        exporter = get_exporter(export_format, catalogue=True)
+        if exporter is None:
+            raise ValidationError({'format': f"Unsupported format. Choose one of: {', '.join(catalogue_formats())}."})
+
+        documents = iter_catalogue(self.filter_queryset(self.get_queryset()), chunk_size=self.chunk_size)
+
+        response = StreamingHttpResponse(exporter.encode(documents), content_type=exporter.content_type)
+        response['Content-Disposition'] = f'attachment; filename="recipes.{exporter.extension}"'
+        return response
+
+
+class RecipeListView(CachedListMixin, BaseRecipeListView):
     """
     Public user view for listing recipes
 
+    Anonymous users get public recipes only, served from the response cache.
+    Authenticated users also get their own drafts and private recipes.
+
     Optional query parameters:
     - ?tag=<tag_name>: Filter recipes by tag
-    - ?search=<query>: Full-text search in recipe title or description
-    - ?sort=<field>: Sort recipes by a given field (e.g., created_at, -created_at)
+    - ?search=<query>: Full-text search in recipe title, description, steps and ingredients, ranked by relevance
+    - ?sort=<key>: Sort recipes by created_at, published_at, likes, views or title, prefix with '-' for descending
     - ?<field>=<value>: Filter recipes by a given field
     """
+    queryset = Recipe.objects.select_related('author')
     serializer_class = RecipeMinimalSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.AllowAny]
     filterset_class = RecipeFilter
 
+    def get_queryset(self):
+        return super().get_queryset().visible_to(self.request.user)
 
-class RandomRecipeView(generics.RetrieveAPIView):
+
+class RecipeFeedView(LikedRecipesMixin, generics.ListAPIView):
+    """
+    Public recipes of a feed: 'popular', 'trending' or 'new'
+
+    Popular and trending are read from the rankings `rank_recipes` keeps,
+    new from the publication index, so no request aggregates engagement.
+
+    Query Parameters:
+    - limit: Number of recipes, default 20, at most `RECIPE_FEED_SIZE`
+    """
+    queryset = Recipe.objects.select_related('author')
+    serializer_class = RecipeMinimalSerializer
+    authentication_classes = [TokenAuthentication, SessionAuthentication]
+    permission_classes = [permissions.AllowAny]
+    default_limit = 20
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            raise ValidationError({'limit': 'A valid integer is required.'})
+        return max(0, min(limit, settings.RECIPE_FEED_SIZE))
+
+    def get_queryset(self):
+        feed = self.kwargs['feed']
+        if feed not in FEEDS:
+            raise NotFound({'detail': f"Unknown feed. Choose one of: {', '.join(FEEDS)}."})
+        return feed_queryset(feed, super().get_queryset())[:self.get_limit()]
+
+    def list(self, request, *args, **kwargs):
+        recipes = list(self.get_queryset())
+        self.liked_recipe_ids = self.get_liked_recipe_ids(recipes)
+
+        serializer = self.get_serializer(recipes, many=True)
+        return Response(
+            {
+                'feed': self.kwargs['feed'],
+                'recipes': serializer.data,
+                'detail': 'Recipe feed retrieved successfully.',
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class RecipeRecommendedView(LikedRecipesMixin, generics.GenericAPIView):
     """
-    Retrieve a random non-banned, non-deleted, public or owned recipe
+    Recipes recommended to the authenticated user from the recipes liked together with theirs
+
+    Lists are computed offline by `refresh_recommendations`. Users without
+    one yet get the popular feed, with `personalized` set to false.
+
+    Query Parameters:
+    - limit: Number of recipes, default 20, at most `RECIPE_RECOMMENDATIONS`
     """
     queryset = Recipe.objects.all()
+    serializer_class = RecipeMinimalSerializer
+    authentication_classes = [TokenAuthentication, SessionAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    default_limit = 20
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            raise ValidationError({'limit': 'A valid integer is required.'})
+        return max(0, min(limit, settings.RECIPE_RECOMMENDATIONS))
+
+    def get(self, request, *args, **kwargs):
+        limit = self.get_limit()
+        recipes = user_recommendations(request.user, limit)
+        personalized = bool(recipes)
+        if not personalized:
+            recipes = list(feed_queryset(RecipeRanking.POPULAR, Recipe.objects.select_related('author'))[:limit])
+        self.liked_recipe_ids = self.get_liked_recipe_ids(recipes)
+
+        serializer = self.get_serializer(recipes, many=True)
+        return Response(
+            {
+                'personalized': personalized,
+                'recipes': serializer.data,
+                'detail': 'Recommended recipes retrieved successfully.',
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class RecipeCookView(LikedRecipesMixin, generics.GenericAPIView):
+    """
+    What can I cook: public recipes ranked by how much of them the given ingredients cover
+
+    Recipes missing the fewest ingredients come first, then those using the
+    most of the given ones. Each result lists the ingredients still needed.
+
+    Query Parameters:
+    - ingredients: Comma separated ingredients, required
+    - max-missing: Leave out recipes missing more ingredients than this
+    - limit: Number of recipes, default 20, at most 100
+    """
+    queryset = Recipe.objects.select_related('author')
+    serializer_class = RecipeMinimalSerializer
+    authentication_classes = [TokenAuthentication, SessionAuthentication]
+    permission_classes = [permissions.AllowAny]
+    default_limit = 20
+    max_limit = 100
+
+    def get_int_param(self, name, default=None):
+        value = self.request.query_params.get(name)
+        if value in (None, ''):
+            return default
+        try:
+            return max(0, int(value))
+        except ValueError:
+            raise ValidationError({name: 'A valid integer is required.'})
+
+    def get(self, request, *args, **kwargs):
+        names = [name for name in request.query_params.get('ingredients', '').split(',') if name.strip()]
+        if not names:
+            raise ValidationError({'ingredients': 'At least one ingredient is required.'})
+
+        results = cook_with(
+            names,
+            self.get_queryset(),
+            limit=min(self.get_int_param('limit', self.default_limit), self.max_limit),
+            max_missing=self.get_int_param('max-missing'),
+        )
+        recipes = [recipe for recipe, _, _ in results]
+        self.liked_recipe_ids = self.get_liked_recipe_ids(recipes)
+
+        serializer = self.get_serializer(recipes, many=True)
+        return Response(
+            {
+                'recipes': [
+                    {**data, 'matched_ingredients': matched, 'missing_ingredients': missing}
+                    for data, (_, matched, missing) in zip(serializer.data, results)
+                ],
+                'detail': 'Recipes retrieved successfully.',
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class RandomRecipeView(generics.RetrieveAPIView):
+    """
+    Retrieve a random public recipe, superusers may also get drafts and private recipes
+    """
+    queryset = Recipe.objects.with_details()
     serializer_class = RecipeSerializer
     authentication_classes = [TokenAuthentication, SessionAuthentication]
     permission_classes = [permissions.AllowAny, IsRecipeOwnerOrPublic]
 
     def get_queryset(self):
-        qs = super().get_queryset().filter(is_banned=False, is_deleted=False)
-        user = self.request.user
+        queryset = super().get_queryset()
+        if not self.request.user.is_superuser:
+            return queryset.public()
+        return queryset.filter(is_banned=False, is_deleted=False)
 
-        if not user.is_authenticated or not user.is_superuser:
-            qs = qs.filter(
-                Q(status=RecipeStatus.PUBLISHED)
-            )
-
-        return qs
+    def get_random_recipe(self):
+        """
+        Pick from the pool of eligible IDs, superusers also get drafts and private recipes
+        """
+        pool = staff_random_recipe_pool if self.request.user.is_superuser else random_recipe_pool
+        return pool.pick(self.get_queryset())
 
     def get(self, request, *args, **kwargs):
-        random_recipe = self.get_queryset().order_by('?').first()
+        random_recipe = self.get_random_recipe()
 
         if not random_recipe:
             return Response(
@@ -218,7 +454,7 @@ class RandomRecipeView(generics.RetrieveAPIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        random_recipe.add_view(request.user)
+        recipe_view_buffer.record(random_recipe.pk, request)
 
         recipe_serializer = self.get_serializer(random_recipe)
         return Response(
@@ -230,17 +466,23 @@ class RandomRecipeView(generics.RetrieveAPIView):
         )
         
 
-class RecipeDetailView(generics.RetrieveAPIView):
+class RecipeDetailView(CachedDetailMixin, ConditionalRecipeMixin, generics.RetrieveAPIView):
     """
     Retrieve a specific recipe by UUID
+
+    Responses carry ETag and Last-Modified validators, responses to anonymous
+    users are served from the response cache
     """
-    queryset = Recipe.objects.all()
+    queryset = Recipe.objects.select_related('author')
     serializer_class = RecipeSerializer
     authentication_classes = [SessionAuthentication, TokenAuthentication]
     permission_classes = [permissions.AllowAny]
     lookup_field = 'slug'
 
-    def get(self, request, *args, **kwargs):
+    def record_view(self, recipe_id):
+        recipe_view_buffer.record(recipe_id, self.request)
+
+    def retrieve(self, request, *args, **kwargs):
         recipe = self.get_object()
 
         if recipe.is_banned and not (request.user.is_superuser or request.user == recipe.author):
@@ -267,7 +509,13 @@ class RecipeDetailView(generics.RetrieveAPIView):
         if recipe.is_private and request.user != recipe.author and not request.user.is_superuser:
             raise NotFound(detail='No Recipe matches the given query.')
 
-        recipe.add_view(request.user)
+        self.record_view(recipe.pk)
+
+        not_modified = self.get_not_modified_response(recipe)
+        if not_modified is not None:
+            return not_modified
+
+        prefetch_details([recipe])
         recipe_serializer = self.get_serializer(recipe)
 
         return Response(
@@ -334,17 +582,18 @@ class RecipeDeleteView(generics.DestroyAPIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class DeletedRecipeListView(generics.ListAPIView):
+class DeletedRecipeListView(LikedRecipesMixin, generics.ListAPIView):
     """
     Retrieve a list of deleted recipes
     """
     serializer_class = DeletedRecipeSerializer
     authentication_classes = [TokenAuthentication, SessionAuthentication]
     permission_classes = [permissions.IsAuthenticated, IsNotAdmin]
+    pagination_class = KeysetCursorPagination
     lookup_field = 'slug'
 
     def get_queryset(self):
-        return Recipe.objects.filter(
+        return Recipe.objects.with_details().filter(
             is_deleted=True,
             author=self.request.user
         )
@@ -386,30 +635,34 @@ class RecipeRestoreView(generics.UpdateAPIView):
         )
 
 
-class RecipeExportView(generics.RetrieveAPIView):
+class RecipeExportView(ConditionalRecipeMixin, generics.RetrieveAPIView):
     """
-    Retrieve and export a recipe in a specified format
+    Retrieve and export a recipe in a specified format, with ETag and Last-Modified validators
+
+    Exports are rendered once per recipe version and served from disk.
 
     Supported formats:
     - pdf
     - txt
     - json
+    - jsonl
     - csv
     - yaml
     - html
-    - markdown
+    - md
     """
-    queryset = Recipe.objects.all()
+    queryset = Recipe.objects.select_related('author')
     serializer_class = RecipeSerializer
     authentication_classes = [TokenAuthentication, SessionAuthentication]
     permission_classes = [IsVerifiedAndNotBanned, IsRecipeOwnerOrPublic]
     renderer_classes = [PlainTextRenderer, JSONRenderer, BrowsableAPIRenderer]
+    content_negotiation_class = ExportContentNegotiation
     lookup_field = 'slug'
 
     def get_object(self):
         slug = self.kwargs.get('slug')
         try:
-            return Recipe.objects.get(slug=slug)
+            return self.get_queryset().get(slug=slug)
         except Recipe.DoesNotExist:
             raise NotFound(detail='Recipe not found.')
 
@@ -420,6 +673,11 @@ class RecipeExportView(generics.RetrieveAPIView):
         export_format = self.request.query_params.get('format')
 
         if not export_format:
+            not_modified = self.get_not_modified_response(recipe)
+            if not_modified is not None:
+                return not_modified
+
+            prefetch_details([recipe])
             serializer = self.get_serializer(recipe)
             return Response(
                 {
@@ -429,81 +687,24 @@ class RecipeExportView(generics.RetrieveAPIView):
                 status=status.HTTP_200_OK,
             )
 
-        formats = {
-            'pdf': self._export_pdf,
-            'txt': self._export_txt,
-            'json': self._export_json,
-            'csv': self._export_csv,
-            'yaml': self._export_yaml,
-            'html': self._export_html,
-            'md': self._export_markdown,
-        }
-
-        export_func = formats.get(export_format.lower())
-        if not export_func:
+        exporter = get_exporter(export_format)
+        if exporter is None:
             return Response(
                 {'detail': 'Unsupported format.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        return export_func(recipe)
-
-    def _export_pdf(self, recipe):
-        # TODO: add pdf export
-        pass
+        not_modified = self.get_not_modified_response(recipe)
+        if not_modified is not None:
+            return not_modified
 
-    def _export_txt(self, recipe):
-        content = (
-            f'Author: {recipe.author.username}\n'
-            f'Title: {recipe.title}\n'
-            f'Description: {recipe.description or "No description"}\n'
-            f'Views: {recipe.views_count}\n'
-            f'Likes: {recipe.likes_count}\n'
+        return FileResponse(
+            open_export_artifact(recipe, exporter),
+            as_attachment=True,
+            filename=f'{recipe.slug}.{exporter.extension}',
+            content_type=exporter.content_type,
         )
 
-        if recipe.calories is not None or recipe.protein is not None or recipe.fat is not None or recipe.carbs is not None:
-            content += '\nNutritional Information:\n'
-            if recipe.calories is not None:
-                content += f'Calories: {recipe.calories} kcal\n'
-            if recipe.protein is not None:
-                content += f'Protein: {recipe.protein}g\n'
-            if recipe.fat is not None:
-                content += f'Fat: {recipe.fat}g\n'
-            if recipe.carbs is not None:
-                content += f'Carbohydrates: {recipe.carbs}g\n'
-
-        if recipe.tags.exists():
-            tags = ', '.join(tag.name for tag in recipe.tags.all())
-            content += f'\nTags: {tags}\n'
-
-        if recipe.source_url:
-            content += f'\nSource: {recipe.source_url}\n'
-
-        filename = f'{recipe.slug}.txt'
-        response = HttpResponse(content, content_type='text/plain', status=status.HTTP_200_OK)
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        return response
-
-    def _export_json(self, recipe):
-        serializer = self.get_serializer(recipe)
-        return Response(serializer.data, content_type='application/json')
-
-    def _export_csv(self, recipe):
-        # TODO: add csv export
-        pass
-
-    def _export_yaml(self, recipe):
-        # TODO: add yaml export
-        pass
-
-    def _export_html(self, recipe):
-        # TODO: add html export
-        pass
-
-    def _export_markdown(self, recipe):
-        # TODO: add markdown export
-        pass
-
 
 class RecipeReportView(generics.CreateAPIView):
     """
@@ -573,8 +774,7 @@ class RecipeLikeView(APIView):
     def post(self, request, *args, **kwargs):
         recipe = self._get_recipe(self.kwargs['slug'])
 
-        like, created = Like.objects.get_or_create(recipe=recipe, user=request.user)
-        if not created:
+        if not recipe.like(request.user):
             return Response(
                 {'detail': 'You have already liked this recipe.'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -588,8 +788,7 @@ class RecipeLikeView(APIView):
     def delete(self, request, *args, **kwargs):
         recipe = self._get_recipe(self.kwargs['slug'])
 
-        deleted, _ = Like.objects.filter(recipe=recipe, user=request.user).delete()
-        if not deleted:
+        if not recipe.unlike(request.user):
             return Response(
                 {'detail': 'You haven\'t liked this recipe yet.'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -607,6 +806,48 @@ class RecipeLikeView(APIView):
             raise NotFound(detail='Recipe not found.')
 
 
+class RecipeSimilarView(LikedRecipesMixin, generics.GenericAPIView):
+    """
+    Public recipes most similar to a given recipe by tags, ingredients and macronutrients
+
+    Neighbors are precomputed by `build_recipe_neighbors`, so this is a single
+    indexed read whatever the size of the catalogue.
+
+    Query Parameters:
+    - limit: Number of recipes, default 10, at most `RECIPE_NEIGHBORS`
+    """
+    queryset = Recipe.objects.all()
+    serializer_class = RecipeMinimalSerializer
+    authentication_classes = [TokenAuthentication, SessionAuthentication]
+    permission_classes = [permissions.AllowAny]
+    lookup_field = 'slug'
+    default_limit = 10
+
+    def get_queryset(self):
+        return super().get_queryset().visible_to(self.request.user)
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            raise ValidationError({'limit': 'A valid integer is required.'})
+        return max(0, min(limit, settings.RECIPE_NEIGHBORS))
+
+    def get(self, request, *args, **kwargs):
+        recipe = self.get_object()
+        recipes = list(similar_recipes(recipe, Recipe.objects.select_related('author'))[:self.get_limit()])
+        self.liked_recipe_ids = self.get_liked_recipe_ids(recipes)
+
+        serializer = self.get_serializer(recipes, many=True)
+        return Response(
+            {
+                'recipes': serializer.data,
+                'detail': 'Similar recipes retrieved successfully.',
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 class RecipeStatisticsView(generics.RetrieveAPIView):
     """
     Retrieve statistics for a given recipe including time-series data for visualization
@@ -652,9 +893,57 @@ class RecipeStatisticsView(generics.RetrieveAPIView):
         )
 
 
+class RecipeAnalyticsView(APIView):
+    """
+    Views, likes and engagement of all recipes of the authenticated user
+
+    Returns the totals and time series over all recipes, with the time series
+    of the top recipes, computed from the statistics rollups.
+
+    Query Parameters:
+    - time-range: 'day', '3days', 'week', 'month', '3months', '6months' or 'year', default 'week'
+    - time-view: 'hour', 'day', 'week', 'month' or 'year', default 'day'
+    - sort: Rank recipes by 'views', 'likes' or 'engagement', default 'views'
+    - limit: Number of top recipes with a time series, default 10, at most 100
+    """
+    authentication_classes = [TokenAuthentication, SessionAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    default_limit = 10
+    max_limit = 100
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            raise ValidationError({'limit': 'A valid integer is required.'})
+        return max(0, min(limit, self.max_limit))
+
+    def get(self, request, *args, **kwargs):
+        data = author_analytics(
+            request.user,
+            time_range=request.query_params.get('time-range', 'week'),
+            time_view=request.query_params.get('time-view', 'day'),
+            sort=request.query_params.get('sort', 'views'),
+            limit=self.get_limit(),
+        )
+
+        return Response(
+            {
+                'analytics': data,
+                'detail': f"Author analytics retrieved successfully for <{data['time_range']}> with <{data['time_view']}> granularity.",
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 recipe_create_view = RecipeCreateView.as_view()
+recipe_bulk_create_view = RecipeBulkCreateView.as_view()
 recipe_list_view = RecipeListView.as_view()
 recipe_admin_list_view = RecipeAdminListView.as_view()
+recipe_catalogue_export_view = RecipeCatalogueExportView.as_view()
+recipe_feed_view = RecipeFeedView.as_view()
+recipe_recommended_view = RecipeRecommendedView.as_view()
+recipe_cook_view = RecipeCookView.as_view()
 random_recipe_view = RandomRecipeView.as_view()
 
 recipe_detail_view = RecipeDetailView.as_view()
@@ -666,4 +955,6 @@ recipe_export_view = RecipeExportView.as_view()
 recipe_report_view = RecipeReportView.as_view()
 recipe_ban_view = RecipeBanView.as_view()
 recipe_like_view = RecipeLikeView.as_view()
+recipe_similar_view = RecipeSimilarView.as_view()
 recipe_statistics_view = RecipeStatisticsView.as_view()
+recipe_analytics_view = RecipeAnalyticsView.as_view()
@@ -10,7 +10,7 @@ def test_list_users_as_admin(client, api_users_endpoints, registered_admin):
     response = client.get(api_users_endpoints['list'])
     assert response.status_code == status.HTTP_200_OK
 
-    users = response.json()
+    users = response.json()['results']
     assert len(users) > 0
     for user in users:
         assert 'email' in user
@@ -15,6 +15,7 @@ from rest_framework.authentication import SessionAuthentication
 from rest_framework.authtoken.models import Token
 from rest_framework.throttling import AnonRateThrottle
 
+from apps.core.pagination import KeysetCursorPagination
 from apps.users.models import User, ActivationCode
 from apps.users.authentication import TokenAuthentication
 from apps.users.serializers import (
@@ -147,12 +148,13 @@ class UserListView(generics.ListAPIView):
     """
     List all user profiles (admin only)
 
-    Returns full profile data for all users
+    Returns full profile data for all users, newest first, one page at a time
     """
-    queryset = User.objects.all()
+    queryset = User.objects.order_by('-date_joined')
     serializer_class = UserProfileSerializer
     authentication_classes = [TokenAuthentication, SessionAuthentication]
     permission_classes = [permissions.IsAdminUser, IsAdmin]
+    pagination_class = KeysetCursorPagination
 
 
 class UserDetailUpdateView(generics.RetrieveUpdateAPIView):
@@ -102,6 +102,24 @@ DATABASES = {
 }
 
 
+# Cache, CACHE_BACKEND is either 'locmem' or 'file'
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'recipe-manager',
+        'OPTIONS': {'MAX_ENTRIES': env.int('CACHE_MAX_ENTRIES', default=10000)},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': env('CACHE_LOCATION', default=str(BASE_DIR / 'database' / 'cache')),
+        'OPTIONS': {'MAX_ENTRIES': env.int('CACHE_MAX_ENTRIES', default=10000)},
+    },
+}
+CACHES = {
+    'default': CACHE_BACKENDS[env('CACHE_BACKEND', default='locmem')],
+}
+
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -173,6 +191,33 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = "users.User"
 SESSION_COOKIE_AGE = 60 * 60 * 24 * 7
 
+# Recipe views are buffered in process and written in batches
+RECIPE_VIEW_BUFFER_SIZE = env.int('RECIPE_VIEW_BUFFER_SIZE', default=500)
+RECIPE_VIEW_FLUSH_INTERVAL = env.int('RECIPE_VIEW_FLUSH_INTERVAL', default=10)
+
+# Anonymous recipe list and detail responses are cached until a change expires them
+RECIPE_CACHE_ALIAS = 'default'
+RECIPE_CACHE_TIMEOUT = env.int('RECIPE_CACHE_TIMEOUT', default=60 * 5)
+
+# Engagement event buckets younger than this many seconds wait for the next statistics rollup,
+# it must exceed the one minute buckets plus RECIPE_VIEW_FLUSH_INTERVAL, which the buffer timer enforces
+RECIPE_STATS_ROLLUP_LAG = env.int('RECIPE_STATS_ROLLUP_LAG', default=120)
+
+# Months of engagement events kept once rolled up
+RECIPE_EVENT_RETENTION_MONTHS = env.int('RECIPE_EVENT_RETENTION_MONTHS', default=13)
+
+# Recipes kept per ranked feed, and the half-life of the engagement counted in their scores
+RECIPE_FEED_SIZE = env.int('RECIPE_FEED_SIZE', default=100)
+RECIPE_POPULAR_HALF_LIFE_DAYS = env.int('RECIPE_POPULAR_HALF_LIFE_DAYS', default=14)
+RECIPE_TRENDING_HALF_LIFE_HOURS = env.int('RECIPE_TRENDING_HALF_LIFE_HOURS', default=6)
+
+# Similar recipes precomputed per recipe, and recipes recommended per user
+RECIPE_NEIGHBORS = env.int('RECIPE_NEIGHBORS', default=20)
+RECIPE_RECOMMENDATIONS = env.int('RECIPE_RECOMMENDATIONS', default=50)
+
+# Rendered single recipe exports, one file per recipe version and format
+RECIPE_EXPORT_ROOT = env('RECIPE_EXPORT_ROOT', default=str(BASE_DIR / 'database' / 'exports'))
+
 
 MANIFEST_LOADER = {
     'manifest_file': os.path.join(BASE_DIR, 'static/manifest.json'),